@@ -10,6 +10,7 @@
     ],
     "data": [
         "data/legacy_cleanup.xml",
+        "data/pdf_cache_cron.xml",
         "views/templates/report_layout_standard.xml",
         "views/templates/proposal_pdf_templates.xml",
         "report/bd_standard_paperformat.xml",
@@ -1,3 +1,5 @@
+from . import pdf_cache_mixin
+from . import ir_actions_report
 from . import legacy_cleanup
 from . import engagement_letter_report
 from . import proposal_report
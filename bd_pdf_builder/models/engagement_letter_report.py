@@ -3,7 +3,39 @@ from odoo import models
 
 
 class BdEngagementLetter(models.Model):
-    _inherit = "bd.engagement.letter"
+    _name = "bd.engagement.letter"
+    _inherit = ["bd.engagement.letter", "bd.pdf.cache.mixin"]
+
+    _pdf_cache_report_xmlid = "bd_pdf_builder.action_engagement_letter_pdf"
+    _pdf_cache_title = "Engagement Letter"
+    _pdf_cache_fields = (
+        "company_id",
+        "code",
+        "reference",
+        "date",
+        "partner_id.display_name",
+        "partner_id.contact_address",
+        "partner_id.email",
+        "partner_id.phone",
+        "partner_id.mobile",
+        "partner_id.ref",
+        "partner_id.vat",
+        "client_id.display_name",
+        "contact_details",
+        "reviewer_id.name",
+        "create_uid.name",
+        "approved_by.name",
+        "currency_id.symbol",
+        "currency_id.name",
+        "scope_of_work",
+        "services_description",
+        "legal_fees_lines",
+        "legal_fee_amount",
+        "fee_total",
+        "total_legal_fees",
+        "total_amount",
+        "payment_terms",
+    )
 
     def _get_or_create_engagement_report_action(self):
         xmlid = "bd_pdf_builder.action_engagement_letter_pdf"
@@ -18,6 +50,8 @@ class BdEngagementLetter(models.Model):
             "report_name": report_name,
             "report_file": report_name,
             "print_report_name": print_name_expr,
+            "attachment": "object._get_pdf_cache_attachment_name()",
+            "attachment_use": True,
         }
         if paperformat:
             desired_vals["paperformat_id"] = paperformat.id
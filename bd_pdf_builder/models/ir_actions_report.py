@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+from .pdf_cache_mixin import PDF_CACHE_MARKER
+
+
+class IrActionsReport(models.Model):
+    _inherit = "ir.actions.report"
+
+    def _prepare_pdf_report_attachment_vals_list(self, report, streams):
+        vals_list = super()._prepare_pdf_report_attachment_vals_list(report, streams)
+        if report.model not in self._bd_pdf_cache_models():
+            return vals_list
+        cached_ids = [vals["res_id"] for vals in vals_list if vals.get("res_model") == report.model]
+        if cached_ids:
+            # Drop renditions of older content before storing the new one.
+            self.env[report.model].browse(cached_ids)._get_pdf_cache_attachments().unlink()
+        for vals in vals_list:
+            vals["description"] = PDF_CACHE_MARKER
+        return vals_list
+
+    @api.model
+    def _bd_pdf_cache_models(self):
+        return self.env["bd.pdf.cache.mixin"]._inherit_children
+
+    @api.model
+    def _cron_prerender_bd_pdf_cache(self):
+        remaining = False
+        for model_name in self._bd_pdf_cache_models():
+            remaining |= self.env[model_name]._cron_prerender_pdf_cache()
+        if remaining:
+            self.env.ref("bd_pdf_builder.ir_cron_prerender_pdf_cache")._trigger()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import hashlib
+
+from odoo import api, fields, models
+
+PDF_CACHE_MARKER = "bd_pdf_builder.pdf_cache"
+
+
+class BdPdfCacheMixin(models.AbstractModel):
+    """Keep the rendered PDF of final documents as an attachment.
+
+    The attachment name embeds a digest of the fields the report template
+    reads, so ``ir.actions.report`` (``attachment_use``) only serves it back
+    while the document content is unchanged.
+    """
+
+    _name = "bd.pdf.cache.mixin"
+    _description = "BD PDF Cache Mixin"
+
+    # xmlid of the cached ir.actions.report, and the title used in file names.
+    _pdf_cache_report_xmlid = None
+    _pdf_cache_title = "Document"
+    _pdf_cache_final_states = ("approved_client",)
+    # Field paths read by the report template.
+    _pdf_cache_fields = ()
+
+    pdf_cache_pending = fields.Boolean(copy=False, readonly=True)
+
+    def _get_pdf_cache_values(self):
+        self.ensure_one()
+        values = []
+        for path in self._pdf_cache_fields:
+            value = self.mapped(path)
+            if isinstance(value, models.BaseModel):
+                value = [(rec.id, str(rec.write_date)) for rec in value]
+            values.append((path, value))
+        return values
+
+    def _get_pdf_cache_digest(self):
+        return hashlib.sha1(repr(self._get_pdf_cache_values()).encode()).hexdigest()
+
+    def _get_pdf_cache_attachment_name(self):
+        """Attachment name evaluated by ``ir.actions.report.attachment``.
+
+        Returning ``False`` disables caching for documents not yet final.
+        """
+        self.ensure_one()
+        if self.state not in self._pdf_cache_final_states:
+            return False
+        reference = (self.code or self.name or str(self.id)).replace("/", "-")
+        return "%s - %s [%s].pdf" % (
+            self._pdf_cache_title,
+            reference,
+            self._get_pdf_cache_digest()[:16],
+        )
+
+    def _get_pdf_cache_attachments(self):
+        if not self:
+            return self.env["ir.attachment"]
+        return self.env["ir.attachment"].sudo().search(
+            [
+                ("res_model", "=", self._name),
+                ("res_id", "in", self.ids),
+                ("description", "=", PDF_CACHE_MARKER),
+            ]
+        )
+
+    def _invalidate_pdf_cache(self):
+        self._get_pdf_cache_attachments().unlink()
+        final = self.filtered(lambda rec: rec.state in self._pdf_cache_final_states)
+        if final:
+            final._schedule_pdf_prerender()
+
+    def _schedule_pdf_prerender(self):
+        self.sudo().write({"pdf_cache_pending": True})
+        cron = self.env.ref("bd_pdf_builder.ir_cron_prerender_pdf_cache", raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    def _pdf_cache_affected_by(self, vals):
+        roots = {path.split(".", 1)[0] for path in self._pdf_cache_fields}
+        roots.add("state")
+        return bool(roots.intersection(vals))
+
+    def write(self, vals):
+        if "pdf_cache_pending" in vals or not self._pdf_cache_affected_by(vals):
+            return super().write(vals)
+        res = super().write(vals)
+        self._invalidate_pdf_cache()
+        return res
+
+    def _prerender_pdf_cache(self):
+        report = self.env.ref(self._pdf_cache_report_xmlid, raise_if_not_found=False)
+        for record in self:
+            if report and record.state in self._pdf_cache_final_states:
+                report.sudo()._render_qweb_pdf(report.report_name, res_ids=record.ids)
+            record.sudo().write({"pdf_cache_pending": False})
+
+    @api.model
+    def _cron_prerender_pdf_cache(self, limit=20):
+        """Render pending documents; return ``True`` when more remain."""
+        records = self.sudo().search([("pdf_cache_pending", "=", True)], limit=limit)
+        records._prerender_pdf_cache()
+        return len(records) == limit
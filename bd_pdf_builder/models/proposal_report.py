@@ -4,27 +4,68 @@ from odoo.exceptions import UserError
 
 
 class BdProposal(models.Model):
-    _inherit = "bd.proposal"
+    _name = "bd.proposal"
+    _inherit = ["bd.proposal", "bd.pdf.cache.mixin"]
+
+    _pdf_cache_report_xmlid = "bd_pdf_builder.action_proposal_pdf"
+    _pdf_cache_title = "Proposal"
+    _pdf_cache_fields = (
+        "company_id",
+        "code",
+        "name",
+        "date",
+        "partner_id.display_name",
+        "client_id.display_name",
+        "reviewer_id.name",
+        "create_uid.name",
+        "approved_by.name",
+        "currency_id.symbol",
+        "currency_id.name",
+        "proposal_type",
+        "retainer_type",
+        "billing_type",
+        "lawyer_employee_id.name",
+        "lawyer_id.display_name",
+        "client_code",
+        "scope_of_work",
+        "services_description",
+        "legal_fees_lines",
+        "legal_fees",
+        "total_legal_fees",
+        "total_amount",
+        "payment_terms",
+        "terms_conditions",
+        "client_attachment_ids",
+    )
 
     def _get_report_image_attachments(self):
+        """Image attachments listed in the proposal PDF.
+
+        Selection relies on attachment metadata only; binaries are never loaded.
+        Client attachments are kept even when they back a binary field
+        (``res_field`` set); the proposal's own attachments exclude those, as
+        the default attachment search did.
+        """
         self.ensure_one()
         attachment_model = self.env["ir.attachment"].sudo()
-        report_attachments = attachment_model.search(
+        attachments = attachment_model.search(
             [
+                "|",
+                ("id", "in", self.client_attachment_ids.ids),
+                "&",
+                "&",
                 ("res_model", "=", self._name),
                 ("res_id", "=", self.id),
+                ("res_field", "=", False),
+                ("mimetype", "=like", "image/%"),
+                ("file_size", ">", 0),
             ],
             order="id",
         )
-        attachments = (self.client_attachment_ids | report_attachments).sorted(lambda att: att.id)
 
         unique_attachments = attachment_model.browse()
         seen = set()
         for attachment in attachments:
-            if not attachment.datas:
-                continue
-            if not (attachment.mimetype or "").startswith("image/"):
-                continue
             key = attachment.checksum or (attachment.name, attachment.file_size, attachment.mimetype)
             if key in seen:
                 continue
@@ -32,6 +73,11 @@ class BdProposal(models.Model):
             unique_attachments |= attachment
         return unique_attachments
 
+    def _get_pdf_cache_values(self):
+        values = super()._get_pdf_cache_values()
+        values.append(("image_attachments", self._get_report_image_attachments().mapped("checksum")))
+        return values
+
     def action_print_proposal(self):
         for proposal in self:
             if proposal.state != "approved_client":
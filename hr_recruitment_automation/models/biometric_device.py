@@ -58,10 +58,10 @@ class HrBiometricDevice(models.Model):
     def _resolve_employee(self, user_code):
         if not user_code:
             return self.env["hr.employee"]
-        employee = self.env["hr.employee"].search([("biometric_user_code", "=", user_code)], limit=1)
-        if employee:
-            return employee
-        return self.env["hr.employee"].search([("barcode", "=", user_code)], limit=1)
+        employee_id = self.env["qlk.identity.resolver"].employee_for_device_codes(
+            [user_code], code_fields=("biometric_user_code", "barcode")
+        ).get(user_code)
+        return self.env["hr.employee"].browse(employee_id or [])
 
     def _apply_attendance_event(self, employee, event_type, event_dt):
         Attendance = self.env["hr.attendance"].sudo()
@@ -206,16 +206,26 @@ class HrEmployee(models.Model):
     def cron_deactivate_after_notice_period(self):
         # هذا الكرون يُعطل المستخدم والموظف بعد انتهاء فترة الإشعار 15 يوم.
         today = fields.Date.context_today(self)
-        employees = self.search([
-            ("resignation_approved", "=", True),
-            ("notice_period_end", "!=", False),
-            ("notice_period_end", "<=", today),
-            ("active", "=", True),
-        ])
-        for employee in employees:
-            employee.active = False
-            if employee.user_id:
-                employee.user_id.sudo().active = False
+
+        def deactivate(employees):
+            for employee in employees:
+                employee.active = False
+                if employee.user_id:
+                    employee.user_id.sudo().active = False
+
+        self.env["qlk.cron.cursor"]._run_batched(
+            "hr.employee.deactivate_after_notice_period",
+            self,
+            [
+                ("resignation_approved", "=", True),
+                ("notice_period_end", "!=", False),
+                ("notice_period_end", "<=", today),
+                ("active", "=", True),
+            ],
+            deactivate,
+            cron_xmlid="hr_recruitment_automation.ir_cron_resignation_deactivation",
+            pass_key=str(today),
+        )
 
     @api.model
     def cron_send_weekly_hours_reminder(self):
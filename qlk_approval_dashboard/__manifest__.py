@@ -15,6 +15,7 @@ hours, and lets authorized users approve or reject records from a single OWL vie
     "depends": [
         "base",
         "web",
+        "bus",
         "qlk_security_base",
         "qlk_management",
     ],
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
 
+from . import base
 from . import dashboard_service
 from . import ir_ui_menu
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, models
+
+
+class Base(models.AbstractModel):
+    _inherit = "base"
+
+    def _qlk_approval_pending_partners(self, state_field):
+        """Partners to notify when pending records of an approval model change."""
+        dashboard = self.env["qlk.approval.dashboard"]
+        pending_states = dashboard.PENDING_STATES
+        records = self.filtered(lambda record: record[state_field] in pending_states)
+        return dashboard._approval_partners(records) if records else self.env["res.partner"]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        state_field = self.env["qlk.approval.dashboard"]._approval_state_field(self._name)
+        if state_field and records:
+            self.env["qlk.approval.dashboard"]._notify_pending_changed(
+                records._qlk_approval_pending_partners(state_field)
+            )
+        return records
+
+    def write(self, vals):
+        state_field = self.env["qlk.approval.dashboard"]._approval_state_field(self._name)
+        if not state_field or state_field not in vals:
+            return super().write(vals)
+        dashboard = self.env["qlk.approval.dashboard"]
+        # Records leaving the pending state notify their previous audience.
+        partners = self._qlk_approval_pending_partners(state_field)
+        res = super().write(vals)
+        partners |= self._qlk_approval_pending_partners(state_field)
+        dashboard._notify_pending_changed(partners)
+        return res
+
+    def unlink(self):
+        state_field = self.env["qlk.approval.dashboard"]._approval_state_field(self._name)
+        partners = self._qlk_approval_pending_partners(state_field) if state_field else False
+        res = super().unlink()
+        if partners:
+            self.env["qlk.approval.dashboard"]._notify_pending_changed(partners)
+        return res
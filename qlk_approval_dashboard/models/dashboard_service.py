@@ -3,11 +3,16 @@
 from odoo import _, api, models
 from odoo.exceptions import AccessError, UserError
 from odoo.osv import expression
+from odoo.addons.qlk_management.models.perf_sample import instrument
 
 
 class QlkApprovalDashboard(models.AbstractModel):
     _name = "qlk.approval.dashboard"
     _description = "Approval Dashboard Service"
+    _QUERY_BUDGETS = {
+        "get_dashboard_data": 60,
+        "get_pending_count": 30,
+    }
 
     DASHBOARD_ACCESS_GROUPS = (
         "qlk_approval_dashboard.group_qlk_approval_dashboard_user",
@@ -57,11 +62,10 @@ class QlkApprovalDashboard(models.AbstractModel):
     )
 
     def _has_existing_group(self, xmlid):
-        group = self.env.ref(xmlid, raise_if_not_found=False)
-        return bool(group and group.id in self.env.user._get_group_ids())
+        return self.env["qlk.user.access.context"].has_group(xmlid)
 
     def _has_any_existing_group(self, group_xmlids):
-        return any(self._has_existing_group(xmlid) for xmlid in group_xmlids)
+        return self.env["qlk.user.access.context"].has_any_group(group_xmlids)
 
     def _ensure_dashboard_access(self):
         if not self._has_any_existing_group(self.DASHBOARD_ACCESS_GROUPS):
@@ -123,7 +127,7 @@ class QlkApprovalDashboard(models.AbstractModel):
             return True
         if acl_records.filtered(lambda acl: not acl.group_id):
             return True
-        user_group_ids = set(self.env.user._get_group_ids())
+        user_group_ids = self.env["qlk.user.access.context"]._get().group_ids
         acl_group_ids = set(acl_records.mapped("group_id").ids)
         return bool(user_group_ids & acl_group_ids)
 
@@ -141,10 +145,13 @@ class QlkApprovalDashboard(models.AbstractModel):
             return False
         return True
 
+    def _is_approval_model_candidate(self, model_name):
+        return not model_name.startswith(("base.", "bus.", "ir.", "mail.", "res.", "web."))
+
     def _approval_model_configs(self):
         configs = []
         for model_name in sorted(self.env.registry.models):
-            if model_name.startswith(("base.", "bus.", "ir.", "mail.", "res.", "web.")):
+            if not self._is_approval_model_candidate(model_name):
                 continue
             if model_name not in self.env or not self._can_view_model(model_name):
                 continue
@@ -167,20 +174,7 @@ class QlkApprovalDashboard(models.AbstractModel):
         return bool(self._approval_model_configs())
 
     def _team_employee_ids(self):
-        user = self.env.user
-        employees = user.employee_ids
-        if not employees and getattr(user, "employee_id", False):
-            employees = user.employee_id
-        if not employees or "hr.employee" not in self.env:
-            return []
-        employee_model = self.env["hr.employee"]
-        domain = expression.OR(
-            [
-                [("id", "in", employees.ids)],
-                [("parent_id", "in", employees.ids)],
-            ]
-        )
-        return employee_model.search(domain).ids
+        return list(self.env["qlk.user.access.context"]._get().team_employee_ids)
 
     def _scoped_domain(self, model_name, scope):
         if scope == "all" and self._is_manager():
@@ -188,9 +182,7 @@ class QlkApprovalDashboard(models.AbstractModel):
 
         model = self.env[model_name]
         user = self.env.user
-        employee_ids = user.employee_ids.ids
-        if getattr(user, "employee_id", False):
-            employee_ids = list(set(employee_ids + [user.employee_id.id]))
+        employee_ids = list(self.env["qlk.user.access.context"]._get().employee_ids)
         if scope == "team" and self._is_manager():
             employee_ids = self._team_employee_ids() or employee_ids
 
@@ -335,6 +327,7 @@ class QlkApprovalDashboard(models.AbstractModel):
                 return order
         return "id desc"
 
+    @instrument()
     def _section_payload(self, config, scope):
         model = self.env[config["model"]]
         scope_domain = self._scoped_domain(config["model"], scope)
@@ -392,10 +385,21 @@ class QlkApprovalDashboard(models.AbstractModel):
             total = round(float(total_group[0].get(amount_field) or 0.0), 2) if total_group else 0.0
             return {"total": total, "by_user": [], "model": model._name, "domain": domain}
 
-        try:
-            groups = model.read_group(domain, [amount_field, user_field], [user_field], lazy=False)
-        except AccessError:
-            groups = []
+        rollup = self.env["qlk.hours.daily"]
+        if model._name == "qlk.task":
+            rollup_rows = rollup.read_task_hours(domain, [user_field])
+        else:
+            rollup_rows = rollup.read_timesheet_hours(domain, [user_field])
+        if rollup_rows is not None:
+            groups = [
+                {user_field: user and (user.id, user.display_name), amount_field: hours}
+                for user, hours in rollup_rows
+            ]
+        else:
+            try:
+                groups = model.read_group(domain, [amount_field, user_field], [user_field], lazy=False)
+            except AccessError:
+                groups = []
         rows = []
         total = 0.0
         for group in groups:
@@ -424,6 +428,7 @@ class QlkApprovalDashboard(models.AbstractModel):
         }
 
     @api.model
+    @instrument()
     def get_dashboard_data(self, scope="mine", active_model=False):
         self._ensure_dashboard_access()
         if scope == "all" and not self._is_manager():
@@ -474,10 +479,83 @@ class QlkApprovalDashboard(models.AbstractModel):
         }
 
     @api.model
+    @instrument()
     def get_pending_count(self):
+        """Pending total of the "mine" scope, without building the dashboard."""
         self._ensure_dashboard_access()
-        data = self.get_dashboard_data(scope="mine")
-        return data.get("kpis", {}).get("pending", {}).get("value", 0)
+        return sum(
+            self._safe_count(
+                self.env[config["model"]],
+                expression.AND(
+                    [
+                        self._scoped_domain(config["model"], "mine"),
+                        self._state_domain(config["state"], "pending"),
+                    ]
+                ),
+            )
+            for config in self._approval_model_configs()
+        )
+
+    # ------------------------------------------------------------------------------
+    # Pending badge push: approval state changes notify the users involved on
+    # their bus channel, so clients refresh the badge instead of polling.
+    # ------------------------------------------------------------------------------
+    def _register_hook(self):
+        super()._register_hook()
+        state_fields = {}
+        for model_name in self.env.registry.models:
+            if not self._is_approval_model_candidate(model_name):
+                continue
+            model = self.env[model_name]
+            if model._abstract or model._transient:
+                continue
+            state_info = self._state_info(model)
+            if state_info and self._has_decision_methods(model):
+                state_fields[model_name] = state_info["field"]
+        self.env.registry.qlk_approval_state_fields = state_fields
+
+    @api.model
+    def _approval_state_field(self, model_name):
+        return getattr(self.env.registry, "qlk_approval_state_fields", {}).get(model_name)
+
+    @api.model
+    def _approval_partners(self, records):
+        """Partners of the users whose "mine" scope includes ``records``."""
+        records = records.sudo()
+        users = self.env["res.users"]
+        for field_name in (
+            "reviewer_id",
+            "user_id",
+            "owner_id",
+            "assigned_user_id",
+            "lawyer_user_id",
+            "requested_by",
+            "approval_requested_by",
+            "create_uid",
+        ):
+            field = records._fields.get(field_name)
+            if field and field.type == "many2one" and field.comodel_name == "res.users":
+                users |= records.mapped(field_name)
+        for field_name in (
+            "employee_id",
+            "responsible_employee_id",
+            "lawyer_employee_id",
+            "employee_ids",
+            "assigned_employee_ids",
+            "lawyer_ids",
+        ):
+            field = records._fields.get(field_name)
+            if field and field.comodel_name == "hr.employee":
+                users |= records.mapped(field_name).user_id
+        return users.filtered(lambda user: not user.share).partner_id
+
+    @api.model
+    def _notify_pending_changed(self, partners):
+        if not partners or "bus.bus" not in self.env:
+            return
+        self.env["bus.bus"]._sendmany(
+            [(partner, "qlk_approval_pending_changed", {}) for partner in partners]
+        )
 
     def _approve_method(self, record, state_value):
         if state_value == "waiting_client_approval" and hasattr(record, "action_client_approve"):
@@ -3,6 +3,7 @@
 import { Component, onWillStart, useState } from "@odoo/owl";
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
+import { debounce } from "@web/core/utils/timing";
 import { _t } from "@web/core/l10n/translation";
 
 class ApprovalDashboard extends Component {
@@ -215,13 +216,18 @@ class ApprovalDashboard extends Component {
 ApprovalDashboard.template = "qlk_approval_dashboard.ApprovalDashboard";
 registry.category("actions").add("qlk.approval.dashboard", ApprovalDashboard);
 
+// The badge is fetched once, then refreshed only when the server pushes
+// "qlk_approval_pending_changed" on the user's bus channel. While the bus is
+// disconnected a slow poll keeps the badge roughly up to date.
+const BADGE_FALLBACK_POLL_MS = 300000;
+
 registry.category("services").add("qlk_approval_dashboard_badge", {
-    dependencies: ["orm"],
-    start(env, { orm }) {
+    dependencies: ["orm", "bus_service"],
+    start(env, { orm, bus_service }) {
         const updateBadge = async () => {
             let count = 0;
             try {
-                count = await orm.call("qlk.approval.dashboard", "get_pending_count", []);
+                count = await orm.silent.call("qlk.approval.dashboard", "get_pending_count", []);
             } catch {
                 return;
             }
@@ -245,12 +251,32 @@ registry.category("services").add("qlk_approval_dashboard_badge", {
             }
             badge.textContent = count > 99 ? "99+" : String(count);
         };
+        // Several records often change in one transaction: refresh once.
+        const scheduleUpdate = debounce(updateBadge, 1000);
+
+        let fallbackTimer = null;
+        const startFallbackPoll = () => {
+            if (!fallbackTimer) {
+                fallbackTimer = setInterval(updateBadge, BADGE_FALLBACK_POLL_MS);
+            }
+        };
+        const stopFallbackPoll = () => {
+            clearInterval(fallbackTimer);
+            fallbackTimer = null;
+        };
+
+        bus_service.subscribe("qlk_approval_pending_changed", scheduleUpdate);
+        bus_service.addEventListener("disconnect", startFallbackPoll);
+        bus_service.addEventListener("reconnect", () => {
+            stopFallbackPoll();
+            scheduleUpdate();
+        });
+        bus_service.start();
         setTimeout(updateBadge, 2500);
-        const timer = setInterval(updateBadge, 60000);
         return {
             updateBadge,
             stop() {
-                clearInterval(timer);
+                stopFallbackPoll();
             },
         };
     },
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+{
+    "name": "QLK Benchmark",
+    "version": "18.0.1.0.0",
+    "summary": "Synthetic law-firm dataset generator and dashboard benchmark runner.",
+    "description": """
+Generates a seeded, realistic QLK dataset (client files, engagement letters,
+projects, cases, hearings, tasks, timesheets, biometric logs, notifications)
+and times every dashboard entry point and cron with its SQL query count.
+
+Usage: odoo-bin qlk_benchmark -d <db> --clients 200 --seed 42 --output bench.json
+""",
+    "author": "Qlink Software",
+    "website": "http://www.qlinksoftware.com",
+    "category": "QLK - Management",
+    "license": "LGPL-3",
+    "depends": [
+        "qlk_management",
+        "qlk_law_dashboard",
+        "qlk_requests",
+        "qlk_approval_dashboard",
+        "qlk_executive_dashboard",
+        "qlk_dynamic_analysis_dashboard",
+    ],
+    "data": [],
+    "installable": True,
+    "application": False,
+}
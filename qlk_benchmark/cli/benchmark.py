@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""``odoo-bin qlk_benchmark -d <db>``: seed a synthetic firm and time dashboards."""
+
+import argparse
+import json
+import sys
+
+import odoo
+from odoo.cli import Command
+
+
+class QlkBenchmark(Command):
+    """Generate a seeded synthetic dataset and benchmark dashboards and crons."""
+
+    name = "qlk_benchmark"
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(
+            prog="%s %s" % (sys.argv[0].split("/")[-1], self.name),
+            description=self.__doc__,
+        )
+        parser.add_argument("-c", "--config", dest="config", help="Odoo configuration file")
+        parser.add_argument("-d", "--database", dest="db_name", required=True)
+        parser.add_argument("--clients", type=int, default=50, help="Number of synthetic client files.")
+        parser.add_argument("--lawyers", type=int, default=20, help="Number of synthetic lawyers.")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed of the dataset.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per entry point.")
+        parser.add_argument("--login", help="Run the dashboards as this user (default: superuser).")
+        parser.add_argument("--no-crons", action="store_true", help="Only benchmark dashboards.")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+        parser.add_argument(
+            "--keep-data",
+            action="store_true",
+            help="Commit the generated dataset instead of rolling it back.",
+        )
+        args = parser.parse_args(cmdargs)
+
+        config_args = ["-d", args.db_name]
+        if args.config:
+            config_args += ["-c", args.config]
+        odoo.tools.config.parse_config(config_args)
+
+        registry = odoo.modules.registry.Registry(args.db_name)
+        with registry.cursor() as cr:
+            env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+            dataset = env["qlk.benchmark.generator"].generate(
+                clients=args.clients, lawyers=args.lawyers, seed=args.seed
+            )
+            if args.login:
+                user = env["res.users"].search([("login", "=", args.login)], limit=1)
+                if not user:
+                    parser.error("Unknown login %s" % args.login)
+                env = env(user=user)
+            results = env["qlk.benchmark.runner"].run(
+                repeat=args.repeat, include_crons=not args.no_crons
+            )
+            if args.keep_data:
+                cr.commit()
+            else:
+                cr.rollback()
+
+        report = {
+            "database": args.db_name,
+            "seed": args.seed,
+            "dataset": dataset,
+            "results": results,
+        }
+        if args.output:
+            with open(args.output, "w") as output:
+                json.dump(report, output, indent=2, default=str)
+        else:
+            json.dump(report, sys.stdout, indent=2, default=str)
+            sys.stdout.write("\n")
+        return 0
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import benchmark_data
+from . import benchmark_runner
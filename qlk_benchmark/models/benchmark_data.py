@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""Seeded synthetic law-firm dataset for dashboard and cron benchmarks."""
+
+import json
+import logging
+import random
+from datetime import timedelta
+
+from odoo import Command, api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+BENCH_PREFIX = "BENCH"
+
+# Relative weights, roughly matching the firm's production mix.
+SERVICE_WEIGHTS = {"litigation": 6, "corporate": 3, "arbitration": 1}
+PROJECTS_PER_CLIENT = ([1, 2, 3, 5], [6, 3, 2, 1])
+CASES_PER_PROJECT = ([0, 1, 2, 4], [2, 5, 3, 1])
+HEARINGS_PER_CASE = ([0, 1, 3, 6], [2, 4, 3, 1])
+TASKS_PER_PROJECT = ([2, 5, 10, 25], [3, 4, 2, 1])
+APPROVAL_WEIGHTS = {"draft": 2, "waiting": 2, "approved": 5, "rejected": 1}
+
+
+class QlkBenchmarkGenerator(models.AbstractModel):
+    _name = "qlk.benchmark.generator"
+    _description = "QLK Benchmark Dataset Generator"
+
+    @api.model
+    def _filter_vals(self, model_name, vals):
+        """Drop keys the installed model does not define (optional modules)."""
+        model_fields = self.env[model_name]._fields
+        return {key: value for key, value in vals.items() if key in model_fields}
+
+    @api.model
+    def _create(self, model_name, vals_list):
+        return self.env[model_name].sudo().with_context(
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_notrack=True,
+            skip_assignment_date_sync=True,
+        ).create([self._filter_vals(model_name, vals) for vals in vals_list])
+
+    @api.model
+    def _weighted(self, rng, weights):
+        return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    @api.model
+    def _create_staff(self, lawyers, tag=BENCH_PREFIX):
+        lawyer_group = self.env.ref("qlk_law.group_qlk_law_lawyer", raise_if_not_found=False)
+        group_ids = lawyer_group.ids if lawyer_group else []
+        users = self._create(
+            "res.users",
+            [
+                {
+                    "name": "%s Lawyer %03d" % (tag, index),
+                    "login": "%s-lawyer-%03d@example.com" % (tag.lower(), index),
+                    "email": "%s-lawyer-%03d@example.com" % (tag.lower(), index),
+                    "groups_id": [Command.set(group_ids)],
+                }
+                for index in range(lawyers)
+            ],
+        )
+        employees = self._create(
+            "hr.employee",
+            [{"name": user.name, "user_id": user.id} for user in users],
+        )
+        # Two-level hierarchy: one manager per group of eight lawyers.
+        for index, employee in enumerate(employees):
+            if index % 8:
+                employee.parent_id = employees[index - index % 8]
+        return employees
+
+    @api.model
+    def generate(self, clients=50, lawyers=20, seed=42, tag=None):
+        """Create a dataset of ``clients`` client files and related records.
+
+        The same ``seed`` always yields the same shape of data, so results of
+        two benchmark runs on different commits are comparable. Unique keys
+        carry ``tag`` (derived from the seed by default), so several datasets,
+        even of the same seed, can coexist.
+        """
+        rng = random.Random(seed)
+        tag = tag or "%s-%s" % (BENCH_PREFIX, seed)
+        today = fields.Date.context_today(self)
+        stats = {}
+
+        employees = self._create_staff(lawyers, tag=tag)
+        service_types = {
+            service.code: service
+            for service in self.env["qlk.legal.service.type"].sudo().search([])
+        }
+        degrees = self.env["qlk.litigation.degree"].sudo().search([])
+
+        partners = self._create(
+            "res.partner",
+            [
+                {
+                    "name": "%s Client %05d" % (tag, index),
+                    "customer_rank": 1,
+                    "identity_type": "other",
+                    "identity_number": "%s-%05d" % (tag, index),
+                    "email": "%s-client-%05d@example.com" % (tag.lower(), index),
+                }
+                for index in range(clients)
+            ],
+        )
+        stats["clients"] = len(partners)
+
+        letters_vals = []
+        for partner in partners:
+            service = self._weighted(rng, SERVICE_WEIGHTS)
+            lawyer = rng.choice(employees)
+            letters_vals.append(
+                {
+                    "reference": "%s Agreement %s" % (BENCH_PREFIX, partner.id),
+                    "partner_id": partner.id,
+                    "contract_type": "hours",
+                    "service_type": service,
+                    "approval_role": "manager",
+                    "state": rng.choices(
+                        ["approved_client", "waiting_manager_approval", "draft"], [7, 2, 1]
+                    )[0],
+                    "planned_hours": rng.choice([20.0, 50.0, 100.0, 250.0]),
+                    "legal_service_type_ids": [Command.set(service_types[service].ids)]
+                    if service in service_types
+                    else [],
+                    "litigation_degree_ids": [Command.set(degrees[:2].ids)]
+                    if service == "litigation"
+                    else [],
+                    "lawyer_ids": [Command.set(lawyer.ids)],
+                }
+            )
+        letters = self._create("bd.engagement.letter", letters_vals)
+        stats["engagement_letters"] = len(letters)
+
+        client_files = self._create(
+            "qlk.client.file",
+            [
+                {
+                    "name": "%s File %s" % (BENCH_PREFIX, letter.partner_id.id),
+                    "partner_id": letter.partner_id.id,
+                    "service_profile_type": letter.service_type,
+                    "legal_service_type_ids": [Command.set(letter.legal_service_type_ids.ids)],
+                    "allowed_litigation_degree_ids": [Command.set(letter.litigation_degree_ids.ids)],
+                    "engagement_ids": [Command.set(letter.ids)],
+                    "poa_status": "verified",
+                }
+                for letter in letters
+            ],
+        )
+        stats["client_files"] = len(client_files)
+
+        projects = self.env["qlk.project"]
+        for client_file, letter in zip(client_files, letters):
+            if letter.state != "approved_client":
+                continue
+            letter.sudo().write({"client_file_id": client_file.id})
+            values = client_file._prepare_project_vals_from_engagement(letter)
+            count = rng.choices(*PROJECTS_PER_CLIENT)[0]
+            projects |= self.env["qlk.project"].sudo().with_context(
+                create_from_client_file=True,
+                tracking_disable=True,
+            ).create(
+                [
+                    dict(values, name="%s Project %s-%s" % (BENCH_PREFIX, client_file.id, number))
+                    for number in range(count)
+                ]
+            )
+        stats["projects"] = len(projects)
+
+        case_vals, corporate_vals, arbitration_vals = [], [], []
+        for project in projects:
+            service = project.engagement_letter_id.service_type
+            lawyer = project.lawyer_id or rng.choice(employees)
+            for number in range(rng.choices(*CASES_PER_PROJECT)[0]):
+                start = today - timedelta(days=rng.randint(0, 720))
+                if service == "litigation":
+                    case_vals.append(
+                        {
+                            "name": "%s Case %s-%s" % (BENCH_PREFIX, project.id, number),
+                            "name2": "%s Case %s-%s" % (BENCH_PREFIX, project.id, number),
+                            "case_number": rng.randint(1, 99999),
+                            "case_year": str(start.year),
+                            "folder_number": rng.randint(1, 99999),
+                            "folder_year": str(start.year),
+                            "date": start,
+                            "client_id": project.client_id.id,
+                            "opponent_id": rng.choice(partners).id,
+                            "litigation_flow": "litigation",
+                            "employee_id": lawyer.id,
+                            "project_id": project.id,
+                            "litigation_degree_id": project.engagement_letter_id.litigation_degree_ids[:1].id,
+                        }
+                    )
+                elif service == "corporate":
+                    corporate_vals.append(
+                        {
+                            "name": "%s Corporate %s-%s" % (BENCH_PREFIX, project.id, number),
+                            "project_id": project.id,
+                            "client_file_id": project.client_file_id.id,
+                            "client_id": project.client_id.id,
+                            "engagement_id": project.engagement_letter_id.id,
+                            "responsible_employee_id": lawyer.id,
+                        }
+                    )
+                else:
+                    arbitration_vals.append(
+                        {
+                            "name": "%s Arbitration %s-%s" % (BENCH_PREFIX, project.id, number),
+                            "project_id": project.id,
+                            "client_file_id": project.client_file_id.id,
+                            "claimant_id": project.client_id.id,
+                            "engagement_id": project.engagement_letter_id.id,
+                            "responsible_employee_id": lawyer.id,
+                        }
+                    )
+        cases = self._create("qlk.case", case_vals)
+        stats["litigation_cases"] = len(cases)
+        stats["corporate_cases"] = len(self._create("qlk.corporate.case", corporate_vals))
+        stats["arbitration_cases"] = len(self._create("qlk.arbitration.case", arbitration_vals))
+
+        hearing_vals = []
+        for case in cases:
+            for number in range(rng.choices(*HEARINGS_PER_CASE)[0]):
+                hearing_vals.append(
+                    {
+                        "name": "%s Hearing %s-%s" % (BENCH_PREFIX, case.id, number),
+                        "case_id": case.id,
+                        "date": today + timedelta(days=rng.randint(-180, 90)),
+                        "employee_id": case.employee_id.id,
+                    }
+                )
+        stats["hearings"] = len(self._create("qlk.hearing", hearing_vals))
+
+        task_vals = []
+        for project in projects:
+            department = project.engagement_letter_id.service_type or "management"
+            for number in range(rng.choices(*TASKS_PER_PROJECT)[0]):
+                employee = rng.choice(employees)
+                hours = round(rng.lognormvariate(0.5, 0.7), 2) or 0.25
+                task_vals.append(
+                    {
+                        "name": "%s Task %s-%s" % (BENCH_PREFIX, project.id, number),
+                        "department": department,
+                        "employee_id": employee.id,
+                        "project_id": project.id,
+                        "engagement_id": project.engagement_letter_id.id,
+                        "hours_spent": hours,
+                        "required_hours": hours,
+                        "date_start": today - timedelta(days=rng.randint(0, 365)),
+                        "approval_state": self._weighted(rng, APPROVAL_WEIGHTS),
+                    }
+                )
+        stats["tasks"] = len(self._create("qlk.task", task_vals))
+
+        timesheet_count = 0
+        for case in cases[: max(1, len(cases) // 4)]:
+            task = self._create(
+                "project.task",
+                [{"name": "%s Timesheet Task %s" % (BENCH_PREFIX, case.id), "case_id": case.id}],
+            )
+            if not task.project_id:
+                continue
+            lines = self._create(
+                "account.analytic.line",
+                [
+                    {
+                        "name": "%s Timesheet" % BENCH_PREFIX,
+                        "date": today - timedelta(days=rng.randint(0, 180)),
+                        "employee_id": case.employee_id.id or rng.choice(employees).id,
+                        "project_id": task.project_id.id,
+                        "task_id": task.id,
+                        "unit_amount": round(rng.uniform(0.25, 6.0), 2),
+                    }
+                    for _index in range(rng.randint(1, 8))
+                ],
+            )
+            timesheet_count += len(lines)
+        stats["timesheets"] = timesheet_count
+
+        device = self._create(
+            "qlk.biometric.device",
+            [{"name": "%s Device" % BENCH_PREFIX, "endpoint_url": "http://127.0.0.1/bench"}],
+        )
+        log_vals = []
+        for day in range(60):
+            for employee in employees:
+                for event_type, hour in (("check_in", 8), ("check_out", 17)):
+                    event_time = fields.Datetime.to_datetime(today - timedelta(days=day)) + timedelta(
+                        hours=hour, minutes=rng.randint(0, 59)
+                    )
+                    log_vals.append(
+                        {
+                            "device_id": device.id,
+                            "employee_id": employee.id,
+                            "device_user_code": str(employee.id),
+                            "event_time": event_time,
+                            "event_type": event_type,
+                            "external_ref": "%s-%s-%s-%s" % (tag, employee.id, day, event_type),
+                            "status": "processed",
+                            "raw_payload": json.dumps({"user": employee.id, "time": str(event_time)}),
+                        }
+                    )
+        stats["biometric_logs"] = len(self._create("qlk.biometric.log", log_vals))
+
+        notification_vals = []
+        for project in projects:
+            for user in (project.lawyer_id.user_id or rng.choice(employees).user_id):
+                notification_vals.append(
+                    {
+                        "name": "%s Project Assigned" % BENCH_PREFIX,
+                        "user_id": user.id,
+                        "notification_type": "project",
+                        "notification_date": fields.Datetime.now() - timedelta(days=rng.randint(0, 365)),
+                        "project_id": project.id,
+                        "target_model": "qlk.project",
+                        "target_res_id": project.id,
+                        "state": rng.choices(["read", "unread"], [4, 1])[0],
+                    }
+                )
+        stats["notifications"] = len(self._create("qlk.lawyer.notification", notification_vals))
+
+        self.env.flush_all()
+        _logger.info("QLK benchmark dataset generated: %s", stats)
+        return stats
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Time and query-count every dashboard entry point and QLK cron.
+
+Query budgets live on the guarded models as ``_QUERY_BUDGETS = {method: n}``
+class attributes; every class of the model may declare its own dict.
+"""
+
+import logging
+import statistics
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from odoo import api, models
+from odoo.exceptions import AccessError
+
+_logger = logging.getLogger(__name__)
+
+# (key, model, method, args, kwargs); entries whose model or method is not
+# installed are reported as skipped instead of failing the run.
+DASHBOARD_ENTRY_POINTS = [
+    ("executive", "qlk.executive.dashboard", "get_dashboard_data", (), {}),
+    ("approval.mine", "qlk.approval.dashboard", "get_dashboard_data", (), {"scope": "mine"}),
+    ("approval.all", "qlk.approval.dashboard", "get_dashboard_data", (), {"scope": "all"}),
+    ("approval.pending_count", "qlk.approval.dashboard", "get_pending_count", (), {}),
+    ("analysis", "qlk.analysis.dashboard", "get_dashboard_data", (), {"months": 6}),
+    ("dynamic_analysis", "qlk.dynamic.analysis.dashboard", "get_dashboard_data", (), {}),
+    ("lawyer", "qlk.lawyer.dashboard", "get_dashboard_data", (), {}),
+    ("court", "qlk.court.dashboard", "get_dashboard_data", (), {}),
+    ("department.corporate", "qlk.department.dashboard", "get_dashboard_data", ("corporate",), {}),
+    ("department.arbitration", "qlk.department.dashboard", "get_dashboard_data", ("arbitration",), {}),
+    ("bd", "qlk.bd.dashboard", "get_dashboard_data", (), {}),
+    ("management", "qlk.management.dashboard", "get_dashboard_data", (), {}),
+]
+
+CRON_ENTRY_POINTS = [
+    ("cron.daily_lawyer_reminder", "qlk.lawyer.notification", "cron_daily_lawyer_reminder", (), {}),
+    ("cron.engagement_retainer_usage", "bd.engagement.letter", "cron_check_retainer_usage", (), {}),
+    ("cron.proposal_retainer_usage", "bd.proposal", "cron_check_retainer_usage", (), {}),
+    ("cron.poa_alerts", "qlk.client.file", "_cron_check_poa_alerts", (), {}),
+    ("cron.deactivate_after_notice", "hr.employee", "cron_deactivate_users_after_notice", (), {}),
+    ("cron.weekly_hours_reminder", "qlk.hr.automation", "cron_send_weekly_hours_reminder", (), {}),
+    ("cron.biometric_sync", "qlk.biometric.device", "cron_sync_biometric_attendance", (), {}),
+]
+
+
+class QlkBenchmarkRunner(models.AbstractModel):
+    _name = "qlk.benchmark.runner"
+    _description = "QLK Benchmark Runner"
+
+    @api.model
+    def _get_entry_points(self, include_crons=True):
+        entry_points = list(DASHBOARD_ENTRY_POINTS)
+        if include_crons:
+            entry_points += CRON_ENTRY_POINTS
+        return entry_points
+
+    @api.model
+    def _get_query_budget(self, model_name, method_name):
+        """Return the declared query budget of a method, or ``None``."""
+        for cls in type(self.env[model_name]).__mro__:
+            budgets = cls.__dict__.get("_QUERY_BUDGETS") or {}
+            if method_name in budgets:
+                return budgets[method_name]
+        return None
+
+    @contextmanager
+    def _capture_queries(self):
+        """Collect the SQL text of every query run by this thread."""
+        queries = []
+
+        def hook(cr, query, params, start, delay):
+            queries.append(query.decode() if isinstance(query, bytes) else str(query))
+
+        thread = threading.current_thread()
+        if not hasattr(thread, "query_hooks"):
+            thread.query_hooks = []
+        thread.query_hooks.append(hook)
+        try:
+            yield queries
+        finally:
+            thread.query_hooks.remove(hook)
+
+    @api.model
+    def _measure(self, model_name, method_name, args, kwargs):
+        """Run one call in a savepoint with cold caches.
+
+        Return ``(seconds, queries)`` where ``queries`` is the list of
+        executed SQL statements.
+        """
+        cr = self.env.cr
+        self.env.invalidate_all()
+        self.env.registry.clear_cache()
+        with cr.savepoint(flush=False) as savepoint, self._capture_queries() as queries:
+            started = time.perf_counter()
+            # Batched crons commit per chunk unless told otherwise.
+            getattr(self.env[model_name].with_context(cron_no_commit=True), method_name)(*args, **kwargs)
+            self.env.flush_all()
+            elapsed = time.perf_counter() - started
+            executed = list(queries)
+            # Crons write; keep every measurement independent.
+            savepoint.rollback()
+        self.env.invalidate_all()
+        return elapsed, executed
+
+    @api.model
+    def format_queries(self, queries, limit=10):
+        """Summarize SQL statements, most repeated first, for reports and test failures."""
+        counter = queries if isinstance(queries, Counter) else Counter(queries)
+        return "\n".join(
+            "%4d x %s" % (count, " ".join(query.split())[:300])
+            for query, count in counter.most_common(limit)
+        )
+
+    @api.model
+    def run(self, repeat=3, include_crons=True, keys=None, capture_sql=False):
+        """Return ``{key: {...}}`` timings for every installed entry point.
+
+        Each entry point runs ``repeat`` times as the current user; the
+        median wall time and the query count of the last run are reported
+        with the budget declared on the model. ``capture_sql`` adds the
+        executed statements of the last run.
+        """
+        results = {}
+        for key, model_name, method_name, args, kwargs in self._get_entry_points(include_crons):
+            if keys and key not in keys:
+                continue
+            if model_name not in self.env or not hasattr(self.env[model_name], method_name):
+                results[key] = {"status": "skipped"}
+                continue
+            timings = []
+            queries = []
+            try:
+                for _run in range(max(1, repeat)):
+                    elapsed, queries = self._measure(model_name, method_name, args, kwargs)
+                    timings.append(elapsed)
+            except AccessError as error:
+                # Expected for roles without access to a dashboard: no traceback.
+                _logger.info("Benchmark entry point %s denied: %s", key, error)
+                results[key] = {"status": "denied", "error": str(error)}
+                continue
+            except Exception as error:  # Report the failure and keep benchmarking.
+                _logger.exception("Benchmark entry point %s failed", key)
+                results[key] = {"status": "error", "error": "%s: %s" % (type(error).__name__, error)}
+                continue
+            budget = self._get_query_budget(model_name, method_name)
+            results[key] = {
+                "status": "ok",
+                "model": model_name,
+                "method": method_name,
+                "median_ms": round(statistics.median(timings) * 1000, 2),
+                "max_ms": round(max(timings) * 1000, 2),
+                "queries": len(queries),
+                "budget": budget,
+                "over_budget": budget is not None and len(queries) > budget,
+            }
+            if capture_sql:
+                results[key]["sql"] = queries
+        return results
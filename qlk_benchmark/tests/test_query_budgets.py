@@ -0,0 +1,143 @@
+from collections import Counter
+
+from freezegun import freeze_time
+
+from odoo import Command
+from odoo.tests.common import TransactionCase, tagged
+
+# Extra queries tolerated between two dataset sizes (cache warm-up, prefetch
+# batch boundaries); anything above scales with data.
+QUERY_VOLUME_SLACK = 3
+
+# The dataset is added in identical increments (same seed, new tag) at a
+# fixed date, so every profile sees the same records and due dates.
+DATASET_INCREMENT = {"clients": 12, "lawyers": 6, "seed": 1}
+DATASET_INCREMENTS = 3
+FROZEN_NOW = "2026-03-04 09:00:00"
+
+# Roles that may be refused an entry point; the crons run as superuser.
+DENIABLE_ROLES = {"lawyer", "assistant"}
+
+ROLE_GROUPS = {
+    "manager": [
+        "qlk_task_management.group_task_manager",
+        "qlk_management.group_el_manager",
+        "qlk_management.group_bd_manager",
+        "qlk_management.group_reports_manager",
+        "qlk_law.group_qlk_law_manager",
+        "qlk_law_dashboard.group_qlk_law_dashboard_manager",
+        "qlk_approval_dashboard.group_qlk_approval_dashboard_manager",
+        "qlk_executive_dashboard.group_qlk_executive_dashboard_manager",
+        "qlk_dynamic_analysis_dashboard.group_qlk_dynamic_analysis_dashboard_manager",
+    ],
+    "lawyer": [
+        "qlk_law.group_qlk_law_lawyer",
+        "qlk_task_management.group_task_user",
+        "qlk_law_dashboard.group_qlk_law_dashboard_user",
+        "qlk_approval_dashboard.group_qlk_approval_dashboard_user",
+    ],
+    "assistant": [
+        "qlk_task_management.group_task_user",
+        "qlk_law_dashboard.group_qlk_law_dashboard_user",
+    ],
+}
+
+
+@tagged("post_install", "-at_install")
+class TestQueryBudgets(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.generator = cls.env["qlk.benchmark.generator"]
+        cls.runner = cls.env["qlk.benchmark.runner"]
+        cls.role_users = {}
+        for role, xmlids in ROLE_GROUPS.items():
+            groups = cls.env["res.groups"]
+            for xmlid in xmlids:
+                groups |= cls.env.ref(xmlid, raise_if_not_found=False) or groups.browse()
+            user = cls.env["res.users"].create(
+                {
+                    "name": "Query Budget %s" % role.title(),
+                    "login": "query-budget-%s-test" % role,
+                    "groups_id": [Command.link(cls.env.ref("base.group_user").id)]
+                    + [Command.link(group.id) for group in groups],
+                }
+            )
+            cls.env["hr.employee"].create({"name": user.name, "user_id": user.id})
+            cls.role_users[role] = user
+
+    def _profile(self):
+        profile = {}
+        for role, user in self.role_users.items():
+            results = self.runner.with_user(user).run(repeat=1, include_crons=False, capture_sql=True)
+            for key, result in results.items():
+                profile[(role, key)] = result
+        for key, result in self.runner.run(repeat=1, capture_sql=True).items():
+            if key.startswith("cron."):
+                profile[("cron", key)] = result
+        return profile
+
+    def _profiles(self):
+        profiles = []
+        with freeze_time(FROZEN_NOW):
+            for increment in range(DATASET_INCREMENTS):
+                self.generator.generate(tag="BENCH-QB%s" % increment, **DATASET_INCREMENT)
+                profiles.append(self._profile())
+        return profiles
+
+    def _check_status(self, entry, results):
+        for result in results:
+            if result["status"] == "denied" and entry[0] in DENIABLE_ROLES:
+                return False
+            # Skipped only when the optional module of the entry point is missing.
+            if result["status"] == "skipped":
+                return False
+            self.assertEqual(result["status"], "ok", "%s failed: %s" % (entry[1], result.get("error")))
+        return True
+
+    def _assert_budget(self, entry, result):
+        self.assertIsNotNone(
+            result["budget"],
+            "%s.%s declares no entry in _QUERY_BUDGETS" % (result["model"], result["method"]),
+        )
+        self.assertLessEqual(
+            result["queries"],
+            result["budget"],
+            "%s over its query budget (%s > %s):\n%s"
+            % (entry[1], result["queries"], result["budget"], self.runner.format_queries(result["sql"])),
+        )
+
+    def test_query_counts_stay_within_budget_and_flat(self):
+        profiles = self._profiles()
+        first, last = profiles[0], profiles[-1]
+
+        checked = 0
+        for entry in last:
+            results = [profile.get(entry) or {"status": "skipped"} for profile in profiles]
+            with self.subTest(role=entry[0], entry_point=entry[1]):
+                if not self._check_status(entry, results):
+                    continue
+                checked += 1
+                if entry[0] == "cron":
+                    # Crons work through every due record, in chunks: the
+                    # budget holds for one increment and each increment
+                    # costs the same number of queries.
+                    self._assert_budget(entry, first[entry])
+                    steps = [later["queries"] - earlier["queries"] for earlier, later in zip(results, results[1:])]
+                    growth = Counter(results[-1]["sql"]) - Counter(results[-2]["sql"])
+                    self.assertLessEqual(
+                        max(steps) - min(steps),
+                        QUERY_VOLUME_SLACK,
+                        "%s query count grows faster than its data (%s per increment); repeated queries:\n%s"
+                        % (entry[1], steps, self.runner.format_queries(growth)),
+                    )
+                    continue
+                self._assert_budget(entry, last[entry])
+                growth = Counter(last[entry]["sql"]) - Counter(first[entry]["sql"])
+                self.assertLessEqual(
+                    last[entry]["queries"] - first[entry]["queries"],
+                    QUERY_VOLUME_SLACK,
+                    "%s query count grows with data volume (%s -> %s); repeated queries:\n%s"
+                    % (entry[1], first[entry]["queries"], last[entry]["queries"], self.runner.format_queries(growth)),
+                )
+        self.assertTrue(checked, "No dashboard or cron entry point could be profiled")
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+{
+    "name": "QLK Database Indexes",
+    "version": "18.0.1.0.0",
+    "summary": "Managed composite and partial indexes for hot QLK queries.",
+    "description": """
+Declares the composite and partial PostgreSQL indexes used by QLK dashboards,
+approvals and crons, creates them concurrently after install/upgrade, and
+reports unused or missing indexes (odoo-bin qlk_index_report).
+""",
+    "author": "Qlink Software",
+    "website": "http://www.qlinksoftware.com",
+    "category": "QLK - Management",
+    "license": "LGPL-3",
+    "depends": [
+        "base",
+        "qlk_management",
+        "qlk_task_management",
+        "qlk_law_dashboard",
+    ],
+    "data": [
+        "data/index_cron.xml",
+    ],
+    "installable": True,
+    "application": False,
+}
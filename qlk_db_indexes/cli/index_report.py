@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""``odoo-bin qlk_index_report -d <db>``: managed/missing/unused index report."""
+
+import argparse
+import json
+import sys
+
+import odoo
+from odoo.cli import Command
+
+
+class QlkIndexReport(Command):
+    """Report missing managed indexes, unused indexes and seq-scan hotspots."""
+
+    name = "qlk_index_report"
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(
+            prog="%s %s" % (sys.argv[0].split("/")[-1], self.name),
+            description=self.__doc__,
+        )
+        parser.add_argument("-c", "--config", dest="config", help="Odoo configuration file")
+        parser.add_argument("-d", "--database", dest="db_name", required=True)
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=10000,
+            help="Only report sequential scans on tables with at least this many live rows.",
+        )
+        parser.add_argument(
+            "--create-missing",
+            action="store_true",
+            help="Build missing managed indexes concurrently before reporting.",
+        )
+        args = parser.parse_args(cmdargs)
+
+        config_args = ["-d", args.db_name]
+        if args.config:
+            config_args += ["-c", args.config]
+        odoo.tools.config.parse_config(config_args)
+
+        registry = odoo.modules.registry.Registry(args.db_name)
+        with registry.cursor() as cr:
+            env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+            index_model = env["qlk.db.index"]
+            if args.create_missing:
+                index_model._cron_create_missing_indexes()
+            report = index_model.get_index_report(min_table_rows=args.min_rows)
+        json.dump(report, sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+        return 1 if report["missing"] else 0
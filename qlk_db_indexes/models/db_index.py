@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""Managed index registry for hot QLK access patterns.
+
+Indexes are declared in ``MANAGED_INDEXES`` and created with
+``CREATE INDEX CONCURRENTLY`` outside the module-loading transaction, so
+upgrades never hold exclusive locks on large tables while they build.
+
+Patterns already served by existing indexes are intentionally not repeated:
+``qlk_biometric_log (device_id, external_ref)`` is covered by the
+``qlk_biometric_log_unique_ref`` constraint, and ``ir_attachment
+(res_model, res_id)`` by the core ``ir_attachment_res_idx``.
+"""
+
+import logging
+import threading
+from collections import namedtuple
+
+from odoo import api, models
+
+_logger = logging.getLogger(__name__)
+
+ManagedIndex = namedtuple("ManagedIndex", ["name", "table", "expression", "where", "reason"])
+
+MANAGED_INDEXES = [
+    ManagedIndex(
+        "qlk_lawyer_notification_user_type_date_idx",
+        "qlk_lawyer_notification",
+        "user_id, notification_type, notification_date DESC",
+        None,
+        "Lawyer notification center and daily summary counts per type.",
+    ),
+    ManagedIndex(
+        "qlk_lawyer_notification_unread_idx",
+        "qlk_lawyer_notification",
+        "user_id, notification_date DESC",
+        "state = 'unread'",
+        "Unread badge and dashboard notification list.",
+    ),
+    ManagedIndex(
+        "qlk_task_project_approval_idx",
+        "qlk_task",
+        "project_id, approval_state",
+        None,
+        "Project hour totals and approval dashboards per project.",
+    ),
+    ManagedIndex(
+        "qlk_task_engagement_approval_date_idx",
+        "qlk_task",
+        "engagement_id, approval_state, date_start",
+        None,
+        "Engagement hour consumption and retainer usage per period.",
+    ),
+    ManagedIndex(
+        "qlk_task_waiting_approval_idx",
+        "qlk_task",
+        "reviewer_id, approval_requested_on",
+        "approval_state = 'waiting'",
+        "Pending approval queues.",
+    ),
+    ManagedIndex(
+        "qlk_hearing_date_idx",
+        "qlk_hearing",
+        "date",
+        None,
+        "Hearings of the day for reminders and court dashboards.",
+    ),
+]
+
+
+class QlkDbIndex(models.AbstractModel):
+    _name = "qlk.db.index"
+    _description = "QLK Managed Index Registry"
+
+    @api.model
+    def _get_managed_indexes(self):
+        return list(MANAGED_INDEXES)
+
+    @api.model
+    def _existing_index_names(self):
+        self.env.cr.execute("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()")
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _invalid_index_names(self, names):
+        """Return the ``names`` whose index exists but is not valid.
+
+        An interrupted ``CREATE INDEX CONCURRENTLY`` leaves an index marked
+        invalid in ``pg_index``: it is listed in ``pg_indexes`` but the
+        planner never uses it, and ``IF NOT EXISTS`` would skip rebuilding it.
+        """
+        if not names:
+            return set()
+        self.env.cr.execute(
+            """
+            SELECT cls.relname
+              FROM pg_index idx
+              JOIN pg_class cls ON cls.oid = idx.indexrelid
+             WHERE NOT idx.indisvalid
+               AND cls.relnamespace = current_schema()::regnamespace
+               AND cls.relname IN %s
+            """,
+            [tuple(names)],
+        )
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _existing_tables(self):
+        self.env.cr.execute(
+            "SELECT tablename FROM pg_tables WHERE schemaname = current_schema()"
+        )
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _get_missing_indexes(self):
+        """Return the managed indexes to build, invalid leftovers included."""
+        managed = self._get_managed_indexes()
+        existing = self._existing_index_names() - self._invalid_index_names([index.name for index in managed])
+        tables = self._existing_tables()
+        return [index for index in managed if index.name not in existing and index.table in tables]
+
+    @api.model
+    def _index_statement(self, index, concurrently=True):
+        # Definitions are module constants, never user input.
+        statement = 'CREATE INDEX %sIF NOT EXISTS "%s" ON "%s" (%s)' % (
+            "CONCURRENTLY " if concurrently else "",
+            index.name,
+            index.table,
+            index.expression,
+        )
+        if index.where:
+            statement += " WHERE %s" % index.where
+        return statement
+
+    @api.model
+    def _schedule_index_creation(self):
+        if getattr(threading.current_thread(), "testing", False):
+            # Tests run inside a single transaction: build indexes inline.
+            missing = self._get_missing_indexes()
+            self._drop_invalid_indexes([index.name for index in missing])
+            for index in missing:
+                self.env.cr.execute(self._index_statement(index, concurrently=False))
+            return True
+        cron = self.env.ref("qlk_db_indexes.ir_cron_qlk_db_indexes", raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+        return True
+
+    @api.model
+    def _cron_create_missing_indexes(self):
+        missing = self._get_missing_indexes()
+        if not missing:
+            return True
+        self._drop_invalid_indexes([index.name for index in missing])
+        # CREATE INDEX CONCURRENTLY waits for every open snapshot, including
+        # this cron's own transaction, so end it before building.
+        self.env.cr.commit()
+        with self.env.registry.cursor() as cr:
+            cr._cnx.autocommit = True
+            try:
+                for index in missing:
+                    _logger.info("Creating managed index %s on %s", index.name, index.table)
+                    try:
+                        cr.execute(self._index_statement(index))
+                    except Exception:
+                        _logger.exception("Could not create managed index %s", index.name)
+            finally:
+                cr._cnx.autocommit = False
+        return True
+
+    @api.model
+    def _drop_invalid_indexes(self, names):
+        """Remove leftovers of interrupted concurrent builds so they are retried."""
+        for name in sorted(self._invalid_index_names(names)):
+            _logger.info("Dropping invalid managed index %s", name)
+            self.env.cr.execute('DROP INDEX IF EXISTS "%s"' % name)
+
+    # ------------------------------------------------------------------------------
+    # Diagnostics
+    # ------------------------------------------------------------------------------
+    @api.model
+    def get_index_report(self, min_table_rows=10000):
+        """Return managed index status, unused indexes and seq-scan hotspots."""
+        managed_indexes = self._get_managed_indexes()
+        existing = self._existing_index_names()
+        invalid = self._invalid_index_names([index.name for index in managed_indexes])
+        tables = self._existing_tables()
+        managed = [
+            {
+                "name": index.name,
+                "table": index.table,
+                "expression": index.expression,
+                "where": index.where,
+                "reason": index.reason,
+                "status": (
+                    "invalid"
+                    if index.name in invalid
+                    else "present"
+                    if index.name in existing
+                    else ("missing" if index.table in tables else "table_missing")
+                ),
+            }
+            for index in managed_indexes
+        ]
+
+        self.env.cr.execute(
+            """
+            SELECT stat.relname, stat.indexrelname, stat.idx_scan,
+                   pg_relation_size(stat.indexrelid)
+              FROM pg_stat_user_indexes stat
+              JOIN pg_index idx ON idx.indexrelid = stat.indexrelid
+             WHERE stat.idx_scan = 0
+               AND NOT idx.indisunique
+               AND NOT idx.indisprimary
+               AND (stat.relname LIKE %s OR stat.relname LIKE %s)
+          ORDER BY pg_relation_size(stat.indexrelid) DESC
+            """,
+            ["qlk\\_%", "bd\\_%"],
+        )
+        unused = [
+            {"table": table, "index": index, "scans": scans, "size_bytes": size}
+            for table, index, scans, size in self.env.cr.fetchall()
+        ]
+
+        self.env.cr.execute(
+            """
+            SELECT relname, seq_scan, seq_tup_read, COALESCE(idx_scan, 0), n_live_tup
+              FROM pg_stat_user_tables
+             WHERE n_live_tup >= %s
+               AND seq_scan > COALESCE(idx_scan, 0)
+          ORDER BY seq_tup_read DESC
+             LIMIT 25
+            """,
+            [min_table_rows],
+        )
+        seq_scans = [
+            {
+                "table": table,
+                "seq_scan": seq_scan,
+                "seq_tup_read": seq_tup_read,
+                "idx_scan": idx_scan,
+                "live_rows": live_rows,
+            }
+            for table, seq_scan, seq_tup_read, idx_scan, live_rows in self.env.cr.fetchall()
+        ]
+        return {
+            "managed": managed,
+            # Invalid indexes are rebuilt like missing ones.
+            "missing": [index for index in managed if index["status"] in ("missing", "invalid")],
+            "unused": unused,
+            "seq_scan_hotspots": seq_scans,
+        }
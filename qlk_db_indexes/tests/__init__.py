@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+
+from . import test_db_index
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Managed index registry."""
+
+from unittest.mock import patch
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+INDEX_NAME = "qlk_hearing_date_idx"
+
+
+@tagged("post_install", "-at_install")
+class TestDbIndex(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Index = cls.env["qlk.db.index"]
+        cls.Index._schedule_index_creation()
+
+    def _index_oid(self):
+        self.env.cr.execute("SELECT to_regclass(%s)::oid", [INDEX_NAME])
+        return self.env.cr.fetchone()[0]
+
+    def _patch_invalid(self):
+        # A failed concurrent build cannot be reproduced inside a transaction.
+        return patch.object(
+            type(self.Index),
+            "_invalid_index_names",
+            lambda model, names: {INDEX_NAME} & set(names),
+        )
+
+    def test_managed_indexes_present(self):
+        self.assertFalse(self.Index._get_missing_indexes())
+        report = self.Index.get_index_report()
+        statuses = {index["name"]: index["status"] for index in report["managed"]}
+        self.assertEqual(statuses[INDEX_NAME], "present")
+        self.assertFalse(report["missing"])
+
+    def test_invalid_index_is_rebuilt(self):
+        oid = self._index_oid()
+        self.assertTrue(oid)
+        with self._patch_invalid():
+            self.assertEqual([index.name for index in self.Index._get_missing_indexes()], [INDEX_NAME])
+            report = self.Index.get_index_report()
+            statuses = {index["name"]: index["status"] for index in report["managed"]}
+            self.assertEqual(statuses[INDEX_NAME], "invalid")
+            self.assertEqual([index["name"] for index in report["missing"]], [INDEX_NAME])
+
+            self.Index._schedule_index_creation()
+        new_oid = self._index_oid()
+        self.assertTrue(new_oid)
+        self.assertNotEqual(new_oid, oid, "The invalid index must be dropped and built again.")
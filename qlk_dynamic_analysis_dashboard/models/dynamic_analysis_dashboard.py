@@ -4,11 +4,13 @@ from collections import OrderedDict
 from odoo import _, api, fields, models
 from odoo.osv.expression import AND, OR
 from odoo.tools.misc import format_date
+from odoo.addons.qlk_management.models.perf_sample import instrument
 
 
 class DynamicAnalysisDashboard(models.AbstractModel):
     _name = "qlk.dynamic.analysis.dashboard"
     _description = "Dynamic Analytical Dashboard Service"
+    _QUERY_BUDGETS = {"get_dashboard_data": 80}
 
     def _format_number(self, value, precision=0):
         if value is None:
@@ -342,7 +344,7 @@ class DynamicAnalysisDashboard(models.AbstractModel):
 
         user = self.env.user
         allow_all = True
-        employee_ids = user.employee_ids.ids
+        employee_ids = list(self.env["qlk.user.access.context"]._get().employee_ids)
         status_counts = {"approved": 0, "waiting": 0, "draft": 0, "rejected": 0}
         total_tasks = 0
 
@@ -396,7 +398,7 @@ class DynamicAnalysisDashboard(models.AbstractModel):
         events = []
         today = fields.Date.context_today(self)
         user = self.env.user
-        employee_ids = user.employee_ids.ids
+        employee_ids = list(self.env["qlk.user.access.context"]._get().employee_ids)
         is_manager = True
         lang = user.lang or "en_US"
 
@@ -690,6 +692,7 @@ class DynamicAnalysisDashboard(models.AbstractModel):
         }
 
     @api.model
+    @instrument()
     def get_dashboard_data(self):
         if "qlk.analysis.dashboard" not in self.env:
             return self._fallback_payload()
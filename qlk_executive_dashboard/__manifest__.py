@@ -22,7 +22,9 @@
         "security/security.xml",
         "security/ir.model.access.csv",
         "security/record_rules.xml",
+        "data/executive_report_cron.xml",
         "views/executive_dashboard_menu.xml",
+        "views/executive_report_views.xml",
     ],
     "assets": {
         "web.assets_backend": [
@@ -8,11 +8,13 @@ from odoo import api, fields, models
 from odoo.exceptions import AccessError
 from odoo.osv.expression import OR
 from odoo.tools.misc import format_amount, format_date
+from odoo.addons.qlk_management.models.perf_sample import instrument
 
 
 class ExecutiveDashboard(models.AbstractModel):
     _name = "qlk.executive.dashboard"
     _description = "Executive Dashboard Service"
+    _QUERY_BUDGETS = {"get_dashboard_data": 120}
 
     @api.model
     def _selection_labels(self, model_name, field_name):
@@ -60,8 +62,10 @@ class ExecutiveDashboard(models.AbstractModel):
     def _team_employee_ids(self, employee_ids):
         if not employee_ids or "hr.employee" not in self.env:
             return employee_ids
-        employees = self.env["hr.employee"].search([("id", "child_of", employee_ids)])
-        return employees.ids
+        access = self.env["qlk.user.access.context"]._get()
+        if set(employee_ids) == set(access.employee_ids):
+            return list(access.team_employee_ids)
+        return self.env["qlk.employee.hierarchy"].team_of(employee_ids)
 
     @api.model
     def _group_counts(self, model, groupby, domain=None, labels=None):
@@ -226,6 +230,7 @@ class ExecutiveDashboard(models.AbstractModel):
         }
 
     @api.model
+    @instrument()
     def _build_pipeline_cards(self, model, groupby, domain, action, colors):
         labels = self._selection_labels(model._name, groupby) if groupby in model._fields else {}
         groups = self._group_counts(model, groupby, domain, labels)
@@ -246,12 +251,14 @@ class ExecutiveDashboard(models.AbstractModel):
         }
 
     @api.model
+    @instrument()
     def get_dashboard_data(self):
         user = self.env.user
         lang = user.lang or "en_US"
         today = fields.Date.context_today(self)
-        is_manager = user.has_group("qlk_executive_dashboard.group_qlk_executive_dashboard_manager")
-        is_user = user.has_group("qlk_executive_dashboard.group_qlk_executive_dashboard_user")
+        access = self.env["qlk.user.access.context"]
+        is_manager = access.has_group("qlk_executive_dashboard.group_qlk_executive_dashboard_manager")
+        is_user = access.has_group("qlk_executive_dashboard.group_qlk_executive_dashboard_user")
         if not (is_manager or is_user):
             raise AccessError("You do not have access to the executive dashboard.")
 
@@ -860,9 +867,10 @@ class ExecutiveDashboard(models.AbstractModel):
 
     @api.model
     def _ensure_group(self, group_xmlid):
-        if self.env.user.has_group("base.group_system"):
+        access = self.env["qlk.user.access.context"]
+        if access._get().is_system:
             return
-        if not self.env.user.has_group(group_xmlid):
+        if not access.has_group(group_xmlid):
             raise AccessError("You do not have permission to perform this action.")
 
     @api.model
@@ -1,77 +1,526 @@
 # -*- coding: utf-8 -*-
-from odoo import fields, models, tools
+"""Pre-aggregated executive reports.
+
+Each report is a summary table keyed by month and its grouping columns, so
+pivot and graph views read a few rows per month instead of scanning
+``qlk_case`` or ``account_move``. Changes only queue the affected months;
+the refresh cron recomputes those months, and rebuilds everything daily to
+catch changes made outside the ORM. A refresh deletes and re-inserts rows
+in a single transaction, so readers keep seeing the previous figures until
+it commits.
+"""
+
+from odoo import api, fields, models, tools
+
+SUMMARY_REPORTS = (
+    "qlk.executive.case.report",
+    "qlk.executive.finance.report",
+    "qlk.executive.profitability.report",
+)
+TRIGGER_KEY = "qlk_executive_reports_triggered"
+
+CASE_REPORT_FIELDS = {"status", "state", "court", "case_group", "litigation_flow", "date", "project_id"}
+FINANCE_REPORT_FIELDS = {"state", "date", "move_type", "payment_state", "currency_id", "company_id"}
+TASK_PROFITABILITY_FIELDS = {"approval_state", "hours_spent", "date_start", "employee_id", "project_id", "company_id"}
+TIMESHEET_PROFITABILITY_FIELDS = {"unit_amount", "date", "employee_id", "task_id", "company_id"}
+PROFITABILITY_GROUPBY = ("project_id", "client_file_id", "employee_id", "service_type", "month:month")
+# Billed and collected amounts are booked per client file, never per project
+# or lawyer: below that level the margin would only show the cost.
+REVENUE_GROUPBY = ("client_file_id", "service_type", "month:month")
+
+
+class ExecutiveSummaryMixin(models.AbstractModel):
+    _name = "qlk.executive.summary.mixin"
+    _description = "Executive Summary Table"
+
+    # Table definition, the columns filled by _summary_query and the SQL
+    # expression giving the month of a source row.
+    _summary_columns_ddl = ""
+    _summary_columns = ()
+    _summary_month = ""
+
+    month = fields.Date(readonly=True)
+
+    def init(self):
+        if self._abstract:
+            return
+        cr = self.env.cr
+        cr.execute(
+            "SELECT 1 FROM pg_views WHERE viewname = %s AND schemaname = current_schema()",
+            [self._table],
+        )
+        if cr.rowcount:
+            # Former plain SQL view.
+            tools.drop_view_if_exists(cr, self._table)
+        cr.execute(
+            "CREATE TABLE IF NOT EXISTS %s (id SERIAL PRIMARY KEY, month DATE NOT NULL, %s)"
+            % (self._table, self._summary_columns_ddl)
+        )
+        cr.execute("CREATE INDEX IF NOT EXISTS %s_month_idx ON %s (month)" % (self._table, self._table))
+        cr.execute(
+            "CREATE INDEX IF NOT EXISTS %s_company_month_idx ON %s (company_id, month)"
+            % (self._table, self._table)
+        )
+        cr.execute("CREATE TABLE IF NOT EXISTS %s_pending (month DATE NOT NULL)" % self._table)
+        cr.execute("SELECT 1 FROM %s LIMIT 1" % self._table)
+        if not cr.rowcount:
+            self._refresh()
+
+    def _summary_query(self, where):
+        """Return the SELECT producing the rows of the months matching ``where``."""
+        raise NotImplementedError()
+
+    @api.model
+    def _refresh(self, months=None):
+        """Recompute ``months`` (first days of month), or the whole table."""
+        cr = self.env.cr
+        if months is None:
+            cr.execute("DELETE FROM %s_pending" % self._table)
+            cr.execute("DELETE FROM %s" % self._table)
+            where, params = "TRUE", {}
+        else:
+            months = tuple(sorted(set(months)))
+            if not months:
+                return
+            cr.execute("DELETE FROM %s WHERE month IN %%(months)s" % self._table, {"months": months})
+            where, params = "%s IN %%(months)s" % self._summary_month, {"months": months}
+        cr.execute(
+            "INSERT INTO %s (month, %s) %s"
+            % (self._table, ", ".join(self._summary_columns), self._summary_query(where)),
+            params,
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_pending(self):
+        self.env.cr.execute("DELETE FROM %s_pending RETURNING month" % self._table)
+        self._refresh({row[0] for row in self.env.cr.fetchall()})
+
+    @api.model
+    def _mark_dirty(self, dates):
+        """Queue the months of ``dates`` for the next refresh."""
+        months = sorted({fields.Date.to_date(value).replace(day=1) for value in dates if value})
+        if not months:
+            return
+        # Append-only, so concurrent postings never wait on each other.
+        self.env.cr.execute(
+            "INSERT INTO %s_pending (month) VALUES %s" % (self._table, ", ".join(["(%s)"] * len(months))),
+            months,
+        )
+        # Trigger the cron once per transaction; the data is reset on commit and rollback.
+        transaction_data = self.env.cr.precommit.data
+        if not transaction_data.get(TRIGGER_KEY):
+            cron = self.env.ref("qlk_executive_dashboard.ir_cron_executive_reports_refresh", raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
+            transaction_data[TRIGGER_KEY] = True
+
+    @api.model
+    def _cron_refresh_reports(self, full=False):
+        for model_name in SUMMARY_REPORTS:
+            report = self.env[model_name].sudo()
+            if full:
+                report._refresh()
+            else:
+                report._refresh_pending()
+        return True
 
 
 class ExecutiveCaseReport(models.Model):
     _name = "qlk.executive.case.report"
+    _inherit = "qlk.executive.summary.mixin"
     _description = "Executive Case Report"
     _auto = False
-    _rec_name = "case_id"
+    _rec_name = "month"
+    _order = "month desc"
 
-    case_id = fields.Many2one("qlk.case", readonly=True)
-    status = fields.Char(readonly=True)
+    _summary_columns_ddl = """
+        company_id INTEGER,
+        court VARCHAR,
+        case_group_id INTEGER,
+        status VARCHAR,
+        state VARCHAR,
+        litigation_flow VARCHAR,
+        case_count INTEGER NOT NULL
+    """
+    _summary_columns = (
+        "company_id",
+        "court",
+        "case_group_id",
+        "status",
+        "state",
+        "litigation_flow",
+        "case_count",
+    )
+    _summary_month = "date_trunc('month', COALESCE(c.date, c.create_date))::date"
+
+    company_id = fields.Many2one("res.company", readonly=True)
+    court = fields.Char(readonly=True)
     case_group_id = fields.Many2one("qlk.casegroup", readonly=True)
-    litigation_flow = fields.Char(readonly=True)
+    status = fields.Char(readonly=True)
     state = fields.Char(readonly=True)
-    date = fields.Date(readonly=True)
+    litigation_flow = fields.Char(readonly=True)
+    case_count = fields.Integer(string="Cases", readonly=True)
 
-    def init(self):
-        tools.drop_view_if_exists(self.env.cr, "qlk_executive_case_report")
-        self.env.cr.execute(
-            """
-            CREATE VIEW qlk_executive_case_report AS (
-                SELECT
-                    c.id AS id,
-                    c.id AS case_id,
-                    c.status AS status,
-                    c.case_group AS case_group_id,
-                    c.litigation_flow AS litigation_flow,
-                    c.state AS state,
-                    c.date AS date
-                FROM qlk_case c
-            )
-            """
-        )
+    def _summary_query(self, where):
+        return """
+            SELECT
+                %(month)s,
+                c.company_id,
+                c.court,
+                c.case_group,
+                c.status,
+                c.state,
+                c.litigation_flow,
+                COUNT(*)
+            FROM qlk_case c
+            WHERE %(where)s
+            GROUP BY 1, 2, 3, 4, 5, 6, 7
+        """ % {"month": self._summary_month, "where": where}
 
 
 class ExecutiveFinanceReport(models.Model):
     _name = "qlk.executive.finance.report"
+    _inherit = "qlk.executive.summary.mixin"
     _description = "Executive Finance Report"
     _auto = False
-    _rec_name = "move_id"
+    _rec_name = "month"
+    _order = "month desc"
 
-    move_id = fields.Many2one("account.move", readonly=True)
+    _summary_columns_ddl = """
+        company_id INTEGER,
+        currency_id INTEGER,
+        move_type VARCHAR,
+        payment_state VARCHAR,
+        move_count INTEGER NOT NULL,
+        amount_total NUMERIC,
+        amount_residual NUMERIC
+    """
+    _summary_columns = (
+        "company_id",
+        "currency_id",
+        "move_type",
+        "payment_state",
+        "move_count",
+        "amount_total",
+        "amount_residual",
+    )
+    _summary_month = "date_trunc('month', m.date)::date"
+
+    company_id = fields.Many2one("res.company", readonly=True)
+    currency_id = fields.Many2one("res.currency", readonly=True)
     move_type = fields.Char(readonly=True)
-    state = fields.Char(readonly=True)
     payment_state = fields.Char(readonly=True)
-    amount_total = fields.Monetary(readonly=True)
-    amount_residual = fields.Monetary(readonly=True)
-    invoice_date = fields.Date(readonly=True)
-    invoice_date_due = fields.Date(readonly=True)
-    date = fields.Date(readonly=True)
+    move_count = fields.Integer(string="Entries", readonly=True)
+    amount_total = fields.Monetary(string="Total", readonly=True)
+    amount_residual = fields.Monetary(string="Residual", readonly=True)
+
+    def _summary_query(self, where):
+        return """
+            SELECT
+                %(month)s,
+                m.company_id,
+                m.currency_id,
+                m.move_type,
+                m.payment_state,
+                COUNT(*),
+                SUM(m.amount_total),
+                SUM(m.amount_residual)
+            FROM account_move m
+            WHERE m.state = 'posted' AND %(where)s
+            GROUP BY 1, 2, 3, 4, 5
+        """ % {"month": self._summary_month, "where": where}
+
+
+class ExecutiveProfitabilityReport(models.Model):
+    _name = "qlk.executive.profitability.report"
+    _inherit = "qlk.executive.summary.mixin"
+    _description = "Executive Profitability Report"
+    _auto = False
+    _rec_name = "month"
+    _order = "month desc"
+
+    # Hours and their cost come from approved legal tasks and project
+    # timesheets; billed and collected amounts from the posted invoices of
+    # engagement letters, at client file level (no project or lawyer).
+    _summary_columns_ddl = """
+        company_id INTEGER,
+        currency_id INTEGER,
+        project_id INTEGER,
+        client_file_id INTEGER,
+        employee_id INTEGER,
+        service_type VARCHAR,
+        hours NUMERIC,
+        cost NUMERIC,
+        billed NUMERIC,
+        collected NUMERIC
+    """
+    _summary_columns = (
+        "company_id",
+        "currency_id",
+        "project_id",
+        "client_file_id",
+        "employee_id",
+        "service_type",
+        "hours",
+        "cost",
+        "billed",
+        "collected",
+    )
+    _summary_month = "src.month"
+
+    company_id = fields.Many2one("res.company", readonly=True)
     currency_id = fields.Many2one("res.currency", readonly=True)
-    invoice_user_id = fields.Many2one("res.users", readonly=True)
+    project_id = fields.Many2one("qlk.project", string="Project", readonly=True)
+    client_file_id = fields.Many2one("qlk.client.file", string="Client File", readonly=True)
+    employee_id = fields.Many2one("hr.employee", string="Lawyer", readonly=True)
+    service_type = fields.Char(readonly=True)
+    hours = fields.Float(readonly=True)
+    cost = fields.Monetary(readonly=True)
+    billed = fields.Monetary(readonly=True)
+    collected = fields.Monetary(readonly=True)
 
-    def init(self):
-        tools.drop_view_if_exists(self.env.cr, "qlk_executive_finance_report")
-        self.env.cr.execute(
-            """
-            CREATE VIEW qlk_executive_finance_report AS (
-                SELECT
-                    m.id AS id,
-                    m.id AS move_id,
-                    m.move_type AS move_type,
-                    m.state AS state,
-                    m.payment_state AS payment_state,
-                    m.amount_total AS amount_total,
-                    m.amount_residual AS amount_residual,
-                    m.invoice_date AS invoice_date,
-                    m.invoice_date_due AS invoice_date_due,
-                    m.date AS date,
-                    m.currency_id AS currency_id,
-                    m.invoice_user_id AS invoice_user_id
-                FROM account_move m
-                WHERE m.state = 'posted'
+    def _summary_query(self, where):
+        # The month filter on src is pushed down into each UNION ALL branch.
+        return """
+            WITH hours AS (
+                SELECT date_trunc('month', t.date_start)::date AS month,
+                       t.company_id, t.project_id, t.employee_id, t.date_start AS day,
+                       t.hours_spent AS hours
+                  FROM qlk_task t
+                 WHERE t.approval_state = 'approved' AND t.project_id IS NOT NULL
+                UNION ALL
+                SELECT date_trunc('month', aal.date)::date,
+                       aal.company_id, pt.qlk_project_id, aal.employee_id, aal.date,
+                       aal.unit_amount
+                  FROM account_analytic_line aal
+                  JOIN project_task pt ON pt.id = aal.task_id
+                 WHERE pt.qlk_project_id IS NOT NULL
+            ),
+            src AS (
+                SELECT h.month, h.company_id, h.project_id, p.client_file_id, h.employee_id,
+                       COALESCE(p.service_type, p.service_category) AS service_type,
+                       h.hours,
+                       h.hours * COALESCE(rate.cost_per_hour, cc.cost_per_hour, 0) AS cost,
+                       0 AS billed,
+                       0 AS collected
+                  FROM hours h
+                  JOIN qlk_project p ON p.id = h.project_id
+                  LEFT JOIN LATERAL (
+                        SELECT r.cost_per_hour
+                          FROM qlk_lawyer_rate r
+                         WHERE r.employee_id = h.employee_id
+                           AND (r.company_id IS NULL OR r.company_id = h.company_id)
+                           AND r.date_from <= h.day
+                           AND (r.date_to IS NULL OR r.date_to >= h.day)
+                      ORDER BY r.date_from DESC
+                         LIMIT 1
+                       ) rate ON TRUE
+                  LEFT JOIN cost_calculation cc ON cc.employee_id = h.employee_id
+                UNION ALL
+                SELECT date_trunc('month', m.date)::date, m.company_id, NULL, l.client_file_id, NULL,
+                       l.service_type, 0, 0,
+                       m.amount_total_signed,
+                       m.amount_total_signed - m.amount_residual_signed
+                  FROM account_move m
+                  JOIN bd_engagement_letter l ON l.invoice_id = m.id
+                 WHERE m.state = 'posted' AND m.move_type IN ('out_invoice', 'out_refund')
             )
-            """
+            SELECT
+                src.month,
+                src.company_id,
+                co.currency_id,
+                src.project_id,
+                src.client_file_id,
+                src.employee_id,
+                src.service_type,
+                SUM(src.hours),
+                SUM(src.cost),
+                SUM(src.billed),
+                SUM(src.collected)
+            FROM src
+            LEFT JOIN res_company co ON co.id = src.company_id
+            WHERE %(where)s
+            GROUP BY 1, 2, 3, 4, 5, 6, 7
+        """ % {"where": where}
+
+    @api.model
+    def get_profitability_data(self, groupby="project_id", date_from=None, date_to=None, limit=10):
+        """Return profitability totals and the top ``limit`` groups for the dashboard.
+
+        Groups below client file level (project, lawyer) carry hours and cost
+        only: their billed, collected and margin values are None.
+        """
+        if groupby not in PROFITABILITY_GROUPBY:
+            groupby = "project_id"
+        with_revenue = groupby in REVENUE_GROUPBY
+        domain = []
+        if date_from:
+            domain.append(("month", ">=", date_from))
+        if date_to:
+            domain.append(("month", "<=", date_to))
+        measures = ["hours:sum", "cost:sum", "billed:sum", "collected:sum"]
+
+        def _row(group, revenue=True):
+            values = {name: group.get(name) or 0.0 for name in ("hours", "cost", "billed", "collected")}
+            values["margin"] = values["billed"] - values["cost"]
+            if not revenue:
+                values.update(billed=None, collected=None, margin=None)
+            return values
+
+        totals = self.read_group(domain, measures, [], lazy=False)
+        if with_revenue:
+            orderby = "billed desc"
+        else:
+            # Revenue rows have no project or lawyer.
+            domain = domain + [(groupby.split(":")[0], "!=", False)]
+            orderby = "cost desc"
+        groups = self.read_group(domain, measures, [groupby], orderby=orderby, limit=limit, lazy=False)
+        rows = []
+        for group in groups:
+            value = group.get(groupby)
+            row = _row(group, revenue=with_revenue)
+            if isinstance(value, tuple):
+                row.update({"id": value[0], "name": value[1]})
+            else:
+                row.update({"id": False, "name": value or ""})
+            rows.append(row)
+        return {
+            "groupby": groupby,
+            "with_revenue": with_revenue,
+            "currency_id": self.env.company.currency_id.id,
+            "totals": _row(totals[0] if totals else {}),
+            "rows": rows,
+        }
+
+
+class QlkCaseExecutiveReport(models.Model):
+    _inherit = "qlk.case"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        cases = super().create(vals_list)
+        cases._mark_executive_report_dirty()
+        return cases
+
+    def write(self, vals):
+        if not CASE_REPORT_FIELDS.intersection(vals):
+            return super().write(vals)
+        self._mark_executive_report_dirty()
+        res = super().write(vals)
+        self._mark_executive_report_dirty()
+        return res
+
+    def unlink(self):
+        self._mark_executive_report_dirty()
+        return super().unlink()
+
+    def _mark_executive_report_dirty(self):
+        self.env["qlk.executive.case.report"]._mark_dirty(
+            [case.date or case.create_date for case in self]
+        )
+
+
+class AccountMoveExecutiveReport(models.Model):
+    _inherit = "account.move"
+
+    def write(self, vals):
+        if not FINANCE_REPORT_FIELDS.intersection(vals):
+            return super().write(vals)
+        # Posting, resetting to draft and cancelling all go through write().
+        dates = [move.date for move in self if move.state == "posted"]
+        res = super().write(vals)
+        dates += [move.date for move in self if move.state == "posted"]
+        self.env["qlk.executive.finance.report"]._mark_dirty(dates)
+        self.env["qlk.executive.profitability.report"]._mark_dirty(dates)
+        return res
+
+
+class AccountPartialReconcileExecutiveReport(models.Model):
+    _inherit = "account.partial.reconcile"
+
+    # Payment state and residual are recomputed from reconciliations,
+    # without going through account.move.write().
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super().create(vals_list)
+        partials._mark_executive_report_dirty()
+        return partials
+
+    def unlink(self):
+        self._mark_executive_report_dirty()
+        return super().unlink()
+
+    def _mark_executive_report_dirty(self):
+        moves = (self.debit_move_id | self.credit_move_id).move_id
+        dates = [move.date for move in moves if move.state == "posted"]
+        self.env["qlk.executive.finance.report"]._mark_dirty(dates)
+        self.env["qlk.executive.profitability.report"]._mark_dirty(dates)
+
+
+class QlkTaskExecutiveReport(models.Model):
+    _inherit = "qlk.task"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        tasks = super().create(vals_list)
+        tasks._mark_executive_report_dirty()
+        return tasks
+
+    def write(self, vals):
+        if not TASK_PROFITABILITY_FIELDS.intersection(vals):
+            return super().write(vals)
+        self._mark_executive_report_dirty()
+        res = super().write(vals)
+        self._mark_executive_report_dirty()
+        return res
+
+    def unlink(self):
+        self._mark_executive_report_dirty()
+        return super().unlink()
+
+    def _mark_executive_report_dirty(self):
+        self.env["qlk.executive.profitability.report"]._mark_dirty(
+            [task.date_start for task in self if task.approval_state == "approved"]
         )
+
+
+class AccountAnalyticLineExecutiveReport(models.Model):
+    _inherit = "account.analytic.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._mark_executive_report_dirty()
+        return lines
+
+    def write(self, vals):
+        if not TIMESHEET_PROFITABILITY_FIELDS.intersection(vals):
+            return super().write(vals)
+        self._mark_executive_report_dirty()
+        res = super().write(vals)
+        self._mark_executive_report_dirty()
+        return res
+
+    def unlink(self):
+        self._mark_executive_report_dirty()
+        return super().unlink()
+
+    def _mark_executive_report_dirty(self):
+        self.env["qlk.executive.profitability.report"]._mark_dirty(
+            [line.date for line in self if line.task_id]
+        )
+
+
+class BDEngagementLetterExecutiveReport(models.Model):
+    _inherit = "bd.engagement.letter"
+
+    def write(self, vals):
+        if not {"invoice_id", "client_file_id", "service_type"}.intersection(vals):
+            return super().write(vals)
+        dates = [letter.invoice_id.date for letter in self if letter.invoice_id]
+        res = super().write(vals)
+        dates += [letter.invoice_id.date for letter in self if letter.invoice_id]
+        self.env["qlk.executive.profitability.report"]._mark_dirty(dates)
+        return res
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_executive_reports
+from . import test_profitability_report
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Executive summary tables against the live aggregates they replace."""
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+
+@tagged("post_install", "-at_install")
+class TestExecutiveReports(AccountTestInvoicingCommon):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Summary = cls.env["qlk.executive.summary.mixin"]
+        cls.Finance = cls.env["qlk.executive.finance.report"]
+        cls.invoices = cls.env["account.move"]
+        for invoice_date, amount in (("2026-01-10", 1000.0), ("2026-01-20", 250.0), ("2026-02-05", 400.0)):
+            cls.invoices |= cls.init_invoice(
+                "out_invoice", invoice_date=invoice_date, amounts=[amount], post=True
+            )
+        cls.refund = cls.init_invoice("out_refund", invoice_date="2026-02-15", amounts=[100.0], post=True)
+
+    def _live_finance(self):
+        # What the former per-move SQL view gave the pivot, grouped the same way.
+        groups = self.env["account.move"]._read_group(
+            [("state", "=", "posted"), ("company_id", "=", self.env.company.id)],
+            ["date:month", "move_type", "payment_state"],
+            ["__count", "amount_total:sum", "amount_residual:sum"],
+        )
+        return {
+            (month, move_type, payment_state): (count, round(total, 2), round(residual, 2))
+            for month, move_type, payment_state, count, total, residual in groups
+        }
+
+    def _summary_finance(self):
+        groups = self.Finance._read_group(
+            [("company_id", "=", self.env.company.id)],
+            ["month:month", "move_type", "payment_state"],
+            ["move_count:sum", "amount_total:sum", "amount_residual:sum"],
+        )
+        return {
+            (month, move_type, payment_state): (count, round(total, 2), round(residual, 2))
+            for month, move_type, payment_state, count, total, residual in groups
+        }
+
+    def test_refreshed_finance_summary_matches_live_aggregate(self):
+        # Posting queued the invoice months.
+        self.Summary._cron_refresh_reports()
+        self.assertEqual(self._summary_finance(), self._live_finance())
+
+        # A partial payment changes residual and payment state through a reconciliation.
+        self.env["account.payment.register"].with_context(
+            active_model="account.move", active_ids=self.invoices[0].ids
+        ).create({"amount": 300.0, "payment_date": "2026-01-31"})._create_payments()
+        self.Summary._cron_refresh_reports()
+        self.assertEqual(self._summary_finance(), self._live_finance())
+
+        self.invoices[1].button_draft()
+        self.Summary._cron_refresh_reports()
+        self.assertEqual(self._summary_finance(), self._live_finance())
+
+        self.Summary._cron_refresh_reports(full=True)
+        self.assertEqual(self._summary_finance(), self._live_finance())
+
+    def test_refreshed_case_summary_matches_live_aggregate(self):
+        self.Summary._cron_refresh_reports(full=True)
+        cases = self.env["qlk.case"].with_context(active_test=False)
+        live = {
+            (status or False, state or False): count
+            for status, state, count in cases._read_group([], ["status", "state"], ["__count"])
+        }
+        summary = {
+            (status or False, state or False): count
+            for status, state, count in self.env["qlk.executive.case.report"]._read_group(
+                [], ["status", "state"], ["case_count:sum"]
+            )
+        }
+        self.assertEqual(summary, live)
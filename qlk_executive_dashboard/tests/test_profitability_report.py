@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Profitability figures served to the executive dashboard."""
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged("post_install", "-at_install")
+class TestProfitabilityReport(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Report = cls.env["qlk.executive.profitability.report"]
+        cls.month = "2031-05-01"
+        cls.lawyer = cls.env["hr.employee"].create({"name": "Profitability Lawyer"})
+        cls.associate = cls.env["hr.employee"].create({"name": "Profitability Associate"})
+        client = cls.env["res.partner"].create({"name": "Profitability Client"})
+        # Creating a project needs the client file pipeline; only the row matters here.
+        cls.env.cr.execute(
+            "INSERT INTO qlk_project (name, client_id, company_id) VALUES (%s, %s, %s) RETURNING id",
+            ["Profitability Project", client.id, cls.env.company.id],
+        )
+        cls.project = cls.env["qlk.project"].browse(cls.env.cr.fetchone()[0])
+        # Summary rows as the refresh books them: hours and cost per project
+        # and lawyer, billed and collected amounts without either.
+        rows = [
+            (cls.project.id, cls.lawyer.id, "litigation", 4.0, 400.0, 0.0, 0.0),
+            (cls.project.id, cls.associate.id, "litigation", 6.0, 300.0, 0.0, 0.0),
+            (None, None, "litigation", 0.0, 0.0, 1500.0, 900.0),
+        ]
+        for project_id, employee_id, service_type, hours, cost, billed, collected in rows:
+            cls.env.cr.execute(
+                """
+                INSERT INTO qlk_executive_profitability_report
+                       (month, company_id, currency_id, project_id, employee_id, service_type,
+                        hours, cost, billed, collected)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                [
+                    cls.month,
+                    cls.env.company.id,
+                    cls.env.company.currency_id.id,
+                    project_id,
+                    employee_id,
+                    service_type,
+                    hours,
+                    cost,
+                    billed,
+                    collected,
+                ],
+            )
+
+    def _data(self, groupby):
+        return self.Report.get_profitability_data(groupby=groupby, date_from=self.month, date_to=self.month)
+
+    def test_margin_hidden_below_client_file_level(self):
+        for groupby in ("project_id", "employee_id"):
+            data = self._data(groupby)
+            self.assertFalse(data["with_revenue"])
+            for row in data["rows"]:
+                self.assertEqual((row["billed"], row["collected"], row["margin"]), (None, None, None))
+        rows = self._data("employee_id")["rows"]
+        self.assertEqual([row["id"] for row in rows], [self.lawyer.id, self.associate.id])
+        self.assertEqual([row["cost"] for row in rows], [400.0, 300.0])
+        rows = self._data("project_id")["rows"]
+        self.assertEqual([(row["id"], row["hours"], row["cost"]) for row in rows], [(self.project.id, 10.0, 700.0)])
+
+    def test_margin_at_revenue_levels(self):
+        data = self._data("service_type")
+        self.assertTrue(data["with_revenue"])
+        self.assertEqual(len(data["rows"]), 1)
+        row = data["rows"][0]
+        self.assertEqual(row["name"], "litigation")
+        self.assertEqual((row["billed"], row["collected"], row["margin"]), (1500.0, 900.0, 800.0))
+        self.assertEqual(data["totals"]["margin"], 800.0)
+        self.assertEqual(self._data("month:month")["rows"][0]["margin"], 800.0)
@@ -25,6 +25,7 @@
         "security/ir.model.access.csv",
         "security/record_rules.xml",
         "data/lawyer_notification_cron.xml",
+        "data/lawyer_notification_retention.xml",
         "views/lawyer_dashboard_actions.xml",
         "views/lawyer_notification_views.xml",
         "views/hr_employee_views.xml",
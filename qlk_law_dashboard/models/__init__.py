@@ -2,6 +2,7 @@
 
 from . import hr_employee
 from . import lawyer_notification
+from . import mail_mail
 from . import assignment_notifications
 from . import lawyer_dashboard_extension
 from . import court_dashboard_extension
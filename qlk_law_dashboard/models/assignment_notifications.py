@@ -16,9 +16,9 @@ class LawyerAssignmentNotificationMixin(models.AbstractModel):
         )
 
     def _notify_project_assignment(self, users):
-        center = self.env["qlk.lawyer.notification"]
+        entries = []
         for project in self:
-            recipients = users if len(self) == 1 else (
+            recipients = users if users and len(self) == 1 else (
                 project.lawyer_id.user_id | project.responsible_user_ids
             )
             if not recipients:
@@ -44,14 +44,17 @@ class LawyerAssignmentNotificationMixin(models.AbstractModel):
                 "assigned_by": self.env.user.display_name,
                 "date": fields.Datetime.to_string(fields.Datetime.now()),
             }
-            center.notify(
-                project,
-                recipients,
-                "project",
-                _("New Project Assigned To You"),
-                body,
-                project=project,
+            entries.append(
+                {
+                    "source": project,
+                    "users": recipients,
+                    "notification_type": "project",
+                    "subject": _("New Project Assigned To You"),
+                    "body_html": body,
+                    "project": project,
+                }
             )
+        self.env["qlk.lawyer.notification"].notify_batch(entries)
 
     def _case_notification_users(self, record):
         employees = self.env["hr.employee"]
@@ -68,7 +71,7 @@ class LawyerAssignmentNotificationMixin(models.AbstractModel):
         return users | self._notification_users_from_employees(employees)
 
     def _notify_case_assignment(self, users=False):
-        center = self.env["qlk.lawyer.notification"]
+        entries = []
         for record in self:
             recipients = users or self._case_notification_users(record)
             if not recipients:
@@ -110,15 +113,18 @@ class LawyerAssignmentNotificationMixin(models.AbstractModel):
                 "case_type": case_type or "-",
                 "degree": degree,
             }
-            center.notify(
-                record,
-                recipients,
-                "case",
-                _("New Case Assigned To You"),
-                body,
-                project=record.project_id,
-                case=record if record._name == "qlk.case" else False,
+            entries.append(
+                {
+                    "source": record,
+                    "users": recipients,
+                    "notification_type": "case",
+                    "subject": _("New Case Assigned To You"),
+                    "body_html": body,
+                    "project": record.project_id,
+                    "case": record if record._name == "qlk.case" else False,
+                }
             )
+        self.env["qlk.lawyer.notification"].notify_batch(entries)
 
 
 class QlkProject(models.Model):
@@ -126,10 +132,7 @@ class QlkProject(models.Model):
     _inherit = ["qlk.project", "qlk.lawyer.assignment.notification.mixin"]
 
     def _notify_project_created(self):
-        for project in self:
-            project._notify_project_assignment(
-                project.lawyer_id.user_id | project.responsible_user_ids
-            )
+        self._notify_project_assignment(self.env["res.users"])
         return True
 
     def write(self, vals):
@@ -201,7 +204,7 @@ class QlkHearing(models.Model):
         return employees.mapped("user_id").filtered("active")
 
     def _notify_hearing_assignment(self, users=False):
-        center = self.env["qlk.lawyer.notification"]
+        entries = []
         for hearing in self:
             recipients = users or hearing._hearing_notification_users()
             if not recipients:
@@ -223,15 +226,18 @@ class QlkHearing(models.Model):
                 "case": hearing.case_id.display_name or "-",
                 "client": hearing.case_id.client_id.display_name if hearing.case_id.client_id else "-",
             }
-            center.notify(
-                hearing,
-                recipients,
-                "hearing",
-                _("New Hearing Assigned To You"),
-                body,
-                project=hearing.case_id.project_id,
-                case=hearing.case_id,
+            entries.append(
+                {
+                    "source": hearing,
+                    "users": recipients,
+                    "notification_type": "hearing",
+                    "subject": _("New Hearing Assigned To You"),
+                    "body_html": body,
+                    "project": hearing.case_id.project_id,
+                    "case": hearing.case_id,
+                }
             )
+        self.env["qlk.lawyer.notification"].notify_batch(entries)
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -256,7 +262,7 @@ class QlkTask(models.Model):
     _inherit = "qlk.task"
 
     def _send_assignment_email(self):
-        center = self.env["qlk.lawyer.notification"]
+        entries = []
         for task in self.filtered("assigned_user_id"):
             body = _(
                 """
@@ -274,15 +280,18 @@ class QlkTask(models.Model):
                 "deadline": task.delivery_date or task.date_finished or "-",
                 "assigned_by": self.env.user.display_name,
             }
-            center.notify(
-                task,
-                task.assigned_user_id,
-                "task",
-                _("New Task Assigned To You"),
-                body,
-                project=task.project_id,
-                case=task.case_id,
+            entries.append(
+                {
+                    "source": task,
+                    "users": task.assigned_user_id,
+                    "notification_type": "task",
+                    "subject": _("New Task Assigned To You"),
+                    "body_html": body,
+                    "project": task.project_id,
+                    "case": task.case_id,
+                }
             )
+        self.env["qlk.lawyer.notification"].notify_batch(entries)
         return True
 
 
@@ -290,7 +299,7 @@ class ProjectTask(models.Model):
     _inherit = "project.task"
 
     def _send_assignment_email(self, users=None):
-        center = self.env["qlk.lawyer.notification"]
+        entries = []
         for task in self:
             recipients = users or task.user_ids
             if not recipients:
@@ -311,13 +320,16 @@ class ProjectTask(models.Model):
                 "deadline": task.delivery_date or task.date_deadline or "-",
                 "assigned_by": self.env.user.display_name,
             }
-            center.notify(
-                task,
-                recipients,
-                "task",
-                _("New Task Assigned To You"),
-                body,
-                project=task.qlk_project_id,
-                case=task.case_id,
+            entries.append(
+                {
+                    "source": task,
+                    "users": recipients,
+                    "notification_type": "task",
+                    "subject": _("New Task Assigned To You"),
+                    "body_html": body,
+                    "project": task.qlk_project_id,
+                    "case": task.case_id,
+                }
             )
+        self.env["qlk.lawyer.notification"].notify_batch(entries)
         return True
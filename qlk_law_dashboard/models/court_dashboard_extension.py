@@ -1,13 +1,19 @@
 # -*- coding: utf-8 -*-
 
 from odoo import _, api, models
+from odoo.addons.qlk_management.models.perf_sample import instrument
+
+VISIBLE_COURTS_MEMO_KEY = "qlk_court_dashboard_visible_courts"
 
 
 class QlkCourtDashboardExtension(models.AbstractModel):
     _inherit = "qlk.court.dashboard"
+    _QUERY_BUDGETS = {"get_dashboard_data": 60}
 
     @api.model
     def _user_has_optional_group(self, user, xmlid):
+        if user == self.env.user:
+            return self.env["qlk.user.access.context"].has_group(xmlid)
         group = self.env.ref(xmlid, raise_if_not_found=False)
         return bool(group and group in user.groups_id)
 
@@ -21,22 +27,53 @@ class QlkCourtDashboardExtension(models.AbstractModel):
             or self._user_has_optional_group(user, "qlk_law.group_qlk_law_admin")
         )
 
+    @api.model
+    def _get_court_case_counts(self, case_model, case_domain):
+        """Return ``{court: case count}``, memoized on the cursor per user."""
+        memo = self.env.cr.cache.setdefault(VISIBLE_COURTS_MEMO_KEY, {})
+        key = (self.env.uid, tuple(self.env.companies.ids), str(case_domain))
+        if key not in memo:
+            court_groups = case_model.read_group(case_domain, ["court"], ["court"], lazy=False)
+            memo[key] = {group["court"]: group["__count"] for group in court_groups if group.get("court")}
+        return memo[key]
+
     @api.model
     def _get_visible_courts(self, case_model, case_domain):
-        court_groups = case_model.read_group(case_domain, ["court"], ["court"], lazy=False)
-        return {group.get("court") for group in court_groups if group.get("court")}
+        return set(self._get_court_case_counts(case_model, case_domain))
+
+    @api.model
+    def _get_case_group_court_counts(self, model, domain, courts):
+        """Count ``model`` rows per court of their ``case_group`` in one grouped query."""
+        if not courts:
+            return {}
+        domain = self._merge_domain(domain, [("case_group.court", "in", list(courts))])
+        groups = model.read_group(domain, ["case_group"], ["case_group"], lazy=False)
+        case_group_model = self.env[model._fields["case_group"].comodel_name].sudo()
+        case_groups = case_group_model.browse([group["case_group"][0] for group in groups if group["case_group"]])
+        court_by_group = {case_group.id: case_group.court for case_group in case_groups}
+        counts = {}
+        for group in groups:
+            court = group["case_group"] and court_by_group.get(group["case_group"][0])
+            if court:
+                counts[court] = counts.get(court, 0) + group["__count"]
+        return counts
 
     @api.model
-    def _set_metric_payload(self, metrics, metric_key, model_name, domain, can_read=True):
+    def _set_metric_payload(self, metrics, metric_key, model_name, domain, can_read=True, count=None):
         metric = (metrics or {}).get(metric_key)
         if not metric:
             return
         metric["domain"] = domain if can_read else []
-        metric["count"] = self.env[model_name].search_count(domain) if can_read else 0
+        if not can_read:
+            count = 0
+        elif count is None:
+            count = self.env[model_name].search_count(domain)
+        metric["count"] = count
         if not can_read:
             metric["action"] = False
 
     @api.model
+    @instrument()
     def get_dashboard_data(self):
         user = self.env.user
         if not self._has_courts_dashboard_access(user):
@@ -55,13 +92,16 @@ class QlkCourtDashboardExtension(models.AbstractModel):
             return data
 
         case_model = self.env["qlk.case"]
-        employee_ids = user.employee_ids.ids
+        employee_ids = list(self.env["qlk.user.access.context"]._get().employee_ids)
         is_manager = self._is_manager(user)
         case_domain = self._model_domain(
             case_model, employee_ids, user, ["employee_id", "employee_ids"], is_manager
         )
         case_domain_active = self._merge_domain(case_domain, self.ACTIVE_CASE_DOMAIN)
-        visible_courts = self._get_visible_courts(case_model, case_domain_active)
+        case_counts = self._get_court_case_counts(case_model, case_domain_active)
+        visible_courts = set(case_counts)
+        # Only the courts of the rendered cards are counted.
+        card_courts = [card.get("key") for card in cards if card.get("key") in visible_courts]
 
         hearing_model = self.env["qlk.hearing"]
         hearing_access = hearing_model.check_access_rights("read", raise_exception=False)
@@ -91,6 +131,13 @@ class QlkCourtDashboardExtension(models.AbstractModel):
         )
         work_domain = self._merge_domain(work_domain, self.ADMIN_TASK_DOMAIN)
 
+        # One grouped query per model, whatever the number of courts.
+        hearing_counts = (
+            self._get_case_group_court_counts(hearing_model, hearing_domain, card_courts) if hearing_access else {}
+        )
+        memo_counts = self._get_case_group_court_counts(memo_model, memo_domain, card_courts) if memo_access else {}
+        work_counts = self._get_case_group_court_counts(work_model, work_domain, card_courts) if work_access else {}
+
         filtered_cards = []
         for card in cards:
             court_key = card.get("key")
@@ -109,15 +156,32 @@ class QlkCourtDashboardExtension(models.AbstractModel):
                 work_domain, [("case_group.court", "=", court_key)]
             )
 
-            self._set_metric_payload(metrics, "cases", "qlk.case", case_metric_domain, can_read=True)
             self._set_metric_payload(
-                metrics, "sessions", "qlk.hearing", hearing_metric_domain, can_read=hearing_access
+                metrics, "cases", "qlk.case", case_metric_domain, can_read=True, count=case_counts[court_key]
+            )
+            self._set_metric_payload(
+                metrics,
+                "sessions",
+                "qlk.hearing",
+                hearing_metric_domain,
+                can_read=hearing_access,
+                count=hearing_counts.get(court_key, 0),
             )
             self._set_metric_payload(
-                metrics, "memos", "qlk.memo", memo_metric_domain, can_read=memo_access
+                metrics,
+                "memos",
+                "qlk.memo",
+                memo_metric_domain,
+                can_read=memo_access,
+                count=memo_counts.get(court_key, 0),
             )
             self._set_metric_payload(
-                metrics, "admin_tasks", "qlk.work", work_metric_domain, can_read=work_access
+                metrics,
+                "admin_tasks",
+                "qlk.work",
+                work_metric_domain,
+                can_read=work_access,
+                count=work_counts.get(court_key, 0),
             )
             filtered_cards.append(card)
 
@@ -3,10 +3,12 @@ from datetime import timedelta
 
 from odoo import _, api, fields, models
 from odoo.tools.misc import format_date
+from odoo.addons.qlk_management.models.perf_sample import instrument
 
 
 class LawyerDashboardExtension(models.AbstractModel):
     _inherit = "qlk.lawyer.dashboard"
+    _QUERY_BUDGETS = {"get_dashboard_data": 80}
 
     REQUIRED_HOURS_PER_DAY = 8.0
 
@@ -30,6 +32,9 @@ class LawyerDashboardExtension(models.AbstractModel):
         task_model = self.env["qlk.task"].sudo()
         if "hours_spent" not in task_model._fields:
             return 0.0
+        total_hours = self.env["qlk.hours.daily"].sudo().task_hours_total(domain)
+        if total_hours is not None:
+            return round(total_hours, 2)
         grouped_data = task_model.read_group(domain, ["hours_spent"], [])
         if not grouped_data:
             return 0.0
@@ -54,6 +59,7 @@ class LawyerDashboardExtension(models.AbstractModel):
         return {"id": action.id} if action else False
 
     @api.model
+    @instrument()
     def _get_working_hours_payload(self, employee):
         today = fields.Date.context_today(self)
         week_start = today - timedelta(days=today.weekday())
@@ -291,6 +297,7 @@ class LawyerDashboardExtension(models.AbstractModel):
             break
 
     @api.model
+    @instrument()
     def get_dashboard_data(self):
         data = super().get_dashboard_data()
         self._synchronize_case_card(data)
@@ -323,7 +330,7 @@ class LawyerDashboardExtension(models.AbstractModel):
         case_ids = notification_model.search(case_notification_domain).mapped("case_id").ids
         project_record_domain = [("id", "in", project_ids)]
         case_record_domain = [("id", "in", case_ids)]
-        employee_ids = user.employee_ids.ids
+        employee_ids = list(self.env["qlk.user.access.context"]._get().employee_ids)
         hearing_domain = [
             ("date", "=", today),
             "|",
@@ -6,6 +6,7 @@ from markupsafe import Markup
 
 from odoo import _, api, fields, models
 from odoo.exceptions import AccessError
+from odoo.addons.qlk_management.models.perf_sample import instrument
 
 
 _logger = logging.getLogger(__name__)
@@ -25,6 +26,7 @@ class QlkLawyerNotification(models.Model):
     _description = "Lawyer Notification"
     _inherit = ["mail.thread"]
     _order = "notification_date desc, id desc"
+    _QUERY_BUDGETS = {"cron_daily_lawyer_reminder": 40}
 
     name = fields.Char(string="Notification", required=True, tracking=True)
     user_id = fields.Many2one(
@@ -142,58 +144,113 @@ class QlkLawyerNotification(models.Model):
         )
 
     @api.model
-    def _send_email(self, notification, subject, body_html):
-        if not notification.email_address:
+    def _queue_emails(self, notifications, subject, body_html):
+        """Hand emails to the mail queue instead of sending them inline.
+
+        Delivery results are written back on the notification by
+        ``mail.mail._postprocess_sent_message``.
+        """
+        missing = notifications.filtered(lambda notification: not notification.email_address)
+        if missing:
             error = _("The assigned lawyer does not have an email address.")
-            notification.sudo().write({"email_error": error})
-            self._create_delivery_log(notification, error)
-            return False
-        mail = self.env["mail.mail"].sudo().create(
-            {
-                "subject": subject,
-                "body_html": body_html,
-                "email_to": notification.email_address,
-                "email_from": self._email_from(),
-                "auto_delete": False,
-            }
+            missing.sudo().write({"email_error": error})
+            self.env["qlk.notification.delivery.log"].sudo().create(
+                [
+                    {
+                        "notification_id": notification.id,
+                        "user_id": notification.user_id.id,
+                        "email": notification.email_address,
+                        "delivery_date": fields.Datetime.now(),
+                        "error": error,
+                    }
+                    for notification in missing
+                ]
+            )
+        to_send = notifications - missing
+        if not to_send:
+            return self.env["mail.mail"]
+        email_from = self._email_from()
+        mails = self.env["mail.mail"].sudo().create(
+            [
+                {
+                    "subject": subject,
+                    "body_html": body_html,
+                    "email_to": notification.email_address,
+                    "email_from": email_from,
+                    "auto_delete": False,
+                    "qlk_lawyer_notification_id": notification.id,
+                }
+                for notification in to_send
+            ]
         )
-        try:
-            mail.send(raise_exception=True)
-            notification.sudo().write({"email_sent": True, "email_error": False})
-            return True
-        except Exception as error:  # The internal notification must survive SMTP failures.
-            _logger.exception("Lawyer notification email delivery failed")
-            notification.sudo().write({"email_sent": False, "email_error": str(error)})
-            self._create_delivery_log(notification, error)
-            return False
+        mail_cron = self.env.ref("mail.ir_cron_mail_scheduler_action", raise_if_not_found=False)
+        if mail_cron:
+            mail_cron.sudo()._trigger()
+        return mails
 
     @api.model
-    def _create_activity(self, source, user, subject, body_html):
+    def _send_email(self, notification, subject, body_html):
+        return bool(self._queue_emails(notification, subject, body_html))
+
+    @api.model
+    def _create_activities(self, source, users, subject, body_html):
+        return self._create_activities_batch([(source, users, subject, body_html)])
+
+    @api.model
+    def _create_activities_batch(self, requests):
+        """Create the missing to-do activities of ``requests`` at once.
+
+        ``requests`` is a list of ``(source, users, subject, body_html)``.
+        Existing activities are looked up with one search and the missing ones
+        created with a single ``create``; returns all matching activities.
+        """
         activity_type = self.env.ref("mail.mail_activity_data_todo", raise_if_not_found=False)
-        model = self.env["ir.model"].sudo()._get(source._name)
-        if not activity_type or not model:
-            return False
-        existing = self.env["mail.activity"].sudo().search(
+        Activity = self.env["mail.activity"].sudo()
+        requests = [request for request in requests if request[1]]
+        if not activity_type or not requests:
+            return Activity
+        IrModel = self.env["ir.model"].sudo()
+        models_by_name = {name: IrModel._get(name) for name in {request[0]._name for request in requests}}
+        requests = [request for request in requests if models_by_name[request[0]._name]]
+        if not requests:
+            return Activity
+        existing = Activity.search(
             [
-                ("res_model_id", "=", model.id),
-                ("res_id", "=", source.id),
-                ("user_id", "=", user.id),
-                ("summary", "=", subject),
-            ],
-            limit=1,
+                ("res_model_id", "in", [model.id for model in models_by_name.values() if model]),
+                ("res_id", "in", list({source.id for source, _users, _subject, _body in requests})),
+                ("user_id", "in", list({user_id for request in requests for user_id in request[1].ids})),
+                ("summary", "in", list({subject for _source, _users, subject, _body in requests})),
+            ]
         )
-        if existing:
+        seen = {
+            (activity.res_model_id.id, activity.res_id, activity.user_id.id, activity.summary)
+            for activity in existing
+        }
+        vals_list = []
+        for source, users, subject, body_html in requests:
+            model = models_by_name[source._name]
+            for user in users:
+                key = (model.id, source.id, user.id, subject)
+                if key in seen:
+                    continue
+                seen.add(key)
+                vals_list.append(
+                    {
+                        "activity_type_id": activity_type.id,
+                        "res_model_id": model.id,
+                        "res_id": source.id,
+                        "user_id": user.id,
+                        "summary": subject,
+                        "note": body_html,
+                    }
+                )
+        if not vals_list:
             return existing
-        return self.env["mail.activity"].sudo().create(
-            {
-                "activity_type_id": activity_type.id,
-                "res_model_id": model.id,
-                "res_id": source.id,
-                "user_id": user.id,
-                "summary": subject,
-                "note": body_html,
-            }
-        )
+        return existing | Activity.create(vals_list)
+
+    @api.model
+    def _create_activity(self, source, user, subject, body_html):
+        return self._create_activities(source, user, subject, body_html)[:1]
 
     @api.model
     def notify(
@@ -207,82 +264,177 @@ class QlkLawyerNotification(models.Model):
         case=False,
     ):
         source.ensure_one()
-        users = users.filtered(lambda user: user.active and user.partner_id)
-        notifications = self.browse()
-        for user in users:
-            notification = self.sudo().create(
+        return self.notify_batch(
+            [
                 {
-                    "name": subject,
-                    "user_id": user.id,
+                    "source": source,
+                    "users": users,
                     "notification_type": notification_type,
-                    "project_id": project.id if project else False,
-                    "case_id": case.id if case else False,
-                    "target_model": source._name,
-                    "target_res_id": source.id,
-                    "message": body_html,
-                    "email_address": self._email_address(user),
-                    "assigned_by_id": self.env.user.id,
+                    "subject": subject,
+                    "body_html": body_html,
+                    "project": project,
+                    "case": case,
                 }
-            )
-            notifications |= notification
-            source.sudo().message_subscribe(partner_ids=user.partner_id.ids, subtype_ids=None)
-            source.sudo().message_post(
-                subject=subject,
-                body=Markup(body_html),
-                partner_ids=user.partner_id.ids,
+            ]
+        )
+
+    @api.model
+    def notify_batch(self, entries):
+        """Notify several users about several records at once.
+
+        ``entries`` is a list of dicts with the :meth:`notify` arguments
+        (``source``, ``users``, ``notification_type``, ``subject``,
+        ``body_html`` and optional ``project``/``case``). All notification rows
+        are created with a single ``create``, and so are the missing activities
+        of all entries; each source gets one subscription and one chatter
+        message for all its recipients, and emails are queued rather than sent
+        inline.
+        """
+        entries = [
+            dict(entry, users=entry["users"].filtered(lambda user: user.active and user.partner_id))
+            for entry in entries
+        ]
+        entries = [entry for entry in entries if entry["users"]]
+        if not entries:
+            return self.browse()
+
+        vals_list = []
+        for entry in entries:
+            source = entry["source"]
+            project = entry.get("project")
+            case = entry.get("case")
+            for user in entry["users"]:
+                vals_list.append(
+                    {
+                        "name": entry["subject"],
+                        "user_id": user.id,
+                        "notification_type": entry["notification_type"],
+                        "project_id": project.id if project else False,
+                        "case_id": case.id if case else False,
+                        "target_model": source._name,
+                        "target_res_id": source.id,
+                        "message": entry["body_html"],
+                        "email_address": self._email_address(user),
+                        "assigned_by_id": self.env.user.id,
+                    }
+                )
+        notifications = self.sudo().create(vals_list)
+
+        offset = 0
+        activity_requests = []
+        for entry in entries:
+            source = entry["source"].sudo()
+            users = entry["users"]
+            partners = users.mapped("partner_id")
+            entry_notifications = notifications[offset:offset + len(users)]
+            offset += len(users)
+            source.message_subscribe(partner_ids=partners.ids, subtype_ids=None)
+            source.message_post(
+                subject=entry["subject"],
+                body=Markup(entry["body_html"]),
+                partner_ids=partners.ids,
                 message_type="notification",
                 subtype_xmlid="mail.mt_note",
             )
-            self._create_activity(source, user, subject, body_html)
-            self._send_email(notification, subject, body_html)
-        return notifications
+            activity_requests.append((entry["source"], users, entry["subject"], entry["body_html"]))
+            self._queue_emails(entry_notifications, entry["subject"], entry["body_html"])
+        self._create_activities_batch(activity_requests)
+        return notifications.with_env(self.env)
 
     @api.model
+    def _qlk_retention_cold_storage(self, policy, cutoff, limit):
+        """Move read notifications older than the policy to cold storage."""
+        self.env.cr.execute(
+            """
+            SELECT id FROM qlk_lawyer_notification
+             WHERE state = 'read'
+               AND notification_date < %s
+          ORDER BY id
+             LIMIT %s
+            """,
+            [cutoff, limit],
+        )
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        if not ids:
+            return 0
+        self.env["qlk.retention.policy"]._copy_to_cold_storage(self, ids, "notification_date")
+        # ORM unlink so chatter messages, followers and delivery logs go too.
+        self.sudo().browse(ids).unlink()
+        return len(ids)
+
+    @api.model
+    @instrument()
     def cron_daily_lawyer_reminder(self):
+        self.env["qlk.cron.cursor"]._run_batched(
+            "qlk.lawyer.notification.daily_reminder",
+            self.env["res.users"].sudo(),
+            [
+                ("active", "=", True),
+                ("employee_ids", "!=", False),
+            ],
+            self._send_daily_reminders,
+            cron_xmlid="qlk_law_dashboard.ir_cron_daily_lawyer_reminder",
+            pass_key=str(fields.Date.context_today(self)),
+        )
+        return True
+
+    @api.model
+    def _send_daily_reminders(self, users):
         today = fields.Date.context_today(self)
         tomorrow = today + timedelta(days=1)
         today_start = fields.Datetime.to_datetime(today)
         tomorrow_start = fields.Datetime.to_datetime(tomorrow)
-        users = self.env["res.users"].sudo().search(
+        # One grouped query per source instead of four counts per user.
+        notification_counts = {
+            (user.id, notification_type): count
+            for user, notification_type, count in self._read_group(
+                [
+                    ("notification_type", "in", ("project", "case")),
+                    ("user_id", "in", users.ids),
+                    ("notification_date", ">=", today_start),
+                    ("notification_date", "<", tomorrow_start),
+                ],
+                ["user_id", "notification_type"],
+                ["__count"],
+            )
+        }
+        task_counts = {
+            user.id: count
+            for user, count in self.env["qlk.task"].sudo()._read_group(
+                [
+                    ("assigned_user_id", "in", users.ids),
+                    "|",
+                    "&",
+                    ("delivery_date", ">=", today_start),
+                    ("delivery_date", "<", tomorrow_start),
+                    ("date_finished", "=", today),
+                ],
+                ["assigned_user_id"],
+                ["__count"],
+            )
+        }
+        all_employee_ids = users.employee_ids.ids
+        hearings_today = self.env["qlk.hearing"].sudo().search(
             [
-                ("active", "=", True),
-                ("employee_ids", "!=", False),
-            ]
-        )
-        for user in users:
-            employee_ids = user.employee_ids.ids
-            project_domain = [
-                ("notification_type", "=", "project"),
-                ("user_id", "=", user.id),
-                ("notification_date", ">=", today_start),
-                ("notification_date", "<", tomorrow_start),
-            ]
-            case_domain = [
-                ("notification_type", "=", "case"),
-                ("user_id", "=", user.id),
-                ("notification_date", ">=", today_start),
-                ("notification_date", "<", tomorrow_start),
-            ]
-            hearing_domain = [
                 ("date", "=", today),
                 "|",
                 "|",
-                ("employee_id", "in", employee_ids),
-                ("employee2_id", "in", employee_ids),
-                ("employee_ids", "in", employee_ids),
-            ]
-            task_domain = [
-                ("assigned_user_id", "=", user.id),
-                "|",
-                "&",
-                ("delivery_date", ">=", today_start),
-                ("delivery_date", "<", tomorrow_start),
-                ("date_finished", "=", today),
+                ("employee_id", "in", all_employee_ids),
+                ("employee2_id", "in", all_employee_ids),
+                ("employee_ids", "in", all_employee_ids),
             ]
-            projects = self.search_count(project_domain)
-            cases = self.search_count(case_domain)
-            hearings = self.env["qlk.hearing"].sudo().search_count(hearing_domain)
-            tasks = self.env["qlk.task"].sudo().search_count(task_domain)
+        )
+        hearing_employees = [
+            set((hearing.employee_id | hearing.employee2_id | hearing.employee_ids).ids)
+            for hearing in hearings_today
+        ]
+        entries = []
+        for user in users:
+            employee_ids = set(user.employee_ids.ids)
+            projects = notification_counts.get((user.id, "project"), 0)
+            cases = notification_counts.get((user.id, "case"), 0)
+            hearings = sum(1 for employees in hearing_employees if employees & employee_ids)
+            tasks = task_counts.get(user.id, 0)
             if not any((projects, cases, hearings, tasks)):
                 continue
             body = _(
@@ -303,15 +455,16 @@ class QlkLawyerNotification(models.Model):
                 "hearings": hearings,
                 "tasks": tasks,
             }
-            source = user.partner_id
-            self.notify(
-                source,
-                user,
-                "daily_summary",
-                _("Today's Assigned Work Summary"),
-                body,
+            entries.append(
+                {
+                    "source": user.partner_id,
+                    "users": user,
+                    "notification_type": "daily_summary",
+                    "subject": _("Today's Assigned Work Summary"),
+                    "body_html": body,
+                }
             )
-        return True
+        self.notify_batch(entries)
 
 
 class QlkNotificationDeliveryLog(models.Model):
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models
+
+
+class MailMail(models.Model):
+    _inherit = "mail.mail"
+
+    qlk_lawyer_notification_id = fields.Many2one(
+        "qlk.lawyer.notification",
+        string="Lawyer Notification",
+        ondelete="set null",
+        index=True,
+    )
+
+    def _postprocess_sent_message(self, success_pids, failure_reason=False, failure_type=None):
+        notification_mails = self.filtered("qlk_lawyer_notification_id")
+        if notification_mails:
+            center = self.env["qlk.lawyer.notification"].sudo()
+            notifications = notification_mails.mapped("qlk_lawyer_notification_id").sudo()
+            if failure_type:
+                notifications.write({"email_sent": False, "email_error": failure_reason or failure_type})
+                for notification in notifications:
+                    center._create_delivery_log(notification, failure_reason or failure_type)
+            else:
+                notifications.write({"email_sent": True, "email_error": False})
+        return super()._postprocess_sent_message(
+            success_pids, failure_reason=failure_reason, failure_type=failure_type
+        )
@@ -85,6 +85,9 @@
         'data/hr_automation_cron.xml',
         'data/bd_retainer_cron.xml',
         'data/poa_cron.xml',
+        'data/integrity_scan_cron.xml',
+        'data/client_code_sync_cron.xml',
+        'data/retention_data.xml',
         'views/contact.xml',
         'views/res_partner_views.xml',
         'views/res_partner_contact_info_views.xml',
@@ -124,6 +127,12 @@
         'views/hr_employee_view.xml',
         'views/hr_employee_ui_cleanup_views.xml',
         'views/hr_biometric_views.xml',
+        'views/data_retention_views.xml',
+        'views/perf_sample_views.xml',
+        'views/schema_state_views.xml',
+        'views/integrity_issue_views.xml',
+        'views/client_file_lawyer_link_views.xml',
+        'views/cron_cursor_views.xml',
         'views/project_task_views.xml',
         'views/sub_project.xml',
         'reports/bd_reports.xml',
@@ -169,6 +178,8 @@
             "qlk_management/static/src/js/department_dashboard.js",
             "qlk_management/static/src/xml/department_dashboard.xml",
             "qlk_management/static/src/scss/department_dashboard.scss",
+            "qlk_management/static/src/js/perf_panel.js",
+            "qlk_management/static/src/xml/perf_panel.xml",
         ],
     },
     # 'images': ['static/description/icon.png'],
@@ -29,7 +29,12 @@ from . import bd_engagement_letter
 from . import qlk_task
 from . import qlk_task_hours_wizard
 from . import lawyer_cost_calculation
+from . import cache_generation
+from . import lawyer_rate_card
 from . import res_users
+from . import employee_hierarchy
+from . import identity_resolver
+from . import user_access_context
 from . import analysis_dashboard
 from . import department_dashboard
 from . import arbitration_integration
@@ -46,3 +51,12 @@ from . import qlk_project
 from . import client_file
 from . import project_agreement
 from . import project_hours
+from . import data_retention
+from . import perf_sample
+from . import schema_state
+from . import integrity_scan
+from . import hours_rollup
+from . import client_file_lawyer_link
+from . import client_code_propagation
+from . import code_counter
+from . import batched_cron
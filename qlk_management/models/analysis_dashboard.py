@@ -3,11 +3,13 @@ from dateutil.relativedelta import relativedelta
 
 from odoo import _, api, fields, models
 from odoo.osv.expression import OR
+from .perf_sample import instrument
 
 
 class QlkAnalysisDashboard(models.AbstractModel):
     _name = "qlk.analysis.dashboard"
     _description = "Analytics Dashboard Service"
+    _QUERY_BUDGETS = {"get_dashboard_data": 60}
 
     def _month_ranges(self, months=6):
         today = fields.Date.context_today(self)
@@ -60,6 +62,7 @@ class QlkAnalysisDashboard(models.AbstractModel):
             domain += OR(user_scopes)
         return domain
 
+    @instrument()
     def _aggregate_monthly(self, model_name, domain=None, date_field="date", value_field="id", value_type="count", months=6, action=None):
         if model_name not in self.env:
             return []
@@ -89,17 +92,41 @@ class QlkAnalysisDashboard(models.AbstractModel):
             )
         return results
 
+    def _task_hours_monthly(self, domain, months=6, action=None):
+        """Monthly approved hours from the daily rollup, or None."""
+        ranges = self._month_ranges(months=months)
+        rows = self.env["qlk.hours.daily"].read_task_hours(
+            list(domain) + [("date_start", ">=", ranges[0][1]), ("date_start", "<=", ranges[-1][2])],
+            ["date_start:month"],
+        )
+        if rows is None:
+            return None
+        hours_by_month = {month.strftime("%Y-%m"): hours for month, hours in rows if month}
+        return [
+            {
+                "label": label,
+                "value": hours_by_month.get(label, 0.0),
+                "domain": self._normalize_domain(
+                    list(domain) + [("date_start", ">=", date_from), ("date_start", "<=", date_to)]
+                ),
+                "action": action,
+            }
+            for label, date_from, date_to in ranges
+        ]
+
     def _summaries(self, model_name, domain=None):
         if model_name not in self.env:
             return 0
         return self.env[model_name].search_count(domain or [])
 
     @api.model
+    @instrument()
     def get_dashboard_data(self, months=6):
         user = self.env.user
-        employee_ids = user.employee_ids.ids
+        access = self.env["qlk.user.access.context"]._get()
+        employee_ids = list(access.employee_ids)
         # هذا المتغير يفعّل عرض شامل للمديرين فقط، ويقيّد بقية الموظفين ببياناتهم.
-        allow_all = user._qlk_can_view_all_dashboards()
+        allow_all = access.can_view_all
 
         try:
             months = int(months)
@@ -121,8 +148,10 @@ class QlkAnalysisDashboard(models.AbstractModel):
             "engagements": self._summaries("bd.engagement.letter", scoped_domain("bd.engagement.letter")),
         }
 
-        task_hours_group = self.env["qlk.task"].read_group(approved_task_domain, ["hours_spent"], [])
-        totals["task_hours"] = task_hours_group[0].get("hours_spent", 0.0) if task_hours_group else 0.0
+        totals["task_hours"] = self.env["qlk.hours.daily"].task_hours_total(approved_task_domain)
+        if totals["task_hours"] is None:
+            task_hours_group = self.env["qlk.task"].read_group(approved_task_domain, ["hours_spent"], [])
+            totals["task_hours"] = task_hours_group[0].get("hours_spent", 0.0) if task_hours_group else 0.0
 
         def safe_aggregate(model, domain=None, date_field="date", value_field="id", value_type="count", action=None):
             if model not in self.env:
@@ -173,21 +202,33 @@ class QlkAnalysisDashboard(models.AbstractModel):
         if "qlk.task" in self.env:
             task_model = self.env["qlk.task"]
             selection = dict(task_model._fields["department"].selection)
-            grouped = task_model.read_group(task_domain, ["department"], ["department"])
-            for entry in grouped:
-                dept = entry.get("department")
+            department_rows = self.env["qlk.hours.daily"].read_task_hours(
+                task_domain, ["department"], ["task_count:sum"]
+            )
+            if department_rows is None:
+                department_rows = [
+                    (entry.get("department"), entry.get("department_count", 0))
+                    for entry in task_model.read_group(task_domain, ["department"], ["department"])
+                ]
+            for dept, count in department_rows:
                 if not dept:
                     continue
                 local_domain = task_domain + [("department", "=", dept)]
                 task_department.append(
                     {
                         "label": selection.get(dept, dept),
-                        "value": entry.get("department_count", 0),
+                        "value": count or 0,
                         "domain": self._normalize_domain(local_domain),
                         "action": "tasks",
                     }
                 )
 
+        task_hours_series = self._task_hours_monthly(approved_task_domain, months=months, action="tasks")
+        if task_hours_series is None:
+            task_hours_series = safe_aggregate(
+                "qlk.task", approved_task_domain, date_field="date_start", value_field="hours_spent", value_type="sum", action="tasks"
+            )
+
         data = {
             "palette": {
                 "primary": "#0F5CA8",
@@ -202,7 +243,7 @@ class QlkAnalysisDashboard(models.AbstractModel):
                 "consultations": safe_aggregate("qlk.consulting", scoped_domain("qlk.consulting"), date_field="date", action="consultations") if "qlk.consulting" in self.env else [],
                 "complaints": safe_aggregate("qlk.police.complaint", scoped_domain("qlk.police.complaint"), date_field="date", action="complaints") if "qlk.police.complaint" in self.env else [],
                 "engagements": safe_aggregate("bd.engagement.letter", scoped_domain("bd.engagement.letter"), date_field="date", action="engagements"),
-                "task_hours": safe_aggregate("qlk.task", approved_task_domain, date_field="date_start", value_field="hours_spent", value_type="sum", action="tasks"),
+                "task_hours": task_hours_series,
                 "case_status": case_status,
                 "hearing_stage": hearing_stage,
                 "task_department": task_department,
@@ -3,6 +3,13 @@
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
 
+from .legal_numbering import LEGAL_RECORD_CODE_COLUMNS
+from .schema_state import add_columns, run_init_step
+
+
+def _init_arbitration_case_columns(env):
+    return add_columns(env.cr, "qlk_arbitration_case", LEGAL_RECORD_CODE_COLUMNS)
+
 
 class ArbitrationCaseProject(models.Model):
     _inherit = "qlk.arbitration.case"
@@ -65,12 +72,14 @@ class ArbitrationCaseProject(models.Model):
 
     def init(self):
         super().init()
-        cr = self.env.cr
-        cr.execute("ALTER TABLE qlk_arbitration_case ADD COLUMN IF NOT EXISTS service_category varchar")
-        cr.execute("ALTER TABLE qlk_arbitration_case ADD COLUMN IF NOT EXISTS client_legal_code varchar")
-        cr.execute("ALTER TABLE qlk_arbitration_case ADD COLUMN IF NOT EXISTS project_legal_code varchar")
-        cr.execute("ALTER TABLE qlk_arbitration_case ADD COLUMN IF NOT EXISTS record_sequence integer DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_arbitration_case ADD COLUMN IF NOT EXISTS record_code varchar")
+        run_init_step(
+            self.env,
+            "qlk_arbitration_case.legal_code_columns",
+            "1",
+            _init_arbitration_case_columns,
+            tables=["qlk_arbitration_case"],
+            data=LEGAL_RECORD_CODE_COLUMNS,
+        )
 
     @api.depends("engagement_id", "agreement_hours")
     def _compute_project_hours(self):
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Chunked, resumable cron passes.
+
+Crons used to load their whole result set and process it in one
+transaction: a failure late in the run rolled everything back, and long
+runs held a worker. :meth:`QlkCronCursor._run_batched` walks the records in
+id order, one committed chunk at a time, and keeps the id of the last
+processed record. A run stops after a time budget and triggers its cron
+again; a failed run resumes after the last committed chunk. A record that
+fails is logged and skipped so it does not block the records after it.
+"""
+
+import logging
+import threading
+import time
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_MAX_SECONDS = 300
+
+
+class QlkCronCursor(models.Model):
+    _name = "qlk.cron.cursor"
+    _description = "Batched Cron Progress"
+    _order = "name"
+    _log_access = False
+
+    name = fields.Char(string="Job", required=True, readonly=True)
+    last_id = fields.Integer(string="Resume After ID", readonly=True)
+    processed = fields.Integer(string="Processed (Current Pass)", readonly=True)
+    failed = fields.Integer(string="Failed (Current Pass)", readonly=True)
+    pass_key = fields.Char(string="Pass Key", readonly=True)
+    remaining = fields.Integer(string="Remaining", readonly=True)
+    pass_started_on = fields.Datetime(string="Pass Started On", readonly=True)
+    last_run = fields.Datetime(string="Last Run", readonly=True)
+    last_done = fields.Datetime(string="Last Completed", readonly=True)
+
+    _sql_constraints = [
+        ("name_unique", "UNIQUE(name)", "A cron cursor already exists for this job."),
+    ]
+
+    @api.model
+    def _commit_chunk(self):
+        # Tests and benchmark measurements run crons inside a savepoint.
+        if getattr(threading.current_thread(), "testing", False) or self.env.context.get("cron_no_commit"):
+            return
+        self.env.cr.commit()
+
+    @api.model
+    def _process_chunk(self, job, records, process):
+        """Call ``process(records)``, return the number of skipped records.
+
+        A failing chunk is rolled back and retried record by record; the
+        records that still fail are logged and skipped.
+        """
+        cr = self.env.cr
+        try:
+            with cr.savepoint():
+                process(records)
+                records.env.flush_all()
+            return 0
+        except Exception:
+            _logger.warning("Batched cron %s: chunk failed, retrying record by record", job, exc_info=True)
+        failed = 0
+        for record in records:
+            try:
+                with cr.savepoint():
+                    process(record)
+                    record.env.flush_all()
+            except Exception:
+                failed += 1
+                _logger.exception("Batched cron %s: %s failed and was skipped", job, record)
+        return failed
+
+    @api.model
+    def _run_batched(
+        self,
+        job,
+        model,
+        domain,
+        process,
+        cron_xmlid=None,
+        batch_size=DEFAULT_BATCH_SIZE,
+        max_seconds=DEFAULT_MAX_SECONDS,
+        pass_key=None,
+    ):
+        """Call ``process(records)`` on ``model.search(domain)`` chunk by chunk.
+
+        Chunks of ``batch_size`` records are taken in id order and committed
+        one by one. After ``max_seconds`` the run stops and, if records are
+        left, triggers the cron ``cron_xmlid`` again. Returns True once the
+        pass over the records is complete.
+
+        A pass left unfinished with another ``pass_key`` (e.g. the date of a
+        daily job) is abandoned and a new pass starts from the first record.
+        """
+        deadline = time.monotonic() + max_seconds
+        cr = self.env.cr
+        # A cursor at 0, or left by a pass with another key, starts a new pass.
+        cr.execute(
+            """
+            INSERT INTO qlk_cron_cursor
+                   (name, last_id, processed, failed, remaining, pass_key, pass_started_on, last_run)
+            VALUES (%s, 0, 0, 0, 0, %s, now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC')
+            ON CONFLICT (name) DO UPDATE
+               SET last_run = EXCLUDED.last_run,
+                   last_id = CASE WHEN qlk_cron_cursor.pass_key IS DISTINCT FROM EXCLUDED.pass_key
+                                  THEN 0 ELSE qlk_cron_cursor.last_id END,
+                   processed = CASE WHEN qlk_cron_cursor.last_id = 0
+                                      OR qlk_cron_cursor.pass_key IS DISTINCT FROM EXCLUDED.pass_key
+                                    THEN 0 ELSE qlk_cron_cursor.processed END,
+                   failed = CASE WHEN qlk_cron_cursor.last_id = 0
+                                   OR qlk_cron_cursor.pass_key IS DISTINCT FROM EXCLUDED.pass_key
+                                 THEN 0 ELSE qlk_cron_cursor.failed END,
+                   pass_started_on = CASE WHEN qlk_cron_cursor.last_id = 0
+                                            OR qlk_cron_cursor.pass_key IS DISTINCT FROM EXCLUDED.pass_key
+                                          THEN EXCLUDED.pass_started_on
+                                          ELSE qlk_cron_cursor.pass_started_on END,
+                   pass_key = EXCLUDED.pass_key
+            RETURNING last_id, processed, failed
+            """,
+            [job, pass_key],
+        )
+        last_id, processed, failed = cr.fetchone()
+        complete = False
+        while True:
+            records = model.search(domain + [("id", ">", last_id)], order="id", limit=batch_size)
+            if records:
+                failed += self._process_chunk(job, records, process)
+                last_id = records[-1].id
+                processed += len(records)
+            if len(records) < batch_size:
+                complete = True
+                break
+            cr.execute(
+                "UPDATE qlk_cron_cursor SET last_id = %s, processed = %s, failed = %s WHERE name = %s",
+                [last_id, processed, failed, job],
+            )
+            self._commit_chunk()
+            if time.monotonic() >= deadline:
+                break
+        remaining = 0 if complete else model.search_count(domain + [("id", ">", last_id)])
+        if not remaining:
+            cr.execute(
+                """
+                UPDATE qlk_cron_cursor
+                   SET last_id = 0, processed = %s, failed = %s, remaining = 0,
+                       last_run = now() AT TIME ZONE 'UTC', last_done = now() AT TIME ZONE 'UTC'
+                 WHERE name = %s
+                """,
+                [processed, failed, job],
+            )
+            self.invalidate_model()
+            self._commit_chunk()
+            _logger.info("Batched cron %s: pass complete, %s records, %s failed", job, processed, failed)
+            return True
+        cr.execute(
+            "UPDATE qlk_cron_cursor SET processed = %s, failed = %s, remaining = %s WHERE name = %s",
+            [processed, failed, remaining, job],
+        )
+        self.invalidate_model()
+        self._commit_chunk()
+        _logger.info("Batched cron %s: stopped after %s records, %s remaining", job, processed, remaining)
+        if cron_xmlid:
+            cron = self.env.ref(cron_xmlid, raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
+        return False
@@ -2,11 +2,13 @@
 from odoo import _, api, fields, models
 from odoo.exceptions import AccessError
 from odoo.osv.expression import OR
+from .perf_sample import instrument
 
 
 class QlkBusinessDevelopmentDashboard(models.AbstractModel):
     _name = "qlk.bd.dashboard"
     _description = "Business Development Dashboard Service"
+    _QUERY_BUDGETS = {"get_dashboard_data": 40}
 
     def _action_payload(self, xmlid):
         action = self.env.ref(xmlid, raise_if_not_found=False)
@@ -163,11 +165,13 @@ class QlkBusinessDevelopmentDashboard(models.AbstractModel):
         return followups, total
 
     @api.model
+    @instrument()
     def get_dashboard_data(self):
         user = self.env.user
-        employee_ids = user.employee_ids.ids
+        access = self.env["qlk.user.access.context"]._get()
+        employee_ids = list(access.employee_ids)
         # هذا المتغير يسمح للمديرين بالرؤية الشاملة، ويقيّد بقية المستخدمين ببياناتهم.
-        allow_all = user._qlk_can_view_all_dashboards()
+        allow_all = access.can_view_all
 
         proposal_model = self.env["bd.proposal"]
         engagement_model = self.env["bd.engagement.letter"]
@@ -6,6 +6,8 @@
 # ------------------------------------------------------------------------------
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from .perf_sample import instrument
+from .schema_state import add_columns, run_init_step
 
 PROJECT_TYPE_SELECTION = [
     ("cm", "CM"),
@@ -34,6 +36,29 @@ TRANSLATION_STATUS_SELECTION = [
 ]
 
 
+def _init_bd_engagement_letter_billing(env):
+    cr = env.cr
+    # Upgrade guard for the workflow notification mixin field during registry rebuilds.
+    add_columns(cr, "bd_engagement_letter", [("workflow_notification_keys", "text")])
+    # Normalize legacy billing values introduced during previous customizations.
+    cr.execute(
+        """
+        UPDATE bd_engagement_letter
+           SET billing_type = 'paid'
+         WHERE billing_type IN ('billable', 'fixed', 'retainer')
+        """
+    )
+    rows = cr.rowcount
+    cr.execute(
+        """
+        UPDATE bd_engagement_letter
+           SET retainer_period = 'retainer'
+         WHERE retainer_period IN ('annual', 'monthly')
+        """
+    )
+    return rows + cr.rowcount
+
+
 class BDEngagementLetter(models.Model):
     _name = "bd.engagement.letter"
     _description = "Engagement Letter"
@@ -46,6 +71,7 @@ class BDEngagementLetter(models.Model):
     ]
     _order = "create_date desc"
     _rec_name = "code"
+    _QUERY_BUDGETS = {"cron_check_retainer_usage": 60}
 
     date = fields.Date(string="Date", required=True, default=fields.Date.context_today, tracking=True)
     reference = fields.Char(string="Reference", tracking=True)
@@ -357,24 +383,12 @@ class BDEngagementLetter(models.Model):
         ]
 
     def init(self):
-        # Upgrade guard for the workflow notification mixin field during registry rebuilds.
-        self._cr.execute(
-            "ALTER TABLE bd_engagement_letter ADD COLUMN IF NOT EXISTS workflow_notification_keys text"
-        )
-        # Normalize legacy billing values introduced during previous customizations.
-        self._cr.execute(
-            """
-            UPDATE bd_engagement_letter
-               SET billing_type = 'paid'
-             WHERE billing_type IN ('billable', 'fixed', 'retainer')
-            """
-        )
-        self._cr.execute(
-            """
-            UPDATE bd_engagement_letter
-               SET retainer_period = 'retainer'
-             WHERE retainer_period IN ('annual', 'monthly')
-            """
+        run_init_step(
+            self.env,
+            "bd_engagement_letter.legacy_billing",
+            "1",
+            _init_bd_engagement_letter_billing,
+            tables=["bd_engagement_letter"],
         )
 
     @api.depends("litigation_degree_ids")
@@ -761,37 +775,7 @@ class BDEngagementLetter(models.Model):
 
     @api.model
     def _clean_invalid_links(self):
-        records = self.sudo().search([])
-        for name, field in self._fields.items():
-            if field.type != "many2one":
-                continue
-            table = self._table
-            column = name
-            comodel = self.env.get(field.comodel_name)
-            if not comodel:
-                self.env.cr.execute(
-                    f"""
-                    SELECT id
-                    FROM {table}
-                    WHERE {column} IS NOT NULL
-                    """
-                )
-                bad_ids = [row[0] for row in self.env.cr.fetchall()]
-                if bad_ids:
-                    records.browse(bad_ids).write({name: False})
-                continue
-            comodel_table = comodel._table
-            self.env.cr.execute(
-                f"""
-                SELECT id
-                FROM {table}
-                WHERE {column} IS NOT NULL
-                  AND {column} NOT IN (SELECT id FROM {comodel_table})
-                """
-            )
-            bad_ids = [row[0] for row in self.env.cr.fetchall()]
-            if bad_ids:
-                records.browse(bad_ids).write({name: False})
+        return self.env["qlk.integrity.scanner"].scan(fix=True, model_names=[self._name])
 
     # ------------------------------------------------------------------------------
     # التحقق من الحالات قبل تغييرها لضمان صحة دورة العمل.
@@ -1298,53 +1282,28 @@ class BDEngagementLetter(models.Model):
             letter.write({"client_code": client_code, "code": code})
 
     def _find_lawyer_cost(self, lawyer_id):
+        employee_ids = self.env["qlk.identity.resolver"].employees_for_partners([lawyer_id]).get(lawyer_id)
+        if employee_ids:
+            # The effective-dated rate card wins over the legacy cost records.
+            rates = self.env["qlk.lawyer.rate"].sudo()._rates_for(
+                employee_ids, date=self[:1].date, company=self[:1].company_id
+            )
+            for employee_id in employee_ids:
+                if employee_id in rates:
+                    return rates[employee_id], True
         cost = self.env["lawyer.cost.calculation"].search([("partner_id", "=", lawyer_id)], limit=1)
         if cost:
             return cost.cost_per_hour, True
-        employee_model = self.env["hr.employee"]
-        domain_parts = []
-        if "address_home_id" in employee_model._fields:
-            domain_parts.append(("address_home_id", "=", lawyer_id))
-        if "work_contact_id" in employee_model._fields:
-            domain_parts.append(("work_contact_id", "=", lawyer_id))
-        if "user_id" in employee_model._fields:
-            domain_parts.append(("user_id.partner_id", "=", lawyer_id))
-        if domain_parts:
-            employee_domain = []
-            for part in domain_parts:
-                if employee_domain:
-                    employee_domain = ["|"] + employee_domain + [part]
-                else:
-                    employee_domain = [part]
-            employees = employee_model.search(employee_domain)
-            if employees:
-                cost = self.env["cost.calculation"].search(
-                    [("employee_id", "in", employees.ids)], limit=1
-                )
-                if cost:
-                    return cost.cost_per_hour, True
+        if employee_ids:
+            cost = self.env["cost.calculation"].search(
+                [("employee_id", "in", list(employee_ids))], limit=1
+            )
+            if cost:
+                return cost.cost_per_hour, True
         return 0.0, False
 
     def _employee_from_partner(self, partner):
-        if not partner:
-            return self.env["hr.employee"]
-        employee_model = self.env["hr.employee"]
-        domain_parts = []
-        if "address_home_id" in employee_model._fields:
-            domain_parts.append(("address_home_id", "=", partner.id))
-        if "work_contact_id" in employee_model._fields:
-            domain_parts.append(("work_contact_id", "=", partner.id))
-        if "user_id" in employee_model._fields:
-            domain_parts.append(("user_id.partner_id", "=", partner.id))
-        if not domain_parts:
-            return employee_model.browse()
-        employee_domain = []
-        for part in domain_parts:
-            if employee_domain:
-                employee_domain = ["|"] + employee_domain + [part]
-            else:
-                employee_domain = [part]
-        return employee_model.search(employee_domain, limit=1)
+        return self.env["qlk.identity.resolver"].employee_for_partner(partner)
 
     def _partner_from_employee(self, employee):
         if not employee:
@@ -1629,15 +1588,19 @@ class BDEngagementLetter(models.Model):
                 raise UserError(_("Only Assistant Managers can approve or reject this document."))
 
     @api.model
+    @instrument()
     def cron_check_retainer_usage(self):
-        letters = self.search(
+        self.env["qlk.cron.cursor"]._run_batched(
+            "bd.engagement.letter.retainer_usage",
+            self,
             [
                 ("billing_type", "!=", "free"),
                 ("retainer_period", "=", "retainer"),
                 ("state", "not in", ("rejected", "cancelled")),
-            ]
+            ],
+            lambda letters: letters._process_retainer_notifications(),
+            cron_xmlid="qlk_management.ir_cron_bd_engagement_retainer_usage",
         )
-        letters._process_retainer_notifications()
 
 
 class BDEngagementLetterFee(models.Model):
@@ -1727,8 +1690,29 @@ class BDEngagementLetterFee(models.Model):
     def _get_current_lawyer_cost(self, employee):
         if not employee:
             return 0.0
-        if employee.lawyer_hour_cost:
-            return employee.lawyer_hour_cost
+        return self._get_lawyer_costs(employee, self.letter_id[:1])[employee.id]
+
+    def _get_lawyer_costs(self, employees, letter):
+        """Return ``{employee_id: hour cost}`` at the date of ``letter``.
+
+        All ``employees`` are priced with one rate card lookup; those without
+        a rate fall back on their own hour cost, then on the legacy cost
+        records.
+        """
+        rates = self.env["qlk.lawyer.rate"].sudo()._rates_for(
+            employees.ids, date=letter.date, company=letter.company_id
+        )
+        costs = {}
+        for employee in employees:
+            if employee.id in rates:
+                costs[employee.id] = rates[employee.id]
+            elif employee.lawyer_hour_cost:
+                costs[employee.id] = employee.lawyer_hour_cost
+            else:
+                costs[employee.id] = self._get_legacy_lawyer_cost(employee)
+        return costs
+
+    def _get_legacy_lawyer_cost(self, employee):
         partner = employee.user_id.partner_id
         if not partner and "work_contact_id" in employee._fields:
             partner = employee.work_contact_id
@@ -1742,14 +1726,24 @@ class BDEngagementLetterFee(models.Model):
         )
         return cost_record.cost_per_hour if cost_record else 0.0
 
+    def _fill_lawyer_costs(self, vals_list):
+        """Set the missing ``lawyer_cost`` of ``vals_list``, one rate lookup per engagement letter."""
+        pending = {}
+        for vals in vals_list:
+            if vals.get("assigned_lawyer_id") and "lawyer_cost" not in vals:
+                pending.setdefault(vals.get("letter_id") or self.letter_id[:1].id, []).append(vals)
+        for letter_id, letter_vals_list in pending.items():
+            employee_ids = {vals["assigned_lawyer_id"] for vals in letter_vals_list}
+            employees = self.env["hr.employee"].browse(list(employee_ids))
+            costs = self._get_lawyer_costs(employees, self.env["bd.engagement.letter"].browse(letter_id))
+            for vals in letter_vals_list:
+                vals["lawyer_cost"] = costs[vals["assigned_lawyer_id"]]
+
     def _normalize_line_vals(self, vals):
         if vals.get("service_name") and not vals.get("description"):
             vals["description"] = vals["service_name"]
         elif vals.get("description") and not vals.get("service_name"):
             vals["service_name"] = vals["description"]
-        if vals.get("assigned_lawyer_id") and "lawyer_cost" not in vals:
-            employee = self.env["hr.employee"].browse(vals["assigned_lawyer_id"])
-            vals["lawyer_cost"] = self._get_current_lawyer_cost(employee)
         pricing_keys = {"quantity", "unit_price", "discount", "discount_type"}
         if pricing_keys.intersection(vals):
             vals["amount"] = self._get_line_subtotal_from_vals(vals)
@@ -1757,9 +1751,11 @@ class BDEngagementLetterFee(models.Model):
 
     @api.onchange("assigned_lawyer_id")
     def _onchange_assigned_lawyer_id(self):
-        for line in self:
-            if line.assigned_lawyer_id and not line.lawyer_cost:
-                line.lawyer_cost = line._get_current_lawyer_cost(line.assigned_lawyer_id)
+        lines = self.filtered(lambda line: line.assigned_lawyer_id and not line.lawyer_cost)
+        for letter, letter_lines in lines.grouped("letter_id").items():
+            costs = self._get_lawyer_costs(letter_lines.assigned_lawyer_id, letter)
+            for line in letter_lines:
+                line.lawyer_cost = costs[line.assigned_lawyer_id.id]
 
     @api.onchange("service_name", "quantity", "unit_price", "discount", "discount_type")
     def _onchange_pricing_fields(self):
@@ -1770,10 +1766,21 @@ class BDEngagementLetterFee(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        vals_list = [self._normalize_line_vals(dict(vals)) for vals in vals_list]
+        vals_list = [dict(vals) for vals in vals_list]
+        self._fill_lawyer_costs(vals_list)
+        vals_list = [self._normalize_line_vals(vals) for vals in vals_list]
         return super().create(vals_list)
 
     def write(self, vals):
+        if "assigned_lawyer_id" in vals and "lawyer_cost" not in vals:
+            if vals["assigned_lawyer_id"] and len(self.letter_id) > 1:
+                # Each engagement letter prices the lawyer at its own date.
+                result = True
+                for lines in self.grouped("letter_id").values():
+                    result = lines.write(vals) and result
+                return result
+            employee = self.env["hr.employee"].browse(vals["assigned_lawyer_id"])
+            vals = dict(vals, lawyer_cost=self._get_current_lawyer_cost(employee))
         pricing_keys = {"quantity", "unit_price", "discount", "discount_type"}
         if len(self) > 1 and pricing_keys.intersection(vals):
             result = True
@@ -1783,10 +1790,4 @@ class BDEngagementLetterFee(models.Model):
                 ) and result
             return result
         vals = self._normalize_line_vals(dict(vals))
-        if "assigned_lawyer_id" in vals and "lawyer_cost" not in vals:
-            if vals.get("assigned_lawyer_id"):
-                employee = self.env["hr.employee"].browse(vals["assigned_lawyer_id"])
-                vals["lawyer_cost"] = self._get_current_lawyer_cost(employee)
-            else:
-                vals["lawyer_cost"] = 0.0
         return super().write(vals)
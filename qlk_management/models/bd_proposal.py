@@ -6,6 +6,8 @@
 # ------------------------------------------------------------------------------
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from .perf_sample import instrument
+from .schema_state import add_columns, run_init_step
 
 PAYMENT_STATUS_SELECTION = [
     ("unpaid", "Unpaid"),
@@ -19,6 +21,9 @@ TRANSLATION_STATUS_SELECTION = [
     ("done", "Translated"),
 ]
 
+# qlk.code.counter scope of proposal numbers, keyed by "<client id>/<proposal type>".
+PROPOSAL_SEQUENCE_COUNTER = "proposal_sequence"
+
 LEGACY_RETAINER_SERVICE_CODES = {
     "litigation": ["litigation"],
     "corporate": ["corporate"],
@@ -28,6 +33,30 @@ LEGACY_RETAINER_SERVICE_CODES = {
     "management_litigation": ["litigation"],
 }
 
+
+def _init_bd_proposal_billing(env):
+    cr = env.cr
+    # Upgrade guard for the workflow notification mixin field during registry rebuilds.
+    add_columns(cr, "bd_proposal", [("workflow_notification_keys", "text")])
+    # Normalize legacy billing values introduced during previous customizations.
+    cr.execute(
+        """
+        UPDATE bd_proposal
+           SET billing_type = 'paid'
+         WHERE billing_type IN ('billable', 'fixed', 'retainer')
+        """
+    )
+    rows = cr.rowcount
+    cr.execute(
+        """
+        UPDATE bd_proposal
+           SET retainer_period = 'retainer'
+         WHERE retainer_period IN ('annual', 'monthly')
+        """
+    )
+    return rows + cr.rowcount
+
+
 class BDProposal(models.Model):
     _name = "bd.proposal"
     _description = "Business Proposal"
@@ -39,6 +68,7 @@ class BDProposal(models.Model):
         "qlk.workflow.notification.mixin",
     ]
     _order = "create_date desc"
+    _QUERY_BUDGETS = {"cron_check_retainer_usage": 60}
 
     name = fields.Char(
         string="Document Number",
@@ -248,24 +278,12 @@ class BDProposal(models.Model):
         ]
 
     def init(self):
-        # Upgrade guard for the workflow notification mixin field during registry rebuilds.
-        self._cr.execute(
-            "ALTER TABLE bd_proposal ADD COLUMN IF NOT EXISTS workflow_notification_keys text"
-        )
-        # Normalize legacy billing values introduced during previous customizations.
-        self._cr.execute(
-            """
-            UPDATE bd_proposal
-               SET billing_type = 'paid'
-             WHERE billing_type IN ('billable', 'fixed', 'retainer')
-            """
-        )
-        self._cr.execute(
-            """
-            UPDATE bd_proposal
-               SET retainer_period = 'retainer'
-             WHERE retainer_period IN ('annual', 'monthly')
-            """
+        run_init_step(
+            self.env,
+            "bd_proposal.legacy_billing",
+            "1",
+            _init_bd_proposal_billing,
+            tables=["bd_proposal"],
         )
 
     
@@ -652,7 +670,6 @@ class BDProposal(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        sequence_cache = {}
         service_model = self.env["qlk.legal.service.type"]
         for vals in vals_list:
             if not vals.get("legal_service_type_ids"):
@@ -669,7 +686,7 @@ class BDProposal(models.Model):
             lead_vals = vals.get("lead_id") and self._prepare_lead_defaults(vals["lead_id"]) or {}
             if lead_vals and lead_vals.get("partner_id") and not vals.get("partner_id"):
                 vals["partner_id"] = lead_vals["partner_id"]
-            self._prepare_partner_sequence_vals(vals, sequence_cache)
+            self._prepare_partner_sequence_vals(vals)
         records = super().create(vals_list)
         records._sync_assigned_date()
         records._copy_partner_attachments()
@@ -878,53 +895,28 @@ class BDProposal(models.Model):
         return False
 
     def _find_lawyer_cost(self, lawyer_id):
+        employee_ids = self.env["qlk.identity.resolver"].employees_for_partners([lawyer_id]).get(lawyer_id)
+        if employee_ids:
+            # The effective-dated rate card wins over the legacy cost records.
+            rates = self.env["qlk.lawyer.rate"].sudo()._rates_for(
+                employee_ids, date=self[:1].date, company=self[:1].company_id
+            )
+            for employee_id in employee_ids:
+                if employee_id in rates:
+                    return rates[employee_id], True
         cost = self.env["lawyer.cost.calculation"].search([("partner_id", "=", lawyer_id)], limit=1)
         if cost:
             return cost.cost_per_hour, True
-        employee_model = self.env["hr.employee"]
-        domain_parts = []
-        if "address_home_id" in employee_model._fields:
-            domain_parts.append(("address_home_id", "=", lawyer_id))
-        if "work_contact_id" in employee_model._fields:
-            domain_parts.append(("work_contact_id", "=", lawyer_id))
-        if "user_id" in employee_model._fields:
-            domain_parts.append(("user_id.partner_id", "=", lawyer_id))
-        if domain_parts:
-            employee_domain = []
-            for part in domain_parts:
-                if employee_domain:
-                    employee_domain = ["|"] + employee_domain + [part]
-                else:
-                    employee_domain = [part]
-            employees = employee_model.search(employee_domain)
-            if employees:
-                cost = self.env["cost.calculation"].search(
-                    [("employee_id", "in", employees.ids)], limit=1
-                )
-                if cost:
-                    return cost.cost_per_hour, True
+        if employee_ids:
+            cost = self.env["cost.calculation"].search(
+                [("employee_id", "in", list(employee_ids))], limit=1
+            )
+            if cost:
+                return cost.cost_per_hour, True
         return 0.0, False
 
     def _employee_from_partner(self, partner):
-        if not partner:
-            return self.env["hr.employee"]
-        employee_model = self.env["hr.employee"]
-        domain_parts = []
-        if "address_home_id" in employee_model._fields:
-            domain_parts.append(("address_home_id", "=", partner.id))
-        if "work_contact_id" in employee_model._fields:
-            domain_parts.append(("work_contact_id", "=", partner.id))
-        if "user_id" in employee_model._fields:
-            domain_parts.append(("user_id.partner_id", "=", partner.id))
-        if not domain_parts:
-            return employee_model.browse()
-        employee_domain = []
-        for part in domain_parts:
-            if employee_domain:
-                employee_domain = ["|"] + employee_domain + [part]
-            else:
-                employee_domain = [part]
-        return employee_model.search(employee_domain, limit=1)
+        return self.env["qlk.identity.resolver"].employee_for_partner(partner)
 
     def _partner_from_employee(self, employee):
         if not employee:
@@ -993,14 +985,14 @@ class BDProposal(models.Model):
         cost, _found = self._find_lawyer_cost(lawyer_id)
         return cost
 
-    def _prepare_partner_sequence_vals(self, vals, sequence_cache):
+    def _prepare_partner_sequence_vals(self, vals):
         partner_id = vals.get("partner_id")
         if not partner_id:
             raise UserError(_("Please select a client before creating the document."))
         partner = self.env["res.partner"].browse(partner_id)
         client_code = partner._get_client_code()
         proposal_type = vals.get("proposal_type") or "proposal"
-        seq_number = self._next_client_sequence(partner.id, proposal_type, sequence_cache)
+        seq_number = self._next_client_sequence(partner.id, proposal_type)
         vals["proposal_type"] = proposal_type
         vals["client_code"] = client_code
         vals["client_sequence"] = seq_number
@@ -1008,15 +1000,17 @@ class BDProposal(models.Model):
         vals["name"] = document_number
         vals["code"] = document_number
 
-    def _next_client_sequence(self, partner_id, proposal_type, sequence_cache):
-        cache_key = (partner_id, proposal_type)
-        last_number = sequence_cache.get(cache_key)
-        if last_number is None:
-            domain = [("partner_id", "=", partner_id), ("proposal_type", "=", proposal_type)]
-            last = self.search(domain, order="client_sequence desc", limit=1)
-            last_number = last.client_sequence if last else 0
-        sequence_cache[cache_key] = (last_number or 0) + 1
-        return sequence_cache[cache_key]
+    def _next_client_sequence(self, partner_id, proposal_type):
+        seed_query = """
+            SELECT MAX(client_sequence)
+              FROM bd_proposal
+             WHERE partner_id = %s AND proposal_type = %s
+        """
+        return self.env["qlk.code.counter"]._reserve(
+            PROPOSAL_SEQUENCE_COUNTER,
+            f"{partner_id}/{proposal_type}",
+            seed=(seed_query, [partner_id, proposal_type]),
+        )
 
     def _build_document_number(self, client_code, proposal_type, seq_number):
         seq_text = f"{seq_number:03d}"
@@ -1323,15 +1317,19 @@ class BDProposal(models.Model):
                 raise UserError(_("Only Assistant Managers can approve or reject this document."))
 
     @api.model
+    @instrument()
     def cron_check_retainer_usage(self):
-        proposals = self.search(
+        self.env["qlk.cron.cursor"]._run_batched(
+            "bd.proposal.retainer_usage",
+            self,
             [
                 ("billing_type", "!=", "free"),
                 ("retainer_period", "=", "retainer"),
                 ("state", "not in", ("rejected", "cancelled")),
-            ]
+            ],
+            lambda proposals: proposals._process_retainer_notifications(),
+            cron_xmlid="qlk_management.ir_cron_bd_proposal_retainer_usage",
         )
-        proposals._process_retainer_notifications()
 
 
 class BDProposalLegalFee(models.Model):
@@ -1425,8 +1423,29 @@ class BDProposalLegalFee(models.Model):
     def _get_current_lawyer_cost(self, employee):
         if not employee:
             return 0.0
-        if employee.lawyer_hour_cost:
-            return employee.lawyer_hour_cost
+        return self._get_lawyer_costs(employee, self.proposal_id[:1])[employee.id]
+
+    def _get_lawyer_costs(self, employees, proposal):
+        """Return ``{employee_id: hour cost}`` at the date of ``proposal``.
+
+        All ``employees`` are priced with one rate card lookup; those without
+        a rate fall back on their own hour cost, then on the legacy cost
+        records.
+        """
+        rates = self.env["qlk.lawyer.rate"].sudo()._rates_for(
+            employees.ids, date=proposal.date, company=proposal.company_id
+        )
+        costs = {}
+        for employee in employees:
+            if employee.id in rates:
+                costs[employee.id] = rates[employee.id]
+            elif employee.lawyer_hour_cost:
+                costs[employee.id] = employee.lawyer_hour_cost
+            else:
+                costs[employee.id] = self._get_legacy_lawyer_cost(employee)
+        return costs
+
+    def _get_legacy_lawyer_cost(self, employee):
         partner = employee.user_id.partner_id
         if not partner and "work_contact_id" in employee._fields:
             partner = employee.work_contact_id
@@ -1440,14 +1459,24 @@ class BDProposalLegalFee(models.Model):
         )
         return cost_record.cost_per_hour if cost_record else 0.0
 
+    def _fill_lawyer_costs(self, vals_list):
+        """Set the missing ``lawyer_cost`` of ``vals_list``, one rate lookup per proposal."""
+        pending = {}
+        for vals in vals_list:
+            if vals.get("assigned_lawyer_id") and "lawyer_cost" not in vals:
+                pending.setdefault(vals.get("proposal_id") or self.proposal_id[:1].id, []).append(vals)
+        for proposal_id, proposal_vals_list in pending.items():
+            employee_ids = {vals["assigned_lawyer_id"] for vals in proposal_vals_list}
+            employees = self.env["hr.employee"].browse(list(employee_ids))
+            costs = self._get_lawyer_costs(employees, self.env["bd.proposal"].browse(proposal_id))
+            for vals in proposal_vals_list:
+                vals["lawyer_cost"] = costs[vals["assigned_lawyer_id"]]
+
     def _normalize_line_vals(self, vals):
         if vals.get("service_name") and not vals.get("description"):
             vals["description"] = vals["service_name"]
         elif vals.get("description") and not vals.get("service_name"):
             vals["service_name"] = vals["description"]
-        if vals.get("assigned_lawyer_id") and "lawyer_cost" not in vals:
-            employee = self.env["hr.employee"].browse(vals["assigned_lawyer_id"])
-            vals["lawyer_cost"] = self._get_current_lawyer_cost(employee)
         pricing_keys = {"quantity", "unit_price", "discount", "discount_type"}
         if pricing_keys.intersection(vals):
             vals["amount"] = self._get_line_subtotal_from_vals(vals)
@@ -1455,9 +1484,11 @@ class BDProposalLegalFee(models.Model):
 
     @api.onchange("assigned_lawyer_id")
     def _onchange_assigned_lawyer_id(self):
-        for line in self:
-            if line.assigned_lawyer_id and not line.lawyer_cost:
-                line.lawyer_cost = line._get_current_lawyer_cost(line.assigned_lawyer_id)
+        lines = self.filtered(lambda line: line.assigned_lawyer_id and not line.lawyer_cost)
+        for proposal, proposal_lines in lines.grouped("proposal_id").items():
+            costs = self._get_lawyer_costs(proposal_lines.assigned_lawyer_id, proposal)
+            for line in proposal_lines:
+                line.lawyer_cost = costs[line.assigned_lawyer_id.id]
 
     @api.onchange("service_name", "quantity", "unit_price", "discount", "discount_type")
     def _onchange_pricing_fields(self):
@@ -1468,10 +1499,21 @@ class BDProposalLegalFee(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        vals_list = [self._normalize_line_vals(dict(vals)) for vals in vals_list]
+        vals_list = [dict(vals) for vals in vals_list]
+        self._fill_lawyer_costs(vals_list)
+        vals_list = [self._normalize_line_vals(vals) for vals in vals_list]
         return super().create(vals_list)
 
     def write(self, vals):
+        if "assigned_lawyer_id" in vals and "lawyer_cost" not in vals:
+            if vals["assigned_lawyer_id"] and len(self.proposal_id) > 1:
+                # Each proposal prices the lawyer at its own date.
+                result = True
+                for lines in self.grouped("proposal_id").values():
+                    result = lines.write(vals) and result
+                return result
+            employee = self.env["hr.employee"].browse(vals["assigned_lawyer_id"])
+            vals = dict(vals, lawyer_cost=self._get_current_lawyer_cost(employee))
         pricing_keys = {"quantity", "unit_price", "discount", "discount_type"}
         if len(self) > 1 and pricing_keys.intersection(vals):
             result = True
@@ -1481,10 +1523,4 @@ class BDProposalLegalFee(models.Model):
                 ) and result
             return result
         vals = self._normalize_line_vals(dict(vals))
-        if "assigned_lawyer_id" in vals and "lawyer_cost" not in vals:
-            if vals.get("assigned_lawyer_id"):
-                employee = self.env["hr.employee"].browse(vals["assigned_lawyer_id"])
-                vals["lawyer_cost"] = self._get_current_lawyer_cost(employee)
-            else:
-                vals["lawyer_cost"] = 0.0
         return super().write(vals)
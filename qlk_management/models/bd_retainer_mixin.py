@@ -7,6 +7,7 @@
 import calendar
 
 from odoo import _, fields, models
+from .perf_sample import instrument
 
 
 class BDRetainerMixin(models.AbstractModel):
@@ -77,6 +78,7 @@ class BDRetainerMixin(models.AbstractModel):
             ).get(standard_project.id, 0.0)
         return 0.0
 
+    @instrument()
     def _compute_retainer_used_hours(self):
         standard_records = self.filtered(
             lambda rec: rec._is_retainer_billing()
@@ -101,6 +103,7 @@ class BDRetainerMixin(models.AbstractModel):
                 continue
             record.remaining_hours = max((record.allocated_hours or 0.0) - (record.used_hours or 0.0), 0.0)
 
+    @instrument()
     def _compute_retainer_monthly_used_hours(self):
         month_start, month_end = self._get_retainer_month_range()
         standard_records = self.filtered(
@@ -7,6 +7,7 @@ from datetime import datetime
 import requests
 
 from odoo import _, api, fields, models
+from .perf_sample import instrument
 
 _logger = logging.getLogger(__name__)
 
@@ -14,6 +15,7 @@ _logger = logging.getLogger(__name__)
 class QlkBiometricDevice(models.Model):
     _name = "qlk.biometric.device"
     _description = "Biometric Attendance Device"
+    _QUERY_BUDGETS = {"cron_sync_biometric_attendance": 40}
 
     # هذا الحقل لاسم جهاز البصمة المستخدم في شاشة الإعدادات.
     name = fields.Char(required=True)
@@ -151,27 +153,10 @@ class QlkBiometricDevice(models.Model):
     # ------------------------------------------------------------------------------
     def _resolve_employee(self, device_user_code):
         self.ensure_one()
-        mapping = self.env["qlk.biometric.user.map"].search(
-            [
-                ("device_id", "=", self.id),
-                ("device_user_code", "=", device_user_code),
-                ("active", "=", True),
-            ],
-            limit=1,
-        )
-        if mapping.employee_id:
-            return mapping.employee_id
-
-        employee_model = self.env["hr.employee"].sudo()
-        if "barcode" in employee_model._fields:
-            employee = employee_model.search([("barcode", "=", device_user_code)], limit=1)
-            if employee:
-                return employee
-        if "employee_code" in employee_model._fields:
-            employee = employee_model.search([("employee_code", "=", device_user_code)], limit=1)
-            if employee:
-                return employee
-        return self.env["hr.employee"]
+        employee_id = self.env["qlk.identity.resolver"].employee_for_device_codes(
+            [device_user_code], device_id=self.id
+        ).get(device_user_code)
+        return self.env["hr.employee"].sudo().browse(employee_id or [])
 
     # ------------------------------------------------------------------------------
     # هذه الدالة تطبق حدث البصمة (دخول/خروج) على hr.attendance بشكل آمن.
@@ -300,10 +285,21 @@ class QlkBiometricDevice(models.Model):
     # هذا الكرون لمزامنة كل أجهزة البصمة النشطة بشكل دوري.
     # ------------------------------------------------------------------------------
     @api.model
+    @instrument()
     def cron_sync_biometric_attendance(self):
-        devices = self.search([("active", "=", True)])
-        for device in devices:
-            device._sync_device_events()
+        def sync(devices):
+            for device in devices:
+                device._sync_device_events()
+
+        # Each device is a remote call: commit every few devices.
+        self.env["qlk.cron.cursor"]._run_batched(
+            "qlk.biometric.device.sync",
+            self,
+            [("active", "=", True)],
+            sync,
+            cron_xmlid="qlk_management.ir_cron_qlk_biometric_sync",
+            batch_size=10,
+        )
         return True
 
 
@@ -374,3 +370,28 @@ class QlkBiometricLog(models.Model):
             "This biometric event has already been synchronized.",
         )
     ]
+
+    # ------------------------------------------------------------------------------
+    # سياسة الاحتفاظ: حذف الـ payload الخام بعد تطبيق الحدث على الحضور.
+    # ------------------------------------------------------------------------------
+    @api.model
+    def _qlk_retention_strip_payload(self, policy, cutoff, limit):
+        self.env.cr.execute(
+            """
+            UPDATE qlk_biometric_log
+               SET raw_payload = NULL
+             WHERE id IN (
+                    SELECT id FROM qlk_biometric_log
+                     WHERE raw_payload IS NOT NULL
+                       AND status IN ('processed', 'duplicate')
+                       AND event_time < %s
+                  ORDER BY id
+                     LIMIT %s
+             )
+            """,
+            [cutoff, limit],
+        )
+        count = self.env.cr.rowcount
+        if count:
+            self.invalidate_model(["raw_payload"])
+        return count
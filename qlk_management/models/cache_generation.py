@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Generation numbers for ormcaches invalidated by business writes.
+
+``registry.clear_cache()`` drops every ormcache entry in every worker. The
+QLK caches that go stale on ordinary writes (employee edits, biometric
+mapping imports, rate changes) put a generation number in their cache key
+instead. Invalidating bumps that number once per transaction, just before
+commit; other workers read the new number on their next request and stop
+using the old entries, which age out of the LRU, while the rest of the
+ormcache stays warm. Until the commit, the transaction that changed the
+data reads around the cache.
+"""
+
+from odoo import api, models
+
+# One PostgreSQL sequence per generation, named qlk_cache_generation_<name>.
+CACHE_GENERATIONS = ("user_access_context", "identity_resolver", "lawyer_rate_card")
+
+MEMO_KEY = "qlk_cache_generation"
+DIRTY_KEY = "qlk_cache_generation.dirty"
+
+
+def _sequence(name):
+    if name not in CACHE_GENERATIONS:
+        raise ValueError("Unknown cache generation %r" % name)
+    return "qlk_cache_generation_%s" % name
+
+
+class QlkCacheGeneration(models.AbstractModel):
+    _name = "qlk.cache.generation"
+    _description = "Cache Generation"
+
+    def init(self):
+        for name in CACHE_GENERATIONS:
+            self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % _sequence(name))
+
+    @api.model
+    def _get(self, name):
+        """Return the generation of ``name`` to put in a cache key.
+
+        Returns None when the current transaction invalidated ``name``: the
+        caller must compute without the cache.
+        """
+        if name in self.env.cr.precommit.data.get(DIRTY_KEY, ()):
+            return None
+        memo = self.env.cr.cache.setdefault(MEMO_KEY, {})
+        if name not in memo:
+            self.env.cr.execute("SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM %s" % _sequence(name))
+            memo[name] = self.env.cr.fetchone()[0]
+        return memo[name]
+
+    @api.model
+    def _bump(self, name):
+        """Invalidate the ``name`` cache when the transaction commits."""
+        _sequence(name)
+        transaction_data = self.env.cr.precommit.data
+        if DIRTY_KEY not in transaction_data:
+            # Bump once per transaction, after the last write.
+            self.env.cr.precommit.add(self._bump_dirty)
+        transaction_data.setdefault(DIRTY_KEY, set()).add(name)
+
+    @api.model
+    def _bump_dirty(self):
+        for name in sorted(self.env.cr.precommit.data.pop(DIRTY_KEY, ())):
+            self.env.cr.execute("SELECT nextval(%s)", [_sequence(name)])
+        self.env.cr.cache.pop(MEMO_KEY, None)
@@ -2,7 +2,9 @@
 from odoo import _, api, fields, models
 from odoo.exceptions import ValidationError
 from odoo.osv import expression
+from .legal_numbering import LEGAL_RECORD_CODE_COLUMNS
 from .litigation_level import LITIGATION_STAGE_CODE_SELECTION
+from .schema_state import add_columns, run_init_step
 
 COMPLETION_SECTIONS = {
     "completion_identification": [
@@ -60,6 +62,39 @@ LAWYER_EMPLOYEE_DOMAIN = [
 ]
 
 
+def _init_case_columns(env):
+    cr = env.cr
+    add_columns(cr, "qlk_case", [("service_code", "varchar")] + LEGAL_RECORD_CODE_COLUMNS)
+    rows = 0
+    cr.execute("SELECT to_regclass(%s)", ["qlk_project"])
+    if cr.fetchone()[0]:
+        cr.execute(
+            """
+            UPDATE qlk_case c
+               SET employee_id = p.lawyer_id
+              FROM qlk_project p
+             WHERE c.project_id = p.id
+               AND c.employee_id IS NULL
+               AND p.lawyer_id IS NOT NULL
+            """
+        )
+        rows += cr.rowcount
+    cr.execute("SELECT to_regclass(%s)", ["bd_engagement_letter"])
+    if cr.fetchone()[0]:
+        cr.execute(
+            """
+            UPDATE qlk_case c
+               SET employee_id = e.lawyer_employee_id
+              FROM bd_engagement_letter e
+             WHERE c.engagement_id = e.id
+               AND c.employee_id IS NULL
+               AND e.lawyer_employee_id IS NOT NULL
+            """
+        )
+        rows += cr.rowcount
+    return rows
+
+
 class QlkCase(models.Model):
     _inherit = "qlk.case"
     _rec_name = "service_code"
@@ -211,37 +246,15 @@ class QlkCase(models.Model):
 
     def init(self):
         super().init()
-        cr = self.env.cr
-        cr.execute("ALTER TABLE qlk_case ADD COLUMN IF NOT EXISTS service_code varchar")
-        cr.execute("ALTER TABLE qlk_case ADD COLUMN IF NOT EXISTS service_category varchar")
-        cr.execute("ALTER TABLE qlk_case ADD COLUMN IF NOT EXISTS client_legal_code varchar")
-        cr.execute("ALTER TABLE qlk_case ADD COLUMN IF NOT EXISTS project_legal_code varchar")
-        cr.execute("ALTER TABLE qlk_case ADD COLUMN IF NOT EXISTS record_sequence integer DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_case ADD COLUMN IF NOT EXISTS record_code varchar")
-        cr.execute("SELECT to_regclass(%s)", ["qlk_project"])
-        if cr.fetchone()[0]:
-            cr.execute(
-                """
-                UPDATE qlk_case c
-                   SET employee_id = p.lawyer_id
-                  FROM qlk_project p
-                 WHERE c.project_id = p.id
-                   AND c.employee_id IS NULL
-                   AND p.lawyer_id IS NOT NULL
-                """
-            )
-        cr.execute("SELECT to_regclass(%s)", ["bd_engagement_letter"])
-        if cr.fetchone()[0]:
-            cr.execute(
-                """
-                UPDATE qlk_case c
-                   SET employee_id = e.lawyer_employee_id
-                  FROM bd_engagement_letter e
-                 WHERE c.engagement_id = e.id
-                   AND c.employee_id IS NULL
-                   AND e.lawyer_employee_id IS NOT NULL
-                """
-            )
+        run_init_step(
+            self.env,
+            "qlk_case.legal_codes_and_lawyers",
+            "1",
+            _init_case_columns,
+            tables=["qlk_case", "qlk_project", "bd_engagement_letter"],
+            data=LEGAL_RECORD_CODE_COLUMNS,
+        )
+
     @api.depends("task_ids.effective_hours", "task_ids.timesheet_ids.unit_amount")
     def _compute_case_hours(self):
         cases = self.filtered("id")
@@ -461,28 +474,11 @@ class QlkCase(models.Model):
 
     @api.model
     def _lawyer_employee_from_partner(self, partner):
-        if not partner:
-            return self.env["hr.employee"]
-        employee_model = self.env["hr.employee"].sudo()
-        parts = []
-        if "work_contact_id" in employee_model._fields:
-            parts.append(("work_contact_id", "=", partner.id))
-        if "address_home_id" in employee_model._fields:
-            parts.append(("address_home_id", "=", partner.id))
-        if "user_id" in employee_model._fields:
-            parts.append(("user_id.partner_id", "=", partner.id))
-        domain = self._or_domain(parts)
-        if not domain:
-            return employee_model.browse()
-        return employee_model.search(expression.AND([[("active", "=", True)], domain]), limit=1)
+        return self.env["qlk.identity.resolver"].sudo().employee_for_partner(partner)
 
     @api.model
     def _lawyer_employee_from_user(self, user):
-        if not user:
-            return self.env["hr.employee"]
-        employee_model = self.env["hr.employee"].sudo()
-        employee = employee_model.search([("user_id", "=", user.id), ("active", "=", True)], limit=1)
-        return employee or self._lawyer_employee_from_partner(user.partner_id)
+        return self.env["qlk.identity.resolver"].sudo().employee_for_user(user)
 
     @api.model
     def _first_employee_from_m2m_commands(self, commands, existing=None):
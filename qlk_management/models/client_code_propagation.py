@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""Set-based propagation of a client code to the client's documents.
+
+Re-coding a client used to rewrite every proposal, engagement letter and
+project through the ORM, one record at a time. The document numbers are now
+rewritten with one ``UPDATE`` per document type; only documents whose number
+has no recognisable client part (they need a fresh sequence) still go
+through the per-record code. Each document type that changed gets one note
+on the client's chatter. Clients with many documents are queued and handled
+by a cron so the write on the partner stays short.
+"""
+
+import logging
+
+from odoo import _, api, models
+
+_logger = logging.getLogger(__name__)
+
+# Above this many documents the propagation runs in the background.
+BACKGROUND_THRESHOLD = 200
+# Queued clients that failed this many times are left for an administrator.
+MAX_SYNC_ATTEMPTS = 3
+
+PROPOSAL_NUMBER_SQL = """
+    %(client_code)s
+    || CASE WHEN proposal_type = 'proposal' THEN '/PROP' ELSE '/EL' END
+    || LPAD(client_sequence::text, GREATEST(3, length(client_sequence::text)), '0')
+"""
+
+
+def _suffix_sql(marker):
+    return "substr(code, strpos(code, '%s') + %d)" % (marker, len(marker))
+
+
+def _renumber_sql(marker):
+    """Keep the part after ``marker`` and put the new client code before it."""
+    suffix = _suffix_sql(marker)
+    return """
+        CASE WHEN strpos(code, '%(marker)s') > 0 AND %(suffix)s != ''
+             THEN %%(client_code)s || '%(marker)s' || %(suffix)s
+             ELSE code
+        END
+    """ % {"marker": marker, "suffix": suffix}
+
+
+class ClientCodeDocumentMixin(models.AbstractModel):
+    _name = "qlk.client.code.document.mixin"
+    _description = "Client Code Propagation"
+
+    def _bulk_update_client_code(self, client_code, assignments, where, fnames):
+        """Apply ``assignments`` to the records matching ``where``, return them.
+
+        ``assignments`` and ``where`` may use ``%(client_code)s``; ``fnames``
+        are the fields they rewrite besides ``client_code``.
+        """
+        if not self:
+            return self.browse()
+        self.flush_recordset()
+        self.env.cr.execute(
+            """
+            UPDATE %(table)s
+               SET client_code = %%(client_code)s,
+                   %(assignments)s,
+                   write_uid = %%(uid)s,
+                   write_date = now() AT TIME ZONE 'UTC'
+             WHERE id IN %%(ids)s
+               AND %(where)s
+         RETURNING id
+            """
+            % {"table": self._table, "assignments": assignments, "where": where},
+            {"client_code": client_code, "uid": self.env.uid, "ids": tuple(self.ids)},
+        )
+        updated = self.browse([row[0] for row in self.env.cr.fetchall()])
+        fnames = ["client_code"] + fnames
+        updated.invalidate_recordset(fnames)
+        updated.modified(fnames)
+        return updated
+
+
+class BDProposalClientCode(models.Model):
+    _name = "bd.proposal"
+    _inherit = ["bd.proposal", "qlk.client.code.document.mixin"]
+
+    def _sync_client_code_from_partner(self):
+        updated = self.browse()
+        for partner in self.partner_id:
+            client_code = partner._get_client_code()
+            number = PROPOSAL_NUMBER_SQL
+            updated |= self.filtered(lambda proposal: proposal.partner_id == partner)._bulk_update_client_code(
+                client_code,
+                "name = %s, code = %s" % (number, number),
+                "client_sequence IS NOT NULL AND client_sequence != 0"
+                " AND (client_code IS DISTINCT FROM %%(client_code)s OR code IS DISTINCT FROM %s)" % number,
+                ["name", "code"],
+            )
+        return updated
+
+
+class BDEngagementLetterClientCode(models.Model):
+    _name = "bd.engagement.letter"
+    _inherit = ["bd.engagement.letter", "qlk.client.code.document.mixin"]
+
+    def _sync_client_code_from_partner(self):
+        updated = self.browse()
+        for partner in self.partner_id:
+            letters = self.filtered(lambda letter: letter.partner_id == partner)
+            client_code = partner.code or partner.ref or ""
+            # Letters without an "/EL" number need a fresh code.
+            to_generate = letters.filtered(lambda letter: client_code and "/EL" not in (letter.code or ""))
+            if to_generate:
+                super(BDEngagementLetterClientCode, to_generate)._sync_client_code_from_partner()
+                updated |= to_generate
+            updated |= (letters - to_generate)._bulk_update_client_code(
+                client_code,
+                "code = %s" % _renumber_sql("/EL"),
+                "(client_code IS DISTINCT FROM %%(client_code)s OR code IS DISTINCT FROM %s)" % _renumber_sql("/EL"),
+                ["code"],
+            )
+        return updated
+
+
+class ProjectProjectClientCode(models.Model):
+    _name = "project.project"
+    _inherit = ["project.project", "qlk.client.code.document.mixin"]
+
+    def _sync_client_code_from_partner(self):
+        updated = self.browse()
+        for client in self.client_id:
+            projects = self.filtered(lambda project: project.client_id == client)
+            client_code = client._get_client_code()
+            to_generate = projects.filtered(lambda project: "/PRJ" not in (project.code or ""))
+            if to_generate:
+                super(ProjectProjectClientCode, to_generate)._sync_client_code_from_partner()
+                updated |= to_generate
+            updated |= (projects - to_generate)._bulk_update_client_code(
+                client_code,
+                "code = %s" % _renumber_sql("/PRJ"),
+                "(client_code IS DISTINCT FROM %%(client_code)s OR code IS DISTINCT FROM %s)" % _renumber_sql("/PRJ"),
+                ["code"],
+            )
+        return updated
+
+
+class ResPartnerClientCodePropagation(models.Model):
+    _inherit = "res.partner"
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(
+            "CREATE TABLE IF NOT EXISTS qlk_client_code_sync_pending (partner_id INTEGER PRIMARY KEY)"
+        )
+        self.env.cr.execute(
+            """
+            ALTER TABLE qlk_client_code_sync_pending
+                ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS last_error TEXT
+            """
+        )
+
+    def _client_code_document_count(self):
+        self.ensure_one()
+        self.env.cr.execute(
+            """
+            SELECT (SELECT COUNT(*) FROM bd_proposal WHERE partner_id = %(partner)s)
+                 + (SELECT COUNT(*) FROM bd_engagement_letter WHERE partner_id = %(partner)s)
+                 + (SELECT COUNT(*) FROM project_project WHERE client_id = %(partner)s)
+            """,
+            {"partner": self.id},
+        )
+        return self.env.cr.fetchone()[0]
+
+    def _sync_related_client_codes(self):
+        for partner in self:
+            if partner._client_code_document_count() > BACKGROUND_THRESHOLD:
+                partner._queue_client_code_sync()
+            else:
+                partner._propagate_client_codes()
+
+    def _queue_client_code_sync(self):
+        self.env.cr.execute(
+            """
+            INSERT INTO qlk_client_code_sync_pending (partner_id) VALUES %s
+            ON CONFLICT (partner_id) DO UPDATE SET attempts = 0, last_error = NULL
+            """
+            % ", ".join(["(%s)"] * len(self)),
+            self.ids,
+        )
+        cron = self.env.ref("qlk_management.ir_cron_qlk_client_code_sync", raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    def _propagate_client_codes(self):
+        """Rewrite the client part of the documents' numbers, return the counts."""
+        self.ensure_one()
+        documents = (
+            ("bd.proposal", "partner_id", _("proposals")),
+            ("bd.engagement.letter", "partner_id", _("engagement letters")),
+            ("project.project", "client_id", _("projects")),
+        )
+        counts = {}
+        for model_name, partner_field, label in documents:
+            records = self.env[model_name].sudo().search([(partner_field, "=", self.id)])
+            updated = records._sync_client_code_from_partner() if records else records
+            counts[model_name] = len(updated)
+            if updated:
+                self.sudo().message_post(
+                    body=_(
+                        "%(count)s %(documents)s renumbered with client code %(code)s.",
+                        count=len(updated),
+                        documents=label,
+                        code=self.code or self.ref or "",
+                    ),
+                    subtype_xmlid="mail.mt_note",
+                )
+        return counts
+
+    @api.model
+    def _cron_propagate_client_codes(self):
+        """Propagate the queued clients, one transaction each.
+
+        A client that fails is rolled back on its own, counted and retried by
+        the next runs; after ``MAX_SYNC_ATTEMPTS`` failures it stays queued
+        with its last error and is skipped until it is queued again.
+        """
+        cr = self.env.cr
+        cr.execute(
+            """
+            SELECT partner_id FROM qlk_client_code_sync_pending
+             WHERE attempts < %s
+          ORDER BY attempts, partner_id
+            """,
+            [MAX_SYNC_ATTEMPTS],
+        )
+        for (partner_id,) in cr.fetchall():
+            try:
+                with cr.savepoint():
+                    partner = self.browse(partner_id).exists()
+                    if partner:
+                        counts = partner._propagate_client_codes()
+                        _logger.info("Client code of partner %s propagated: %s", partner_id, counts)
+                    cr.execute("DELETE FROM qlk_client_code_sync_pending WHERE partner_id = %s", [partner_id])
+            except Exception as error:
+                _logger.exception("Client code propagation failed for partner %s", partner_id)
+                cr.execute(
+                    """
+                    UPDATE qlk_client_code_sync_pending
+                       SET attempts = attempts + 1, last_error = %s
+                     WHERE partner_id = %s
+                    """,
+                    [str(error), partner_id],
+                )
+            # One client per transaction.
+            self.env["qlk.cron.cursor"]._commit_chunk()
+        return True
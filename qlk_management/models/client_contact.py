@@ -9,6 +9,61 @@ import re
 from odoo import api, fields, models, _, tools
 from odoo.exceptions import ValidationError
 
+from .schema_state import run_init_step
+
+
+def _init_hide_employee_classification(env):
+    classifications = env["qlk.contact.classification"].with_context(active_test=False).sudo().search([])
+    employee_records = classifications.filtered(
+        lambda record: (record.name or "").strip().casefold() == "employee"
+    )
+    if employee_records:
+        employee_records.write({"active": False})
+    return len(employee_records)
+
+
+def _init_migrate_contact_channels(env):
+    env.cr.execute(
+        """
+        INSERT INTO res_partner_contact_info (
+            partner_id, contact_type, value, is_primary, sequence, active,
+            create_uid, create_date, write_uid, write_date
+        )
+        SELECT
+            old.partner_id,
+            CASE old.channel_type
+                WHEN 'phone' THEN 'mobile'
+                ELSE 'email'
+            END,
+            old.value,
+            CASE
+                WHEN old.channel_type = 'email' AND old.value = partner.email THEN TRUE
+                WHEN old.channel_type = 'phone' AND old.value = partner.mobile THEN TRUE
+                ELSE FALSE
+            END,
+            COALESCE(old.sequence, 10),
+            TRUE,
+            old.create_uid,
+            old.create_date,
+            old.write_uid,
+            old.write_date
+        FROM qlk_company_contact_channel old
+        JOIN res_partner partner
+          ON partner.id = old.partner_id
+        WHERE NOT EXISTS (
+            SELECT 1
+              FROM res_partner_contact_info new_info
+             WHERE new_info.partner_id = old.partner_id
+               AND new_info.contact_type = CASE
+                    WHEN old.channel_type = 'phone' THEN 'mobile'
+                    ELSE 'email'
+               END
+               AND new_info.value = old.value
+        )
+        """
+    )
+    return env.cr.rowcount
+
 
 class QlkContactClassification(models.Model):
     _name = "qlk.contact.classification"
@@ -25,12 +80,13 @@ class QlkContactClassification(models.Model):
     def init(self):
         super().init()
         # نخفي تصنيف Employee بدون حذف السجلات القديمة حتى تبقى العلاقات محفوظة.
-        classifications = self.with_context(active_test=False).sudo().search([])
-        employee_records = classifications.filtered(
-            lambda record: (record.name or "").strip().casefold() == "employee"
+        run_init_step(
+            self.env,
+            "qlk_contact_classification.hide_employee",
+            "1",
+            _init_hide_employee_classification,
+            tables=["qlk_contact_classification"],
         )
-        if employee_records:
-            employee_records.write({"active": False})
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -174,44 +230,12 @@ class ResPartnerContactInfo(models.Model):
             return
         if not self._table_exists("res_partner"):
             return
-        self.env.cr.execute(
-            """
-            INSERT INTO res_partner_contact_info (
-                partner_id, contact_type, value, is_primary, sequence, active,
-                create_uid, create_date, write_uid, write_date
-            )
-            SELECT
-                old.partner_id,
-                CASE old.channel_type
-                    WHEN 'phone' THEN 'mobile'
-                    ELSE 'email'
-                END,
-                old.value,
-                CASE
-                    WHEN old.channel_type = 'email' AND old.value = partner.email THEN TRUE
-                    WHEN old.channel_type = 'phone' AND old.value = partner.mobile THEN TRUE
-                    ELSE FALSE
-                END,
-                COALESCE(old.sequence, 10),
-                TRUE,
-                old.create_uid,
-                old.create_date,
-                old.write_uid,
-                old.write_date
-            FROM qlk_company_contact_channel old
-            JOIN res_partner partner
-              ON partner.id = old.partner_id
-            WHERE NOT EXISTS (
-                SELECT 1
-                  FROM res_partner_contact_info new_info
-                 WHERE new_info.partner_id = old.partner_id
-                   AND new_info.contact_type = CASE
-                        WHEN old.channel_type = 'phone' THEN 'mobile'
-                        ELSE 'email'
-                   END
-                   AND new_info.value = old.value
-            )
-            """
+        run_init_step(
+            self.env,
+            "res_partner_contact_info.legacy_channels",
+            "1",
+            _init_migrate_contact_channels,
+            tables=["res_partner_contact_info", "qlk_company_contact_channel"],
         )
 
     @api.model_create_multi
@@ -4,6 +4,8 @@ import base64
 
 from odoo import _, api, fields, models
 from odoo.exceptions import AccessError, UserError, ValidationError
+from .perf_sample import instrument
+from .schema_state import add_columns, run_init_step
 
 
 SERVICE_SEQUENCE_CODES = {
@@ -117,11 +119,134 @@ def _ensure_workflow_notification_columns(cr):
     cr.execute("SELECT to_regclass(%s)", ["qlk_client_file"])
     if not cr.fetchone()[0]:
         return
+    add_columns(cr, "qlk_client_file", [("workflow_notification_keys", "text")])
+
+
+def _init_drop_client_file_constraints(env):
+    env.cr.execute(
+        """
+        ALTER TABLE qlk_client_file
+            DROP CONSTRAINT IF EXISTS qlk_client_file_partner_company_unique,
+            DROP CONSTRAINT IF EXISTS qlk_client_file_litigation_client_code_company_unique,
+            DROP CONSTRAINT IF EXISTS qlk_client_file_corporate_client_code_company_unique,
+            DROP CONSTRAINT IF EXISTS qlk_client_file_arbitration_client_code_company_unique,
+            DROP CONSTRAINT IF EXISTS litigation_client_code_company_unique,
+            DROP CONSTRAINT IF EXISTS corporate_client_code_company_unique,
+            DROP CONSTRAINT IF EXISTS arbitration_client_code_company_unique
+        """
+    )
+
+
+def _init_client_file_service_profile(env):
+    """Derive POA requirement and profile type from the legal service tags."""
+    cr = env.cr
+    add_columns(
+        cr,
+        "qlk_client_file",
+        [
+            ("service_profile_type", "varchar"),
+            ("poa_required", "boolean DEFAULT true"),
+            ("poa_status", "varchar"),
+        ],
+    )
+    no_litigation_service = """
+        NOT EXISTS (
+            SELECT 1
+              FROM qlk_client_file_service_type_rel rel
+              JOIN qlk_legal_service_type service ON service.id = rel.service_type_id
+             WHERE rel.client_file_id = client.id
+               AND service.code IN ('litigation', 'pre_litigation')
+        )
+    """
+    cr.execute(
+        """
+        UPDATE qlk_client_file client
+           SET poa_required = false,
+               poa_status = COALESCE(poa_status, 'draft')
+         WHERE (client.poa_required IS NOT FALSE OR client.poa_status IS NULL)
+           AND %s
+        """
+        % no_litigation_service
+    )
+    rows = cr.rowcount
+    cr.execute(
+        """
+        UPDATE qlk_client_file client
+           SET service_profile_type = CASE
+               WHEN EXISTS (
+                   SELECT 1
+                     FROM qlk_client_file_service_type_rel rel
+                     JOIN qlk_legal_service_type service ON service.id = rel.service_type_id
+                    WHERE rel.client_file_id = client.id
+                      AND service.code = 'corporate'
+               ) THEN 'corporate'
+               WHEN EXISTS (
+                   SELECT 1
+                     FROM qlk_client_file_service_type_rel rel
+                     JOIN qlk_legal_service_type service ON service.id = rel.service_type_id
+                    WHERE rel.client_file_id = client.id
+                      AND service.code = 'arbitration'
+               ) THEN 'arbitration'
+               ELSE 'litigation'
+           END
+         WHERE client.service_profile_type IS NULL
+            OR (client.service_profile_type = 'litigation' AND %s)
+        """
+        % no_litigation_service
+    )
+    return rows + cr.rowcount
+
+
+def _init_engagement_client_file_links(env):
+    cr = env.cr
     cr.execute(
-        "ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS workflow_notification_keys text"
+        """
+        CREATE TABLE IF NOT EXISTS bd_engagement_client_file_rel (
+            engagement_id integer NOT NULL,
+            client_file_id integer NOT NULL
+        )
+        """
+    )
+    cr.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS bd_engagement_client_file_rel_uniq
+            ON bd_engagement_client_file_rel (engagement_id, client_file_id)
+        """
+    )
+    cr.execute(
+        """
+        INSERT INTO bd_engagement_client_file_rel (engagement_id, client_file_id)
+        SELECT id, client_file_id
+          FROM bd_engagement_letter
+         WHERE client_file_id IS NOT NULL
+        ON CONFLICT DO NOTHING
+        """
+    )
+    rows = cr.rowcount
+    _migrate_legacy_legal_services(
+        env,
+        "bd_engagement_letter",
+        "bd_engagement_legal_service_type_rel",
+        "engagement_id",
+    )
+    return rows
+
+
+def _init_project_legal_services(env):
+    env.cr.execute("ALTER TABLE qlk_project DROP CONSTRAINT IF EXISTS qlk_project_engagement_letter_unique")
+    _migrate_legacy_legal_services(
+        env,
+        "qlk_project",
+        "qlk_project_legal_service_type_rel",
+        "project_id",
     )
 
 
+def _init_project_legal_codes(env):
+    # Code generation changes need a migration script calling backfill_legal_codes().
+    env["qlk.legal.numbering.engine"].backfill_legal_codes()
+
+
 def _migrate_legacy_legal_services(env, source_table, relation_table, owner_column):
     """Populate new legal-service tags from legacy service fields without dropping data."""
     cr = env.cr
@@ -198,6 +323,7 @@ class QlkClientFile(models.Model):
     _description = "Legal Client File"
     _inherit = ["mail.thread", "mail.activity.mixin", "qlk.workflow.notification.mixin"]
     _order = "write_date desc, id desc"
+    _QUERY_BUDGETS = {"_cron_check_poa_alerts": 40}
 
     name = fields.Char(required=True, tracking=True)
     partner_id = fields.Many2one(
@@ -384,10 +510,12 @@ class QlkClientFile(models.Model):
     pre_litigation_next_number = fields.Integer(default=1, copy=False)
     arbitration_next_number = fields.Integer(default=1, copy=False)
     corporate_next_number = fields.Integer(default=1, copy=False)
+    lawyer_link_ids = fields.One2many("qlk.client.file.lawyer.link", "client_file_id", string="Lawyer Links")
     lawyer_user_ids = fields.Many2many(
         "res.users",
         compute="_compute_lawyer_user_ids",
-        store=True,
+        search="_search_lawyer_user_ids",
+        compute_sudo=True,
         string="Related Lawyers",
     )
     task_count = fields.Integer(string="Tasks", compute="_compute_counts", compute_sudo=True)
@@ -405,119 +533,27 @@ class QlkClientFile(models.Model):
     ]
 
     def init(self):
-        cr = self.env.cr
-        _ensure_workflow_notification_columns(cr)
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS litigation_client_code varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS corporate_client_code varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS arbitration_client_code varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS litigation_code_locked boolean DEFAULT false")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS corporate_code_locked boolean DEFAULT false")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS arbitration_code_locked boolean DEFAULT false")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS service_profile_type varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS client_profile_code varchar")
-        cr.execute("ALTER TABLE qlk_client_file DROP CONSTRAINT IF EXISTS qlk_client_file_partner_company_unique")
-        cr.execute("ALTER TABLE qlk_client_file DROP CONSTRAINT IF EXISTS qlk_client_file_litigation_client_code_company_unique")
-        cr.execute("ALTER TABLE qlk_client_file DROP CONSTRAINT IF EXISTS qlk_client_file_corporate_client_code_company_unique")
-        cr.execute("ALTER TABLE qlk_client_file DROP CONSTRAINT IF EXISTS qlk_client_file_arbitration_client_code_company_unique")
-        cr.execute("ALTER TABLE qlk_client_file DROP CONSTRAINT IF EXISTS litigation_client_code_company_unique")
-        cr.execute("ALTER TABLE qlk_client_file DROP CONSTRAINT IF EXISTS corporate_client_code_company_unique")
-        cr.execute("ALTER TABLE qlk_client_file DROP CONSTRAINT IF EXISTS arbitration_client_code_company_unique")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS litigation_client_sequence integer DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS corporate_client_sequence integer DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS arbitration_client_sequence integer DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS litigation_project_next_number integer DEFAULT 1")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS corporate_project_next_number integer DEFAULT 1")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS arbitration_project_next_number integer DEFAULT 1")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_required boolean DEFAULT true")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_status varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_request_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_received_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_expiry_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_notes text")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_uploaded_by integer")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_verified_by integer")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_last_alert_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS contract_type varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS billing_type varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS start_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS end_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS contact_details text")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS scope_of_work text")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS notes text")
-        cr.execute(
-            """
-            UPDATE qlk_client_file
-               SET litigation_project_next_number = COALESCE(litigation_project_next_number, 1),
-                   corporate_project_next_number = COALESCE(corporate_project_next_number, 1),
-                   arbitration_project_next_number = COALESCE(arbitration_project_next_number, 1),
-                   litigation_client_sequence = COALESCE(litigation_client_sequence, 0),
-                   corporate_client_sequence = COALESCE(corporate_client_sequence, 0),
-                   arbitration_client_sequence = COALESCE(arbitration_client_sequence, 0),
-                   litigation_code_locked = COALESCE(litigation_code_locked, false),
-                   corporate_code_locked = COALESCE(corporate_code_locked, false),
-                   arbitration_code_locked = COALESCE(arbitration_code_locked, false),
-                   poa_required = COALESCE(poa_required, true),
-                   poa_status = COALESCE(poa_status, 'draft')
-            """
+        _ensure_workflow_notification_columns(self.env.cr)
+        run_init_step(
+            self.env,
+            "qlk_client_file.drop_legacy_constraints",
+            "1",
+            _init_drop_client_file_constraints,
+            tables=["qlk_client_file"],
         )
-        cr.execute(
+        self.env.cr.execute(
             "SELECT to_regclass(%s), to_regclass(%s)",
             ["qlk_client_file_service_type_rel", "qlk_legal_service_type"],
         )
-        if all(cr.fetchone() or []):
-            cr.execute(
-                """
-                UPDATE qlk_client_file client
-                   SET poa_required = false,
-                       poa_status = COALESCE(poa_status, 'draft')
-                 WHERE NOT EXISTS (
-                       SELECT 1
-                         FROM qlk_client_file_service_type_rel rel
-                         JOIN qlk_legal_service_type service ON service.id = rel.service_type_id
-                        WHERE rel.client_file_id = client.id
-                          AND service.code IN ('litigation', 'pre_litigation')
-                   )
-                """
-            )
-            cr.execute(
-                """
-                UPDATE qlk_client_file client
-                   SET service_profile_type = CASE
-                       WHEN EXISTS (
-                           SELECT 1
-                             FROM qlk_client_file_service_type_rel rel
-                             JOIN qlk_legal_service_type service ON service.id = rel.service_type_id
-                            WHERE rel.client_file_id = client.id
-                              AND service.code = 'corporate'
-                       ) THEN 'corporate'
-                       WHEN EXISTS (
-                           SELECT 1
-                             FROM qlk_client_file_service_type_rel rel
-                             JOIN qlk_legal_service_type service ON service.id = rel.service_type_id
-                            WHERE rel.client_file_id = client.id
-                              AND service.code = 'arbitration'
-                       ) THEN 'arbitration'
-                       ELSE 'litigation'
-                   END
-                 WHERE client.service_profile_type IS NULL
-                    OR (
-                        client.service_profile_type = 'litigation'
-                        AND NOT EXISTS (
-                            SELECT 1
-                              FROM qlk_client_file_service_type_rel rel
-                              JOIN qlk_legal_service_type service ON service.id = rel.service_type_id
-                             WHERE rel.client_file_id = client.id
-                               AND service.code IN ('litigation', 'pre_litigation')
-                        )
-                    )
-                """
+        if all(self.env.cr.fetchone() or []):
+            run_init_step(
+                self.env,
+                "qlk_client_file.service_profile",
+                "1",
+                _init_client_file_service_profile,
+                tables=["qlk_client_file", "qlk_client_file_service_type_rel", "qlk_legal_service_type"],
             )
-        cr.execute(
-            """
-            UPDATE qlk_client_file
-               SET service_profile_type = COALESCE(service_profile_type, 'litigation')
-            """
-        )
+        self.env["qlk.legal.numbering.engine"]._ensure_client_file_profile_columns()
 
     @api.model
     def _service_category(self, service_code):
@@ -732,26 +768,14 @@ class QlkClientFile(models.Model):
             else:
                 record.hours_state = "normal"
 
-    @api.depends(
-        "engagement_ids.lawyer_user_id",
-        "engagement_ids.lawyer_ids.user_id",
-        "lawyer_ids.user_id",
-        "litigation_case_ids.lawyer_id",
-        "pre_litigation_ids.lawyer_user_id",
-        "arbitration_case_ids.responsible_user_id",
-        "corporate_case_ids.responsible_user_id",
-    )
+    @api.depends("lawyer_link_ids.user_id")
     def _compute_lawyer_user_ids(self):
+        # The links are maintained by their source records (client_file_lawyer_link.py).
         for record in self:
-            users = self.env["res.users"]
-            users |= record.engagement_ids.mapped("lawyer_user_id")
-            users |= record.engagement_ids.mapped("lawyer_ids.user_id")
-            users |= record.lawyer_ids.mapped("user_id")
-            users |= record.litigation_case_ids.mapped("lawyer_id")
-            users |= record.pre_litigation_ids.mapped("lawyer_user_id")
-            users |= record.arbitration_case_ids.mapped("responsible_user_id")
-            users |= record.corporate_case_ids.mapped("responsible_user_id")
-            record.lawyer_user_ids = users
+            record.lawyer_user_ids = record.lawyer_link_ids.user_id
+
+    def _search_lawyer_user_ids(self, operator, value):
+        return [("lawyer_link_ids.user_id", operator, value)]
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -1111,25 +1135,46 @@ class QlkClientFile(models.Model):
         return True
 
     @api.model
+    @instrument()
     def _cron_check_poa_alerts(self):
         today = fields.Date.context_today(self)
-        expired = self.search(
+        cursor = self.env["qlk.cron.cursor"]
+
+        def expire(records):
+            records.write({"poa_status": "expired", "poa_last_alert_date": today})
+            records._send_poa_alert_email(
+                _("POA expired"),
+                _("A Power of Attorney has expired. Please renew it before proceeding with legal work."),
+            )
+
+        def remind(records):
+            records.write({"poa_last_alert_date": today})
+            records._send_poa_alert_email(
+                _("POA pending signature"),
+                _("The POA is still missing after the allowed follow-up period."),
+            )
+
+        expired_done = cursor._run_batched(
+            "qlk.client.file.poa_expired",
+            self,
             [
                 ("poa_required", "=", True),
                 ("poa_expiry_date", "!=", False),
                 ("poa_expiry_date", "<", today),
                 ("poa_status", "!=", "expired"),
-            ]
+            ],
+            expire,
+            cron_xmlid="qlk_management.ir_cron_qlk_poa_alerts",
+            pass_key=str(today),
         )
-        if expired:
-            expired.write({"poa_status": "expired", "poa_last_alert_date": today})
-            expired._send_poa_alert_email(
-                _("POA expired"),
-                _("A Power of Attorney has expired. Please renew it before proceeding with legal work."),
-            )
+        if not expired_done:
+            # The re-triggered run sends the follow-ups.
+            return True
 
         threshold = fields.Date.subtract(today, days=3)
-        missing = self.search(
+        cursor._run_batched(
+            "qlk.client.file.poa_pending",
+            self,
             [
                 ("poa_required", "=", True),
                 ("poa_status", "in", ["requested", "waiting_signature"]),
@@ -1138,14 +1183,11 @@ class QlkClientFile(models.Model):
                 "|",
                 ("poa_last_alert_date", "=", False),
                 ("poa_last_alert_date", "<", today),
-            ]
+            ],
+            remind,
+            cron_xmlid="qlk_management.ir_cron_qlk_poa_alerts",
+            pass_key=str(today),
         )
-        if missing:
-            missing.write({"poa_last_alert_date": today})
-            missing._send_poa_alert_email(
-                _("POA pending signature"),
-                _("The POA is still missing after the allowed follow-up period."),
-            )
         return True
 
     def _ensure_service_allowed(self, service_code):
@@ -1474,34 +1516,13 @@ class BDEngagementLetterClientFile(models.Model):
     def init(self):
         super().init()
         _ensure_workflow_notification_columns(self.env.cr)
-        self.env.cr.execute(
-            """
-            CREATE TABLE IF NOT EXISTS bd_engagement_client_file_rel (
-                engagement_id integer NOT NULL,
-                client_file_id integer NOT NULL
-            )
-            """
-        )
-        self.env.cr.execute(
-            """
-            CREATE UNIQUE INDEX IF NOT EXISTS bd_engagement_client_file_rel_uniq
-                ON bd_engagement_client_file_rel (engagement_id, client_file_id)
-            """
-        )
-        self.env.cr.execute(
-            """
-            INSERT INTO bd_engagement_client_file_rel (engagement_id, client_file_id)
-            SELECT id, client_file_id
-              FROM bd_engagement_letter
-             WHERE client_file_id IS NOT NULL
-            ON CONFLICT DO NOTHING
-            """
-        )
-        _migrate_legacy_legal_services(
+        run_init_step(
             self.env,
-            "bd_engagement_letter",
-            "bd_engagement_legal_service_type_rel",
-            "engagement_id",
+            "bd_engagement_letter.client_file_links",
+            "1",
+            _init_engagement_client_file_links,
+            tables=["bd_engagement_letter", "bd_engagement_client_file_rel", "bd_engagement_legal_service_type_rel"],
+            data=(SERVICE_PREFIXES, LEGACY_RETAINER_SERVICE_CODES),
         )
 
     @api.depends("client_file_id", "client_file_ids", "partner_id", "legal_service_type_ids")
@@ -1850,14 +1871,21 @@ class QlkProjectClientFile(models.Model):
     def init(self):
         super().init()
         _ensure_workflow_notification_columns(self.env.cr)
-        self.env.cr.execute("ALTER TABLE qlk_project DROP CONSTRAINT IF EXISTS qlk_project_engagement_letter_unique")
-        _migrate_legacy_legal_services(
+        run_init_step(
+            self.env,
+            "qlk_project.legal_services",
+            "1",
+            _init_project_legal_services,
+            tables=["qlk_project", "qlk_project_legal_service_type_rel"],
+            data=(SERVICE_PREFIXES, LEGACY_RETAINER_SERVICE_CODES),
+        )
+        run_init_step(
             self.env,
-            "qlk_project",
-            "qlk_project_legal_service_type_rel",
-            "project_id",
+            "qlk_project.legal_codes",
+            "1",
+            _init_project_legal_codes,
+            tables=["qlk_client_file", "qlk_project"],
         )
-        self.backfill_legal_codes()
 
     @api.model_create_multi
     def create(self, vals_list):
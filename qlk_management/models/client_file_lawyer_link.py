@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""Lawyers of client files, kept as a reference-counted link table.
+
+Every source record that puts a lawyer on a client file (the file itself,
+its engagement letters and its litigation, pre-litigation, arbitration and
+corporate matters) owns one ``qlk.client.file.lawyer.link`` row per
+``(client file, user)``. A user belongs to ``lawyer_user_ids`` while at
+least one row references them. Writes resync the rows of the changed source
+records only, with set-based SQL, instead of recomputing the union of all
+related records of the file.
+"""
+
+import logging
+
+from odoo import _, api, fields, models
+from odoo.tools import split_every
+
+from .schema_state import run_init_step
+
+_logger = logging.getLogger(__name__)
+
+SYNC_CHUNK_SIZE = 1000
+
+
+def _single_user_source(table, user_column):
+    return """
+        SELECT src.client_file_id, src.%(user_column)s, src.id
+          FROM %(table)s src
+         WHERE src.client_file_id IS NOT NULL
+           AND src.%(user_column)s IS NOT NULL
+           AND %%(where)s
+    """ % {"table": table, "user_column": user_column}
+
+
+# model -> (query yielding (client_file_id, user_id, source_id) for the source
+# rows matching %(where)s on "src", fields that move the links, SQL condition
+# on "src" selecting the rows that follow the employees in %(employee_ids)s).
+LINK_SOURCES = {
+    "qlk.client.file": (
+        """
+        SELECT src.id, emp.user_id, src.id
+          FROM qlk_client_file src
+          JOIN qlk_client_file_lawyer_rel rel ON rel.client_file_id = src.id
+          JOIN hr_employee emp ON emp.id = rel.employee_id AND emp.active
+         WHERE emp.user_id IS NOT NULL
+           AND %(where)s
+        """,
+        {"lawyer_ids"},
+        "src.id IN (SELECT client_file_id FROM qlk_client_file_lawyer_rel WHERE employee_id IN %(employee_ids)s)",
+    ),
+    "bd.engagement.letter": (
+        """
+        SELECT file_rel.client_file_id, lawyer.user_id, src.id
+          FROM bd_engagement_letter src
+          JOIN bd_engagement_client_file_rel file_rel ON file_rel.engagement_id = src.id
+         CROSS JOIN LATERAL (
+                SELECT src.lawyer_user_id AS user_id
+                 UNION
+                SELECT emp.user_id
+                  FROM bd_engagement_letter_lawyer_rel rel
+                  JOIN hr_employee emp ON emp.id = rel.employee_id AND emp.active
+                 WHERE rel.letter_id = src.id
+               ) lawyer
+         WHERE lawyer.user_id IS NOT NULL
+           AND %(where)s
+        """,
+        {"lawyer_id", "lawyer_employee_id", "lawyer_user_id", "lawyer_ids", "client_file_ids"},
+        "(src.lawyer_employee_id IN %(employee_ids)s OR src.id IN ("
+        "SELECT letter_id FROM bd_engagement_letter_lawyer_rel WHERE employee_id IN %(employee_ids)s))",
+    ),
+    "qlk.case": (
+        _single_user_source("qlk_case", "lawyer_id"),
+        {"client_file_id", "employee_id", "lawyer_id"},
+        "src.employee_id IN %(employee_ids)s",
+    ),
+    "qlk.pre.litigation": (
+        _single_user_source("qlk_pre_litigation", "lawyer_user_id"),
+        {"client_file_id", "lawyer_employee_id", "lawyer_user_id"},
+        "src.lawyer_employee_id IN %(employee_ids)s",
+    ),
+    "qlk.arbitration.case": (
+        _single_user_source("qlk_arbitration_case", "responsible_user_id"),
+        {"client_file_id", "responsible_employee_id", "responsible_user_id"},
+        "src.responsible_employee_id IN %(employee_ids)s",
+    ),
+    "qlk.corporate.case": (
+        _single_user_source("qlk_corporate_case", "responsible_user_id"),
+        {"client_file_id", "responsible_employee_id", "responsible_user_id"},
+        "src.responsible_employee_id IN %(employee_ids)s",
+    ),
+}
+
+
+def _rebuild_lawyer_links(env):
+    return env["qlk.client.file.lawyer.link"]._audit_links(fix=True)["missing"]
+
+
+class QlkClientFileLawyerLink(models.Model):
+    _name = "qlk.client.file.lawyer.link"
+    _description = "Client File Lawyer Link"
+    _order = "client_file_id, user_id"
+    _log_access = False
+
+    client_file_id = fields.Many2one(
+        "qlk.client.file", string="Client File", required=True, index=True, ondelete="cascade", readonly=True
+    )
+    user_id = fields.Many2one("res.users", string="Lawyer", required=True, index=True, ondelete="cascade", readonly=True)
+    source_model = fields.Char(string="Source Model", required=True, readonly=True)
+    source_id = fields.Integer(string="Source Record", required=True, readonly=True)
+
+    _sql_constraints = [
+        (
+            "link_unique",
+            "UNIQUE(client_file_id, user_id, source_model, source_id)",
+            "The lawyer link already exists.",
+        ),
+    ]
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS qlk_client_file_lawyer_link_source_idx
+                ON qlk_client_file_lawyer_link (source_model, source_id)
+            """
+        )
+        run_init_step(
+            self.env,
+            "qlk_client_file_lawyer_link.fill",
+            "1",
+            _rebuild_lawyer_links,
+            tables=["qlk_client_file_lawyer_link"],
+            data=[query for query, _fields, _employee_where in LINK_SOURCES.values()],
+        )
+
+    @api.model
+    def _source_query(self, model_name, where):
+        query, _fields, _employee_where = LINK_SOURCES[model_name]
+        # Archived matters drop out, as they did from the one2many reads.
+        if model_name != "qlk.client.file" and "active" in self.env[model_name]._fields:
+            where = "src.active AND %s" % where
+        return query % {"where": where}
+
+    @api.model
+    def _flush_sources(self):
+        self.env["hr.employee"].flush_model(["user_id", "active"])
+        for model_name in LINK_SOURCES:
+            self.env[model_name].flush_model()
+
+    @api.model
+    def _invalidate_links(self):
+        self.invalidate_model()
+        self.env["qlk.client.file"].invalidate_model(["lawyer_link_ids", "lawyer_user_ids"])
+
+    @api.model
+    def _sync_sources(self, model_name, source_ids):
+        """Rewrite the links owned by ``source_ids`` of ``model_name``."""
+        source_ids = [source_id for source_id in source_ids if source_id]
+        if not source_ids:
+            return
+        cr = self.env.cr
+        self._flush_sources()
+        for chunk in split_every(SYNC_CHUNK_SIZE, sorted(set(source_ids))):
+            params = {"model": model_name, "ids": tuple(chunk)}
+            cr.execute(
+                "DELETE FROM qlk_client_file_lawyer_link WHERE source_model = %(model)s AND source_id IN %(ids)s",
+                params,
+            )
+            cr.execute(
+                """
+                INSERT INTO qlk_client_file_lawyer_link (client_file_id, user_id, source_model, source_id)
+                SELECT DISTINCT source.client_file_id, source.user_id, %%(model)s, source.source_id
+                  FROM (%s) AS source (client_file_id, user_id, source_id)
+                ON CONFLICT DO NOTHING
+                """
+                % self._source_query(model_name, "src.id IN %(ids)s"),
+                params,
+            )
+        self._invalidate_links()
+
+    @api.model
+    def _drop_sources(self, model_name, source_ids):
+        if not source_ids:
+            return
+        self.env.cr.execute(
+            "DELETE FROM qlk_client_file_lawyer_link WHERE source_model = %s AND source_id IN %s",
+            [model_name, tuple(source_ids)],
+        )
+        self._invalidate_links()
+
+    @api.model
+    def _sync_employees(self, employee_ids):
+        """Resync the sources whose lawyer users follow ``employee_ids``."""
+        if not employee_ids:
+            return
+        self._flush_sources()
+        for model_name, (_query, _fields, employee_where) in LINK_SOURCES.items():
+            if not employee_where:
+                continue
+            self.env.cr.execute(
+                "SELECT src.id FROM %s src WHERE %s" % (self.env[model_name]._table, employee_where),
+                {"employee_ids": tuple(employee_ids)},
+            )
+            self._sync_sources(model_name, [row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _audit_links(self, fix=False):
+        """Compare the links with the sources.
+
+        Returns ``{"missing": n, "extra": n, "client_file_ids": [...]}``;
+        with ``fix`` the table is brought in line with the sources.
+        """
+        cr = self.env.cr
+        self._flush_sources()
+        expected = " UNION ALL ".join(
+            "SELECT DISTINCT source.*, '%s' FROM (%s) AS source (client_file_id, user_id, source_id)"
+            % (model_name, self._source_query(model_name, "TRUE"))
+            for model_name in LINK_SOURCES
+        )
+        cr.execute(
+            """
+            CREATE TEMPORARY TABLE qlk_expected_lawyer_link ON COMMIT DROP AS
+            SELECT expected.client_file_id, expected.user_id, expected.source_model, expected.source_id
+              FROM (%s) AS expected (client_file_id, user_id, source_id, source_model)
+            """
+            % expected
+        )
+        cr.execute(
+            """
+            SELECT expected.client_file_id
+              FROM qlk_expected_lawyer_link expected
+             WHERE NOT EXISTS (
+                    SELECT 1 FROM qlk_client_file_lawyer_link link
+                     WHERE link.client_file_id = expected.client_file_id
+                       AND link.user_id = expected.user_id
+                       AND link.source_model = expected.source_model
+                       AND link.source_id = expected.source_id
+                   )
+            """
+        )
+        missing = [row[0] for row in cr.fetchall()]
+        cr.execute(
+            """
+            SELECT link.id, link.client_file_id
+              FROM qlk_client_file_lawyer_link link
+             WHERE NOT EXISTS (
+                    SELECT 1 FROM qlk_expected_lawyer_link expected
+                     WHERE expected.client_file_id = link.client_file_id
+                       AND expected.user_id = link.user_id
+                       AND expected.source_model = link.source_model
+                       AND expected.source_id = link.source_id
+                   )
+            """
+        )
+        extra = cr.fetchall()
+        if fix and (missing or extra):
+            if extra:
+                cr.execute("DELETE FROM qlk_client_file_lawyer_link WHERE id IN %s", [tuple(row[0] for row in extra)])
+            cr.execute(
+                """
+                INSERT INTO qlk_client_file_lawyer_link (client_file_id, user_id, source_model, source_id)
+                SELECT client_file_id, user_id, source_model, source_id
+                  FROM qlk_expected_lawyer_link
+                ON CONFLICT DO NOTHING
+                """
+            )
+            self._invalidate_links()
+        cr.execute("DROP TABLE qlk_expected_lawyer_link")
+        client_file_ids = sorted(set(missing) | {row[1] for row in extra})
+        if client_file_ids:
+            _logger.warning(
+                "Client file lawyer links: %s missing, %s extra on %s client files",
+                len(missing),
+                len(extra),
+                len(client_file_ids),
+            )
+        return {"missing": len(missing), "extra": len(extra), "client_file_ids": client_file_ids}
+
+    @api.model
+    def action_audit_links(self):
+        """Rebuild the links and report the mismatches that were repaired."""
+        report = self._audit_links(fix=True)
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Client File Lawyers"),
+                "message": _(
+                    "%(missing)s missing and %(extra)s stale links repaired on %(files)s client files.",
+                    missing=report["missing"],
+                    extra=report["extra"],
+                    files=len(report["client_file_ids"]),
+                ),
+                "type": "warning" if report["client_file_ids"] else "success",
+                "sticky": False,
+            },
+        }
+
+
+class ClientFileLawyerLinkSource(models.AbstractModel):
+    """Resync the lawyer links owned by the records of the inheriting model."""
+
+    _name = "qlk.client.file.lawyer.link.source"
+    _description = "Client File Lawyer Link Source"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env["qlk.client.file.lawyer.link"]._sync_sources(self._name, records.ids)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if ({"active"} | LINK_SOURCES[self._name][1]).intersection(vals):
+            self.env["qlk.client.file.lawyer.link"]._sync_sources(self._name, self.ids)
+        return res
+
+    def unlink(self):
+        ids = self.ids
+        res = super().unlink()
+        self.env["qlk.client.file.lawyer.link"]._drop_sources(self._name, ids)
+        return res
+
+
+class QlkClientFileLawyerLinks(models.Model):
+    _name = "qlk.client.file"
+    _inherit = ["qlk.client.file", "qlk.client.file.lawyer.link.source"]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        client_files = super().create(vals_list)
+        self.env["qlk.client.file.lawyer.link"]._sync_sources("bd.engagement.letter", client_files.engagement_ids.ids)
+        return client_files
+
+    def write(self, vals):
+        # The engagement side of the shared relation owns those links.
+        engagement_ids = set(self.engagement_ids.ids) if "engagement_ids" in vals else set()
+        res = super().write(vals)
+        if "engagement_ids" in vals:
+            engagement_ids |= set(self.engagement_ids.ids)
+            self.env["qlk.client.file.lawyer.link"]._sync_sources("bd.engagement.letter", engagement_ids)
+        return res
+
+
+class BDEngagementLetterLawyerLinks(models.Model):
+    _name = "bd.engagement.letter"
+    _inherit = ["bd.engagement.letter", "qlk.client.file.lawyer.link.source"]
+
+
+class QlkCaseLawyerLinks(models.Model):
+    _name = "qlk.case"
+    _inherit = ["qlk.case", "qlk.client.file.lawyer.link.source"]
+
+
+class QlkPreLitigationLawyerLinks(models.Model):
+    _name = "qlk.pre.litigation"
+    _inherit = ["qlk.pre.litigation", "qlk.client.file.lawyer.link.source"]
+
+
+class QlkArbitrationCaseLawyerLinks(models.Model):
+    _name = "qlk.arbitration.case"
+    _inherit = ["qlk.arbitration.case", "qlk.client.file.lawyer.link.source"]
+
+
+class QlkCorporateCaseLawyerLinks(models.Model):
+    _name = "qlk.corporate.case"
+    _inherit = ["qlk.corporate.case", "qlk.client.file.lawyer.link.source"]
+
+
+class HrEmployeeLawyerLinks(models.Model):
+    _inherit = "hr.employee"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "user_id" in vals or "active" in vals:
+            self.env["qlk.client.file.lawyer.link"]._sync_employees(self.ids)
+        return res
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Counters behind employee, client, proposal and project codes.
+
+The next number of a code used to be found by searching the existing codes
+(every employee code, or the "last" code ordered as text) under an advisory
+lock, so each create read a growing table and all creates queued behind one
+lock. Each code family now has a counter row per key (a year, a client, ...)
+that is incremented in place: the row lock serializes creates of the same
+key only, and a bulk create reserves its whole block with one statement.
+
+A counter is seeded from the existing codes the first time its key is used.
+"""
+
+from odoo import api, fields, models
+
+
+class QlkCodeCounter(models.Model):
+    _name = "qlk.code.counter"
+    _description = "Code Counter"
+    _order = "scope, key"
+    _log_access = False
+
+    scope = fields.Char(required=True, readonly=True)
+    key = fields.Char(required=True, readonly=True)
+    last_value = fields.Integer(string="Last Value", readonly=True)
+
+    _sql_constraints = [
+        ("scope_key_unique", "UNIQUE(scope, key)", "A code counter already exists for this key."),
+    ]
+
+    @api.model
+    def _seed(self, scope, key, query, params):
+        """Create the counter from ``query`` (the highest number in use)."""
+        cr = self.env.cr
+        cr.execute("SELECT 1 FROM qlk_code_counter WHERE scope = %s AND key = %s", [scope, key])
+        if cr.fetchone():
+            return
+        cr.execute(query, params)
+        row = cr.fetchone()
+        cr.execute(
+            """
+            INSERT INTO qlk_code_counter (scope, key, last_value)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (scope, key) DO NOTHING
+            """,
+            [scope, key, (row and row[0]) or 0],
+        )
+
+    @api.model
+    def _reserve(self, scope, key, count=1, seed=None, floor=0):
+        """Reserve ``count`` consecutive numbers, return the first one.
+
+        ``seed`` is a ``(query, params)`` pair returning the highest number
+        already used for the key; it only runs while the counter does not
+        exist. Numbers are never below ``floor + 1``. The counter row stays
+        locked until the transaction ends.
+        """
+        key = str(key)
+        if seed:
+            self._seed(scope, key, *seed)
+        self.env.cr.execute(
+            """
+            INSERT INTO qlk_code_counter (scope, key, last_value)
+            VALUES (%(scope)s, %(key)s, %(floor)s + %(count)s)
+            ON CONFLICT (scope, key) DO UPDATE
+               SET last_value = GREATEST(qlk_code_counter.last_value, %(floor)s) + %(count)s
+            RETURNING last_value
+            """,
+            {"scope": scope, "key": key, "floor": floor, "count": count},
+        )
+        last_value = self.env.cr.fetchone()[0]
+        self.invalidate_model(["last_value"])
+        return last_value - count + 1
+
+    @api.model
+    def _observe(self, scope, key, value):
+        """Move an existing counter past ``value``, a number set by hand."""
+        if not value:
+            return
+        self.env.cr.execute(
+            """
+            UPDATE qlk_code_counter
+               SET last_value = %s
+             WHERE scope = %s AND key = %s AND last_value < %s
+            """,
+            [value, scope, str(key), value],
+        )
+        self.invalidate_model(["last_value"])
@@ -3,6 +3,13 @@
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
 
+from .legal_numbering import LEGAL_RECORD_CODE_COLUMNS
+from .schema_state import add_columns, run_init_step
+
+
+def _init_corporate_case_columns(env):
+    return add_columns(env.cr, "qlk_corporate_case", LEGAL_RECORD_CODE_COLUMNS)
+
 
 class CorporateCaseProject(models.Model):
     _inherit = "qlk.corporate.case"
@@ -245,9 +252,11 @@ class CorporateCaseProject(models.Model):
 
     def init(self):
         super().init()
-        cr = self.env.cr
-        cr.execute("ALTER TABLE qlk_corporate_case ADD COLUMN IF NOT EXISTS service_category varchar")
-        cr.execute("ALTER TABLE qlk_corporate_case ADD COLUMN IF NOT EXISTS client_legal_code varchar")
-        cr.execute("ALTER TABLE qlk_corporate_case ADD COLUMN IF NOT EXISTS project_legal_code varchar")
-        cr.execute("ALTER TABLE qlk_corporate_case ADD COLUMN IF NOT EXISTS record_sequence integer DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_corporate_case ADD COLUMN IF NOT EXISTS record_code varchar")
+        run_init_step(
+            self.env,
+            "qlk_corporate_case.legal_code_columns",
+            "1",
+            _init_corporate_case_columns,
+            tables=["qlk_corporate_case"],
+            data=LEGAL_RECORD_CODE_COLUMNS,
+        )
@@ -20,6 +20,7 @@ class CostCalculation(models.Model):
     other_cost = fields.Float(string="Other")
     total = fields.Float(string="Total", compute="_compute_totals", store=True)
     profit_ratio  = fields.Float(string="Profit")
+    monthly_hours = fields.Float(string="Monthly Hours", default=180.0)
     cost_per_hour_base = fields.Float(string="Cost Per Hour Base", compute="_compute_totals", store=True)
     cost_per_hour = fields.Float(string="Cost Per Hour", compute="_compute_totals", store=True)
 
@@ -33,7 +34,7 @@ class CostCalculation(models.Model):
             if record.employee_id and record.name in (False, _("New")):
                 record.name = f"{record.employee_id.name} Cost"
 
-    @api.depends("mactech", "email_charge", "office_rent", "printer_rent", "telephone", "salary", "other_cost", "profit_ratio", "lawyer_hour_cost")
+    @api.depends("mactech", "email_charge", "office_rent", "printer_rent", "telephone", "salary", "other_cost", "profit_ratio", "lawyer_hour_cost", "monthly_hours")
     def _compute_totals(self):
         for record in self:
             overhead = sum(
@@ -48,7 +49,8 @@ class CostCalculation(models.Model):
                 ]
             )
             record.total = overhead + (record.lawyer_hour_cost or 0.0)
-            record.cost_per_hour_base = record.total / 180.0 if record.total else 0.0
+            monthly_hours = record.monthly_hours or 180.0
+            record.cost_per_hour_base = record.total / monthly_hours if record.total else 0.0
             record.cost_per_hour = (
                 record.cost_per_hour_base * record.profit_ratio
                 if record.cost_per_hour_base
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Retention policies that keep high-volume QLK tables small.
+
+Each policy points at a model and an action. The model implements the action
+as ``_qlk_retention_<action>(policy, cutoff, limit)`` and returns the number of
+rows it handled, so a cron can run every policy in bounded batches.
+
+Rows moved to cold storage are deleted through the ORM. Models whose
+``unlink`` refuses deletions (immutable audit trails) let retention through
+with :func:`retention_unlink_allowed`.
+"""
+
+import logging
+import threading
+import time
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from .perf_sample import instrument, perf_section
+
+_logger = logging.getLogger(__name__)
+
+RETENTION_UNLINK_CONTEXT = "qlk_retention_unlink"
+
+RETENTION_ACTIONS = [
+    ("cold_storage", "Move to Cold Storage"),
+    ("strip_payload", "Drop Raw Payload"),
+    ("rollup", "Monthly Rollup"),
+]
+
+
+def retention_unlink_allowed(records):
+    """Tell whether ``records`` are being deleted by a retention policy.
+
+    Only superuser environments qualify, so the context key cannot be used
+    to bypass an ``unlink`` guard from the client.
+    """
+    return records.env.su and records.env.context.get(RETENTION_UNLINK_CONTEXT)
+
+
+class QlkRetentionPolicy(models.Model):
+    _name = "qlk.retention.policy"
+    _description = "Data Retention Policy"
+    _order = "sequence, id"
+
+    name = fields.Char(required=True)
+    sequence = fields.Integer(default=10)
+    active = fields.Boolean(default=True)
+    model_id = fields.Many2one("ir.model", string="Model", required=True, ondelete="cascade")
+    model_name = fields.Char(related="model_id.model", store=True, string="Model Name")
+    action = fields.Selection(RETENTION_ACTIONS, required=True, default="cold_storage")
+    retention_days = fields.Integer(string="Keep (Days)", required=True, default=365)
+    batch_size = fields.Integer(required=True, default=1000)
+    last_run = fields.Datetime(readonly=True, copy=False)
+    last_processed = fields.Integer(string="Rows Processed (Last Run)", readonly=True, copy=False)
+
+    _sql_constraints = [
+        ("retention_days_positive", "CHECK(retention_days > 0)", "Retention days must be positive."),
+        ("batch_size_positive", "CHECK(batch_size > 0)", "Batch size must be positive."),
+    ]
+
+    def _get_handler(self):
+        self.ensure_one()
+        model = self.env[self.model_name].sudo()
+        handler = getattr(model, "_qlk_retention_%s" % self.action, None)
+        if not handler:
+            raise UserError(
+                _("Model %(model)s does not support the retention action %(action)s.")
+                % {"model": self.model_name, "action": self.action}
+            )
+        return handler
+
+    def _run(self, deadline=None):
+        """Run the policies batch by batch, committing after each batch."""
+        no_commit = getattr(threading.current_thread(), "testing", False) or self.env.context.get("cron_no_commit")
+        for policy in self:
+            handler = policy._get_handler()
+            cutoff = fields.Datetime.now() - relativedelta(days=policy.retention_days)
+            processed = 0
+            while True:
+                with perf_section(self.env, "qlk.retention.policy.%s" % policy.model_name):
+                    count = handler(policy, cutoff, policy.batch_size)
+                processed += count
+                if not no_commit:
+                    self.env.cr.commit()
+                if count < policy.batch_size or (deadline and time.monotonic() >= deadline):
+                    break
+            policy.write({"last_run": fields.Datetime.now(), "last_processed": processed})
+            _logger.info("Retention policy %s processed %s rows", policy.name, processed)
+            if deadline and time.monotonic() >= deadline:
+                break
+        return True
+
+    def action_run_now(self):
+        """Queue the retention cron: batches commit, which a UI request must not do."""
+        cron = self.env.ref("qlk_management.ir_cron_qlk_data_retention", raise_if_not_found=False)
+        if not cron:
+            raise UserError(_("The data retention scheduled action is missing."))
+        cron.sudo()._trigger()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Data Retention"),
+                "message": _("The retention policies will run in the background shortly."),
+                "type": "success",
+            },
+        }
+
+    @api.model
+    @instrument()
+    def cron_run_retention_policies(self, max_seconds=600):
+        deadline = time.monotonic() + max_seconds
+        return self.search([])._run(deadline=deadline)
+
+    @api.model
+    def _copy_to_cold_storage(self, model, ids, date_column):
+        table = model._table
+        self.env.cr.execute(
+            f"""
+            INSERT INTO qlk_retention_archive (model_name, res_id, record_date, payload, archived_on)
+            SELECT %s, t.id, t.{date_column}, row_to_json(t)::text, now() AT TIME ZONE 'UTC'
+              FROM {table} t
+             WHERE t.id IN %s
+            """,
+            [model._name, tuple(ids)],
+        )
+
+    @api.model
+    def _archive_rows(self, model, ids, date_column):
+        """Copy rows to cold storage and delete them from the hot table."""
+        if not ids:
+            return 0
+        self._copy_to_cold_storage(model, ids, date_column)
+        model.sudo().with_context(**{RETENTION_UNLINK_CONTEXT: True}).browse(ids).unlink()
+        return len(ids)
+
+
+class QlkRetentionArchive(models.Model):
+    """Cold storage for rows removed from hot tables by retention policies."""
+
+    _name = "qlk.retention.archive"
+    _description = "Retention Cold Storage"
+    _order = "record_date desc, id desc"
+    _log_access = False
+
+    model_name = fields.Char(required=True, readonly=True)
+    res_id = fields.Integer(string="Original ID", required=True, readonly=True)
+    record_date = fields.Datetime(readonly=True)
+    payload = fields.Text(readonly=True)
+    archived_on = fields.Datetime(required=True, default=fields.Datetime.now, readonly=True)
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS qlk_retention_archive_model_date_idx
+                ON qlk_retention_archive (model_name, record_date)
+            """
+        )
@@ -2,11 +2,13 @@
 from odoo import _, api, fields, models
 from odoo.osv.expression import AND, OR
 from odoo.tools.misc import format_date
+from .perf_sample import instrument
 
 
 class QlkDepartmentDashboard(models.AbstractModel):
     _name = "qlk.department.dashboard"
     _description = "Personal Corporate and Arbitration Dashboard Service"
+    _QUERY_BUDGETS = {"get_dashboard_data": 40}
 
     _CONFIG = {
         "corporate": {
@@ -48,12 +50,11 @@ class QlkDepartmentDashboard(models.AbstractModel):
         if model_name not in self.env:
             return [("id", "=", 0)]
         model = self.env[model_name]
-        employees = self.env.user.employee_ids
-        if not employees:
-            employees = self.env["hr.employee"].sudo().with_context(active_test=False).search(
+        employee_ids = list(self.env["qlk.user.access.context"]._get().employee_ids)
+        if not employee_ids:
+            employee_ids = self.env["hr.employee"].sudo().with_context(active_test=False).search(
                 [("user_id", "=", self.env.user.id)]
-            )
-        employee_ids = employees.ids
+            ).ids
         if not employee_ids:
             return [("id", "=", 0)]
         scopes = []
@@ -143,6 +144,9 @@ class QlkDepartmentDashboard(models.AbstractModel):
             return 0.0
         task_model = self.env["qlk.task"]
         domain = AND([task_domain, [("approval_state", "=", "approved")]])
+        total_hours = self.env["qlk.hours.daily"].task_hours_total(domain)
+        if total_hours is not None:
+            return round(total_hours, 2)
         grouped = task_model.read_group(domain, ["hours_spent:sum"], [])
         return round((grouped and grouped[0].get("hours_spent") or 0.0), 2)
 
@@ -264,9 +268,10 @@ class QlkDepartmentDashboard(models.AbstractModel):
         ]
 
     @api.model
+    @instrument()
     def get_dashboard_data(self, department):
         config = self._CONFIG.get(department)
-        if not config or not any(self.env.user.has_group(group) for group in config["groups"]):
+        if not config or not self.env["qlk.user.access.context"].has_any_group(config["groups"]):
             return {
                 "access_denied": True,
                 "cards": [],
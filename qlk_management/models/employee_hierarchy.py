@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Closure table of the ``hr.employee`` ``parent_id`` tree.
+
+Every employee has one row per ancestor, itself included at depth 0, so a
+team is a single indexed lookup instead of a recursive ``child_of`` search.
+Rows are maintained incrementally when employees are created, moved or
+deleted.
+"""
+
+from odoo import api, fields, models
+
+
+class QlkEmployeeHierarchy(models.Model):
+    _name = "qlk.employee.hierarchy"
+    _description = "Employee Hierarchy Closure"
+    _log_access = False
+
+    ancestor_id = fields.Many2one("hr.employee", required=True, ondelete="cascade", readonly=True)
+    descendant_id = fields.Many2one("hr.employee", required=True, ondelete="cascade", readonly=True)
+    depth = fields.Integer(required=True, readonly=True)
+
+    _sql_constraints = [
+        ("ancestor_descendant_unique", "UNIQUE(ancestor_id, descendant_id)", "Duplicate hierarchy link."),
+    ]
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS qlk_employee_hierarchy_descendant_idx
+                ON qlk_employee_hierarchy (descendant_id, depth)
+            """
+        )
+        self.env.cr.execute("SELECT 1 FROM qlk_employee_hierarchy LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._rebuild()
+
+    @api.model
+    def _rebuild(self):
+        """Recompute the whole closure from ``hr_employee.parent_id``."""
+        self.env.cr.execute("DELETE FROM qlk_employee_hierarchy")
+        self.env.cr.execute(
+            """
+            WITH RECURSIVE tree(ancestor_id, descendant_id, depth) AS (
+                SELECT id, id, 0 FROM hr_employee
+                UNION ALL
+                SELECT tree.ancestor_id, emp.id, tree.depth + 1
+                  FROM tree
+                  JOIN hr_employee emp ON emp.parent_id = tree.descendant_id
+                 WHERE tree.depth < 100
+            )
+            INSERT INTO qlk_employee_hierarchy (ancestor_id, descendant_id, depth)
+            SELECT ancestor_id, descendant_id, MIN(depth)
+              FROM tree
+          GROUP BY ancestor_id, descendant_id
+            """
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _add_employees(self, employees):
+        """Insert the links of new employees (no descendants yet)."""
+        if not employees:
+            return
+        self.env.cr.execute(
+            """
+            INSERT INTO qlk_employee_hierarchy (ancestor_id, descendant_id, depth)
+            SELECT emp.id, emp.id, 0 FROM hr_employee emp WHERE emp.id IN %(ids)s
+            UNION ALL
+            SELECT sup.ancestor_id, emp.id, sup.depth + 1
+              FROM hr_employee emp
+              JOIN qlk_employee_hierarchy sup ON sup.descendant_id = emp.parent_id
+             WHERE emp.id IN %(ids)s
+            ON CONFLICT DO NOTHING
+            """,
+            {"ids": tuple(employees.ids)},
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _move_employee(self, employee, detach=False):
+        """Re-attach the subtree of ``employee`` under its current parent.
+
+        With ``detach=True`` the subtree becomes a root, whatever the parent.
+        """
+        cr = self.env.cr
+        # Detach the subtree from its former ancestors.
+        cr.execute(
+            """
+            DELETE FROM qlk_employee_hierarchy
+             WHERE descendant_id IN (
+                       SELECT descendant_id FROM qlk_employee_hierarchy WHERE ancestor_id = %(id)s
+                   )
+               AND ancestor_id NOT IN (
+                       SELECT descendant_id FROM qlk_employee_hierarchy WHERE ancestor_id = %(id)s
+                   )
+            """,
+            {"id": employee.id},
+        )
+        if employee.parent_id and not detach:
+            cr.execute(
+                """
+                INSERT INTO qlk_employee_hierarchy (ancestor_id, descendant_id, depth)
+                SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1
+                  FROM qlk_employee_hierarchy sup
+                  JOIN qlk_employee_hierarchy sub ON sub.ancestor_id = %(id)s
+                 WHERE sup.descendant_id = %(parent_id)s
+                ON CONFLICT DO NOTHING
+                """,
+                {"id": employee.id, "parent_id": employee.parent_id.id},
+            )
+        self.invalidate_model()
+
+    @api.model
+    def team_of(self, employee_ids, max_depth=None, include_archived=False):
+        """Return ids of ``employee_ids`` and their subordinates.
+
+        ``max_depth=1`` limits the result to direct reports.
+        """
+        if not employee_ids:
+            return []
+        query = """
+            SELECT DISTINCT h.descendant_id
+              FROM qlk_employee_hierarchy h
+              JOIN hr_employee emp ON emp.id = h.descendant_id
+             WHERE h.ancestor_id IN %s
+        """
+        params = [tuple(employee_ids)]
+        if max_depth is not None:
+            query += " AND h.depth <= %s"
+            params.append(max_depth)
+        if not include_archived:
+            query += " AND emp.active"
+        self.env.cr.execute(query, params)
+        return [row[0] for row in self.env.cr.fetchall()]
+
+
+class HrEmployeeHierarchy(models.Model):
+    _inherit = "hr.employee"
+
+    # Closure rows, usable in record rules, e.g. a manager's team:
+    # [("employee_id.hierarchy_ancestor_ids.ancestor_id", "in", user.employee_ids.ids)]
+    hierarchy_ancestor_ids = fields.One2many(
+        "qlk.employee.hierarchy", "descendant_id", string="Hierarchy Ancestors", readonly=True
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        employees = super().create(vals_list)
+        employees.flush_recordset(["parent_id"])
+        hierarchy = self.env["qlk.employee.hierarchy"].sudo()
+        # One at a time: a parent created in the same batch must be linked first.
+        for employee in employees:
+            hierarchy._add_employees(employee)
+        return employees
+
+    def write(self, vals):
+        # parent_id is also recomputed from the department manager.
+        if not {"parent_id", "department_id"}.intersection(vals):
+            return super().write(vals)
+        res = super().write(vals)
+        self.flush_recordset(["parent_id"])
+        hierarchy = self.env["qlk.employee.hierarchy"].sudo()
+        for employee in self:
+            hierarchy._move_employee(employee)
+        return res
+
+    def unlink(self):
+        # The database sets parent_id to NULL on the remaining direct reports:
+        # detach their subtrees from the ancestors of the deleted employees.
+        orphans = self.sudo().with_context(active_test=False).child_ids - self
+        hierarchy = self.env["qlk.employee.hierarchy"].sudo()
+        for employee in orphans:
+            hierarchy._move_employee(employee, detach=True)
+        return super().unlink()
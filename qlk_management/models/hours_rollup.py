@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+"""Daily hours rollup shared by the hour widgets.
+
+``qlk.hours.daily`` holds one row per day, employee, project, engagement,
+department and approval state with the summed hours and the number of
+entries, for legal tasks and timesheets. Writes on the sources queue their
+``(day, employee)`` keys; the queued keys are recomputed before the
+transaction commits, or as soon as a widget reads the rollup, so the
+figures are never behind the tasks.
+
+Widgets pass their usual ``qlk.task`` domain to :meth:`read_task_hours`.
+Domains on fields the rollup does not carry (reviewer, creator, ...) or
+users restricted by record rules get ``None`` back and keep reading the
+tasks.
+"""
+
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models
+from odoo.osv import expression
+from odoo.tools import split_every
+
+from .schema_state import run_init_step
+
+PENDING_KEY = "qlk_hours_daily_pending"
+REFRESH_CHUNK_SIZE = 1000
+
+ROLLUP_COLUMNS = (
+    "date",
+    "employee_id",
+    "user_id",
+    "project_id",
+    "engagement_id",
+    "department",
+    "approval_state",
+    "company_id",
+    "source",
+    "hours",
+    "task_count",
+)
+
+TASK_ROLLUP_SQL = """
+    SELECT task.date_start, task.employee_id, task.assigned_user_id, task.project_id, task.engagement_id,
+           task.department, task.approval_state, task.company_id, 'task',
+           SUM(task.hours_spent), COUNT(*)
+      FROM qlk_task task
+     WHERE task.date_start IS NOT NULL
+       AND %(where)s
+  GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
+"""
+TIMESHEET_ROLLUP_SQL = """
+    SELECT line.date, line.employee_id, line.user_id, ptask.qlk_project_id, project.engagement_letter_id,
+           NULL, NULL, line.company_id, 'timesheet',
+           SUM(line.unit_amount), COUNT(*)
+      FROM account_analytic_line line
+      LEFT JOIN project_task ptask ON ptask.id = line.task_id
+      LEFT JOIN qlk_project project ON project.id = ptask.qlk_project_id
+     WHERE line.project_id IS NOT NULL
+       AND %(where)s
+  GROUP BY 1, 2, 3, 4, 5, 8
+"""
+ROLLUP_SOURCES = {
+    "task": (TASK_ROLLUP_SQL, "(task.date_start, COALESCE(task.employee_id, 0))"),
+    "timesheet": (TIMESHEET_ROLLUP_SQL, "(line.date, COALESCE(line.employee_id, 0))"),
+}
+
+# Source field -> rollup column, per source.
+TASK_ROLLUP_FIELDS = {
+    "date_start": "date",
+    "employee_id": "employee_id",
+    "assigned_user_id": "user_id",
+    "project_id": "project_id",
+    "engagement_id": "engagement_id",
+    "department": "department",
+    "approval_state": "approval_state",
+    "company_id": "company_id",
+}
+TIMESHEET_ROLLUP_FIELDS = {
+    "date": "date",
+    "employee_id": "employee_id",
+    "user_id": "user_id",
+    "company_id": "company_id",
+}
+# Groups whose record rules show every row of the source.
+FULL_ACCESS_GROUPS = {
+    "task": ("qlk_task_management.group_task_manager", "qlk_management.group_project_manager"),
+    "timesheet": ("hr_timesheet.group_timesheet_manager",),
+}
+TASK_WRITE_FIELDS = set(TASK_ROLLUP_FIELDS) | {"hours_spent"}
+TIMESHEET_WRITE_FIELDS = {"date", "employee_id", "user_id", "unit_amount", "task_id", "project_id", "company_id"}
+
+
+def _fill_hours_rollup(env):
+    return env["qlk.hours.daily"]._rebuild()
+
+
+class QlkHoursDaily(models.Model):
+    _name = "qlk.hours.daily"
+    _description = "Daily Hours Rollup"
+    _order = "date desc, id desc"
+    _log_access = False
+
+    date = fields.Date(required=True, readonly=True)
+    employee_id = fields.Many2one("hr.employee", string="Employee", readonly=True)
+    user_id = fields.Many2one("res.users", string="User", readonly=True)
+    project_id = fields.Many2one("qlk.project", string="Project", readonly=True)
+    engagement_id = fields.Many2one("bd.engagement.letter", string="Engagement Letter", readonly=True)
+    department = fields.Selection(selection="_selection_department", readonly=True)
+    approval_state = fields.Selection(selection="_selection_approval_state", readonly=True)
+    company_id = fields.Many2one("res.company", string="Company", readonly=True)
+    source = fields.Selection(
+        [("task", "Legal Task"), ("timesheet", "Timesheet")],
+        required=True,
+        readonly=True,
+    )
+    hours = fields.Float(readonly=True)
+    task_count = fields.Integer(string="Entries", readonly=True)
+
+    @api.model
+    def _selection_department(self):
+        return self.env["qlk.task"]._fields["department"]._description_selection(self.env)
+
+    @api.model
+    def _selection_approval_state(self):
+        return self.env["qlk.task"]._fields["approval_state"]._description_selection(self.env)
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute(
+            "CREATE INDEX IF NOT EXISTS qlk_hours_daily_employee_date_idx ON qlk_hours_daily (employee_id, date)"
+        )
+        cr.execute("CREATE INDEX IF NOT EXISTS qlk_hours_daily_date_idx ON qlk_hours_daily (date)")
+        run_init_step(
+            self.env,
+            "qlk_hours_daily.fill",
+            "1",
+            _fill_hours_rollup,
+            tables=["qlk_hours_daily", "qlk_task", "account_analytic_line"],
+            data=(TASK_ROLLUP_SQL, TIMESHEET_ROLLUP_SQL),
+        )
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    @api.model
+    def _insert_rows(self, source, where, params=None):
+        query, _key = ROLLUP_SOURCES[source]
+        self.env.cr.execute(
+            "INSERT INTO qlk_hours_daily (%s) %s" % (", ".join(ROLLUP_COLUMNS), query % {"where": where}),
+            params or {},
+        )
+        return self.env.cr.rowcount
+
+    @api.model
+    def _flush_sources(self):
+        self.env["qlk.task"].flush_model()
+        self.env["account.analytic.line"].flush_model()
+        self.env["project.task"].flush_model(["qlk_project_id"])
+        self.env["qlk.project"].flush_model(["engagement_letter_id"])
+
+    @api.model
+    def _rebuild(self):
+        """Recompute the whole rollup, return the number of rows."""
+        self._flush_sources()
+        self.env.cr.execute("DELETE FROM qlk_hours_daily")
+        count = sum(self._insert_rows(source, "TRUE") for source in ROLLUP_SOURCES)
+        self.invalidate_model()
+        return count
+
+    @api.model
+    def _refresh_keys(self, source, keys):
+        """Recompute the rows of ``keys`` (``(date, employee_id or 0)`` pairs)."""
+        _query, key_expression = ROLLUP_SOURCES[source]
+        for chunk in split_every(REFRESH_CHUNK_SIZE, sorted(keys)):
+            params = {"source": source, "keys": tuple(chunk)}
+            self.env.cr.execute(
+                """
+                DELETE FROM qlk_hours_daily
+                 WHERE source = %(source)s
+                   AND (date, COALESCE(employee_id, 0)) IN %(keys)s
+                """,
+                params,
+            )
+            self._insert_rows(source, "%s IN %%(keys)s" % key_expression, params)
+        self.invalidate_model()
+
+    @api.model
+    def _mark_dirty(self, source, keys):
+        """Queue ``(date, employee_id)`` pairs of ``source`` for recomputation."""
+        keys = {(source, date, employee_id or 0) for date, employee_id in keys if date}
+        if not keys:
+            return
+        transaction_data = self.env.cr.precommit.data
+        if PENDING_KEY not in transaction_data:
+            # Recompute once per transaction, after the last write.
+            self.env.cr.precommit.add(self._flush_pending)
+        transaction_data.setdefault(PENDING_KEY, set()).update(keys)
+
+    @api.model
+    def _flush_pending(self):
+        pending = self.env.cr.precommit.data.pop(PENDING_KEY, None)
+        if not pending:
+            return
+        self._flush_sources()
+        for source in ROLLUP_SOURCES:
+            keys = {(date, employee_id) for key_source, date, employee_id in pending if key_source == source}
+            if keys:
+                self._refresh_keys(source, keys)
+
+    @api.model
+    def _mark_employee_dirty(self, employee_ids):
+        """Queue every day of ``employee_ids`` (used when their user changes)."""
+        if not employee_ids:
+            return
+        self.env["qlk.task"].flush_model(["date_start", "employee_id"])
+        self.env.cr.execute(
+            "SELECT DISTINCT date_start, employee_id FROM qlk_task WHERE employee_id IN %s",
+            [tuple(employee_ids)],
+        )
+        self._mark_dirty("task", self.env.cr.fetchall())
+
+    @api.model
+    def _mark_project_tasks_dirty(self, where, params):
+        """Queue the timesheet days of the ``project_task`` rows matching ``where``."""
+        self.env["account.analytic.line"].flush_model(["date", "employee_id", "task_id"])
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT line.date, line.employee_id
+              FROM account_analytic_line line
+              JOIN project_task ptask ON ptask.id = line.task_id
+             WHERE %s
+            """
+            % where,
+            params,
+        )
+        self._mark_dirty("timesheet", self.env.cr.fetchall())
+
+    # ------------------------------------------------------------------
+    # Query API
+    # ------------------------------------------------------------------
+    @api.model
+    def _can_read_all(self, source):
+        if self.env.su:
+            return True
+        user = self.env.user
+        return any(user.has_group(group) for group in FULL_ACCESS_GROUPS[source])
+
+    @api.model
+    def _rollup_domain(self, domain, source):
+        """Translate a source domain, or return None if a leaf has no column."""
+        field_map = TASK_ROLLUP_FIELDS if source == "task" else TIMESHEET_ROLLUP_FIELDS
+        rollup_domain = []
+        for leaf in expression.normalize_domain(domain or []):
+            if not expression.is_leaf(leaf) or leaf in (expression.TRUE_LEAF, expression.FALSE_LEAF):
+                rollup_domain.append(leaf)
+                continue
+            field_name, operator, value = leaf
+            if field_name not in field_map or operator in ("child_of", "parent_of", "any", "not any"):
+                return None
+            rollup_domain.append((field_map[field_name], operator, value))
+        return expression.AND([rollup_domain, [("source", "=", source)]])
+
+    @api.model
+    def _read_hours(self, source, domain, groupby=(), aggregates=("hours:sum",)):
+        rollup_domain = self._rollup_domain(domain, source)
+        if rollup_domain is None or not self._can_read_all(source):
+            return None
+        field_map = TASK_ROLLUP_FIELDS if source == "task" else TIMESHEET_ROLLUP_FIELDS
+        rollup_groupby = []
+        for spec in groupby:
+            field_name, _sep, granularity = spec.partition(":")
+            if field_name not in field_map:
+                return None
+            rollup_groupby.append(field_map[field_name] + (":" + granularity if granularity else ""))
+        self._flush_pending()
+        return self.sudo()._read_group(rollup_domain, rollup_groupby, list(aggregates))
+
+    @api.model
+    def read_task_hours(self, domain, groupby=(), aggregates=("hours:sum",)):
+        """Aggregate the legal tasks matching ``domain`` from the rollup.
+
+        ``domain`` and ``groupby`` use ``qlk.task`` field names (``date_start``
+        may carry a granularity, e.g. ``date_start:month``); ``aggregates``
+        use the rollup ones (``hours:sum``, ``task_count:sum``). Returns the
+        ``_read_group`` tuples, or None when the caller has to read the tasks.
+        """
+        return self._read_hours("task", domain, groupby, aggregates)
+
+    @api.model
+    def read_timesheet_hours(self, domain, groupby=(), aggregates=("hours:sum",)):
+        """Same as :meth:`read_task_hours` for ``account.analytic.line`` domains."""
+        return self._read_hours("timesheet", domain, groupby, aggregates)
+
+    @api.model
+    def task_hours_total(self, domain):
+        """Return the hours of the tasks matching ``domain``, or None."""
+        rows = self.read_task_hours(domain)
+        if rows is None:
+            return None
+        return rows[0][0] or 0.0
+
+
+class QlkTaskHoursRollup(models.Model):
+    _inherit = "qlk.task"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        tasks = super().create(vals_list)
+        tasks._mark_hours_rollup_dirty()
+        return tasks
+
+    def write(self, vals):
+        if not TASK_WRITE_FIELDS.intersection(vals):
+            return super().write(vals)
+        self._mark_hours_rollup_dirty()
+        res = super().write(vals)
+        self._mark_hours_rollup_dirty()
+        return res
+
+    def unlink(self):
+        self._mark_hours_rollup_dirty()
+        return super().unlink()
+
+    def _mark_hours_rollup_dirty(self):
+        self.env["qlk.hours.daily"]._mark_dirty(
+            "task", [(task.date_start, task.employee_id.id) for task in self]
+        )
+
+    @api.model
+    def summarize_hours(self, date_from=None, date_to=None, employee_ids=None):
+        domain = [("approval_state", "=", "approved")]
+        if date_from:
+            domain.append(("date_start", ">=", date_from))
+        if date_to:
+            domain.append(("date_start", "<=", date_to))
+        if employee_ids:
+            domain.append(("employee_id", "in", employee_ids))
+        rows = self.env["qlk.hours.daily"].read_task_hours(domain, ["employee_id"])
+        if rows is None:
+            return super().summarize_hours(date_from=date_from, date_to=date_to, employee_ids=employee_ids)
+        return {employee.id: hours for employee, hours in rows if employee}
+
+
+class AccountAnalyticLineHoursRollup(models.Model):
+    _inherit = "account.analytic.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._mark_hours_rollup_dirty()
+        return lines
+
+    def write(self, vals):
+        if not TIMESHEET_WRITE_FIELDS.intersection(vals):
+            return super().write(vals)
+        self._mark_hours_rollup_dirty()
+        res = super().write(vals)
+        self._mark_hours_rollup_dirty()
+        return res
+
+    def unlink(self):
+        self._mark_hours_rollup_dirty()
+        return super().unlink()
+
+    def _mark_hours_rollup_dirty(self):
+        self.env["qlk.hours.daily"]._mark_dirty(
+            "timesheet", [(line.date, line.employee_id.id) for line in self if line.project_id]
+        )
+
+
+class ProjectTaskHoursRollup(models.Model):
+    _inherit = "project.task"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "qlk_project_id" in vals and self:
+            self.flush_model(["qlk_project_id"])
+            self._mark_hours_rollup_dirty()
+        return res
+
+    def unlink(self):
+        if self:
+            self._mark_hours_rollup_dirty()
+        return super().unlink()
+
+    def _mark_hours_rollup_dirty(self):
+        self.env["qlk.hours.daily"]._mark_project_tasks_dirty("ptask.id IN %s", [tuple(self.ids)])
+
+
+class QlkProjectHoursRollup(models.Model):
+    _inherit = "qlk.project"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "engagement_letter_id" in vals and self:
+            self.flush_model(["engagement_letter_id"])
+            self.env["qlk.hours.daily"]._mark_project_tasks_dirty("ptask.qlk_project_id IN %s", [tuple(self.ids)])
+        return res
+
+
+class HrEmployeeHoursRollup(models.Model):
+    _inherit = "hr.employee"
+
+    def _compute_task_metrics(self):
+        Rollup = self.env["qlk.hours.daily"]
+        employees = self.filtered("id")
+        if not employees:
+            return super()._compute_task_metrics()
+        employee_domain = [("employee_id", "in", employees.ids)]
+        state_rows = Rollup.read_task_hours(
+            employee_domain, ["employee_id", "approval_state"], ["hours:sum", "task_count:sum"]
+        )
+        if state_rows is None:
+            return super()._compute_task_metrics()
+
+        today = fields.Date.context_today(self)
+        month_start = today.replace(day=1)
+        week_start = today - timedelta(days=today.weekday())
+        approved_domain = employee_domain + [("approval_state", "=", "approved")]
+        month_rows = Rollup.read_task_hours(
+            approved_domain
+            + [("date_start", ">=", month_start), ("date_start", "<=", month_start + relativedelta(months=1, days=-1))],
+            ["employee_id"],
+        )
+        week_rows = Rollup.read_task_hours(
+            approved_domain
+            + [("date_start", ">=", week_start), ("date_start", "<=", week_start + timedelta(days=6))],
+            ["employee_id"],
+        )
+        totals = {(employee.id, state): (hours, count) for employee, state, hours, count in state_rows}
+        month_map = {employee.id: hours for employee, hours in month_rows}
+        week_map = {employee.id: hours for employee, hours in week_rows}
+        for employee in self:
+            employee.task_hours_total = totals.get((employee.id, "approved"), (0.0, 0))[0]
+            employee.task_hours_month = month_map.get(employee.id, 0.0)
+            employee.task_hours_week = week_map.get(employee.id, 0.0)
+            employee.task_waiting_count = totals.get((employee.id, "waiting"), (0.0, 0))[1]
+            employee.task_rejected_count = totals.get((employee.id, "rejected"), (0.0, 0))[1]
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "user_id" in vals:
+            # assigned_user_id of the tasks follows the employee's user.
+            self.env["qlk.hours.daily"]._mark_employee_dirty(self.ids)
+        return res
@@ -2,11 +2,13 @@
 from datetime import datetime, time, timedelta
 
 from odoo import _, api, fields, models
+from .perf_sample import instrument
 
 
 class QlkHrAutomation(models.AbstractModel):
     _name = "qlk.hr.automation"
     _description = "QLK HR Automation Service"
+    _QUERY_BUDGETS = {"cron_send_weekly_hours_reminder": 40}
 
     REQUIRED_HOURS_PER_DAY = 8.0
 
@@ -89,6 +91,7 @@ class QlkHrAutomation(models.AbstractModel):
     # هذا الكرون لإرسال تنبيه الساعات الأسبوعية للـ MP كل يوم أربعاء.
     # ------------------------------------------------------------------------------
     @api.model
+    @instrument()
     def cron_send_weekly_hours_reminder(self):
         today = fields.Date.context_today(self)
         # weekday(): Monday=0 ... Wednesday=2
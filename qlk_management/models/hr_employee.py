@@ -4,10 +4,19 @@ from datetime import timedelta
 
 from odoo import _, api, fields, models
 from odoo.exceptions import AccessError
+from .perf_sample import instrument
+
+
+# Changes to these fields alter dashboard employee and team scopes.
+ACCESS_CONTEXT_FIELDS = {"user_id", "parent_id", "department_id", "active", "company_id"}
+
+# qlk.code.counter scope of employee codes, keyed by code prefix.
+EMPLOYEE_CODE_COUNTER = "employee_code"
 
 
 class HREmployee(models.Model):
     _inherit = "hr.employee"
+    _QUERY_BUDGETS = {"cron_deactivate_users_after_notice": 20}
 
     EMPLOYEE_CODE_PREFIX_PARAM = "qlk_management.employee_code_prefix"
     EMPLOYEE_CODE_START_PARAM = "qlk_management.employee_code_start"
@@ -112,15 +121,28 @@ class HREmployee(models.Model):
         return int(match.group(1)) if match else 0
 
     @api.model
-    def _next_employee_code_sequence(self):
-        self.env.cr.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", ["qlk_management.employee_code"])
+    def _next_employee_code_sequence(self, count=1):
+        """Reserve ``count`` employee code sequences, return the first one."""
+        prefix = self._employee_code_prefix()
+        seed_query = """
+            SELECT MAX(split_part(substr(employee_code, length(%(prefix)s) + 2), '/', 1)::integer)
+              FROM hr_employee
+             WHERE left(employee_code, length(%(prefix)s) + 1) = %(prefix)s || '/'
+               AND substr(employee_code, length(%(prefix)s) + 2) ~ '^[0-9]{1,9}/[0-9]{4}$'
+        """
+        return self.env["qlk.code.counter"]._reserve(
+            EMPLOYEE_CODE_COUNTER,
+            prefix,
+            count=count,
+            seed=(seed_query, {"prefix": prefix}),
+            floor=self._employee_code_start() - 1,
+        )
+
+    @api.model
+    def _observe_employee_codes(self, codes):
         prefix = self._employee_code_prefix()
-        start = self._employee_code_start()
-        max_sequence = 0
-        employees = self.sudo().search([("employee_code", "!=", False)])
-        for employee in employees:
-            max_sequence = max(max_sequence, self._employee_code_sequence_from_code(employee.employee_code, prefix))
-        return max(max_sequence + 1, start)
+        sequences = [self._employee_code_sequence_from_code(code, prefix) for code in codes]
+        self.env["qlk.code.counter"]._observe(EMPLOYEE_CODE_COUNTER, prefix, max(sequences, default=0))
 
     @api.model
     def _generate_employee_code(self, vals, sequence=False):
@@ -132,7 +154,8 @@ class HREmployee(models.Model):
     @api.model_create_multi
     def create(self, vals_list):
         today = fields.Date.context_today(self)
-        next_sequence = False
+        missing_codes = sum(1 for vals in vals_list if not vals.get("employee_code"))
+        next_sequence = missing_codes and self._next_employee_code_sequence(count=missing_codes)
         for vals in vals_list:
             if (
                 vals.get("employee_code")
@@ -148,11 +171,13 @@ class HREmployee(models.Model):
                 base_date = fields.Date.to_date(vals.get("approval_date")) if vals.get("approval_date") else today
                 vals["effective_date"] = base_date + timedelta(days=15)
             if not vals.get("employee_code"):
-                if next_sequence is False:
-                    next_sequence = self._next_employee_code_sequence()
                 vals["employee_code"] = self._generate_employee_code(vals, sequence=next_sequence)
                 next_sequence += 1
-        return super().create(vals_list)
+        employees = super().create(vals_list)
+        if missing_codes < len(vals_list):
+            self._observe_employee_codes(employees.mapped("employee_code"))
+        self.env["qlk.user.access.context"]._invalidate()
+        return employees
 
     def write(self, vals):
         if (
@@ -174,30 +199,49 @@ class HREmployee(models.Model):
         elif vals.get("resignation_approved") is False:
             vals.setdefault("approval_date", False)
             vals.setdefault("effective_date", False)
-        return super().write(vals)
+        res = super().write(vals)
+        if vals.get("employee_code"):
+            self._observe_employee_codes([vals["employee_code"]])
+        if ACCESS_CONTEXT_FIELDS.intersection(vals):
+            self.env["qlk.user.access.context"]._invalidate()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["qlk.user.access.context"]._invalidate()
+        return res
 
     # ------------------------------------------------------------------------------
     # هذا المنطق لإيقاف المستخدم بعد فترة الإشعار تلقائيًا.
     # ------------------------------------------------------------------------------
     @api.model
+    @instrument()
     def cron_deactivate_users_after_notice(self):
         today = fields.Date.context_today(self)
-        expired = self.search(
+
+        def deactivate(employees):
+            for employee in employees:
+                if employee.user_id.active:
+                    employee.user_id.sudo().write({"active": False})
+                    employee.message_post(
+                        body=_("User access revoked automatically after the approved resignation notice period ended.")
+                    )
+                if not employee.user_deactivated_after_notice:
+                    employee.sudo().write({"user_deactivated_after_notice": True})
+
+        self.env["qlk.cron.cursor"]._run_batched(
+            "hr.employee.deactivate_users_after_notice",
+            self,
             [
                 ("resignation_approved", "=", True),
                 ("effective_date", "!=", False),
                 ("effective_date", "<=", today),
                 ("user_id", "!=", False),
-            ]
+            ],
+            deactivate,
+            cron_xmlid="qlk_management.ir_cron_qlk_notice_period_deactivation",
+            pass_key=str(today),
         )
-        for employee in expired:
-            if employee.user_id.active:
-                employee.user_id.sudo().write({"active": False})
-                employee.message_post(
-                    body=_("User access revoked automatically after the approved resignation notice period ended.")
-                )
-            if not employee.user_deactivated_after_notice:
-                employee.sudo().write({"user_deactivated_after_notice": True})
         return True
 
     def action_open_employee_documents(self):
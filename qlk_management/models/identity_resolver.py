@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""Partner / user / employee / device code resolution.
+
+The lookups are answered from id maps built with a few SQL queries and kept
+in the ormcache, so resolving the lawyer of a record no longer runs a
+three-way ``OR`` search on ``hr.employee``. The maps only cover active
+employees and are keyed by the ``identity_resolver`` cache generation,
+bumped whenever an employee, a user or a biometric mapping changes. They
+are shared by every user: the employees they return are narrowed to those
+the caller can read (record rules and allowed companies), unless the
+caller is superuser.
+"""
+
+from collections import namedtuple
+
+from odoo import api, models, tools
+
+IdentityMaps = namedtuple(
+    "IdentityMaps",
+    [
+        # partner id -> employee ids, best match first.
+        "partner_employees",
+        # user id -> employee ids, best match first.
+        "user_employees",
+        # (device id, device user code) -> employee id.
+        "device_code_employee",
+        # employee code field -> {code: employee ids, best match first}.
+        "code_employees",
+    ],
+)
+
+# Employee columns a device user code can match, when the field exists.
+EMPLOYEE_CODE_FIELDS = ("barcode", "employee_code", "biometric_user_code")
+DEFAULT_DEVICE_CODE_FIELDS = ("barcode", "employee_code")
+
+EMPLOYEE_IDENTITY_FIELDS = {
+    "active",
+    "name",
+    "user_id",
+    "work_contact_id",
+    "address_home_id",
+} | set(EMPLOYEE_CODE_FIELDS)
+
+CACHE_GENERATION = "identity_resolver"
+
+
+def _append(mapping, key, employee_id):
+    if key and employee_id not in mapping.get(key, ()):
+        mapping[key] = mapping.get(key, ()) + (employee_id,)
+
+
+class QlkIdentityResolver(models.AbstractModel):
+    _name = "qlk.identity.resolver"
+    _description = "Party Identity Resolver"
+
+    @api.model
+    def _get_maps(self):
+        generation = self.env["qlk.cache.generation"]._get(CACHE_GENERATION)
+        if generation is None:
+            return self._build_maps()
+        return self._cached_maps(generation)
+
+    @tools.ormcache("generation")
+    def _cached_maps(self, generation):
+        return self._build_maps()
+
+    def _build_maps(self):
+        cr = self.env.cr
+        employee_model = self.env["hr.employee"]
+        self.env["hr.employee"].flush_model()
+        self.env["res.users"].flush_model(["partner_id"])
+        self.env["qlk.biometric.user.map"].flush_model()
+
+        # address_home_id is gone since Odoo 17 but may be re-added by hr modules.
+        partner_columns = ["usr.partner_id", "emp.work_contact_id"]
+        if "address_home_id" in employee_model._fields:
+            partner_columns.append("emp.address_home_id")
+        code_columns = [
+            "emp.%s" % name if name in employee_model._fields else "NULL" for name in EMPLOYEE_CODE_FIELDS
+        ]
+        # Same order as hr.employee searches (_order = name).
+        cr.execute(
+            """
+            SELECT emp.id, emp.user_id, %s, %s
+              FROM hr_employee emp
+              LEFT JOIN res_users usr ON usr.id = emp.user_id
+             WHERE emp.active
+          ORDER BY emp.name, emp.id
+            """
+            % (", ".join(code_columns), ", ".join(partner_columns))
+        )
+        partner_employees = {}
+        user_employees = {}
+        code_employees = {name: {} for name in EMPLOYEE_CODE_FIELDS}
+        code_count = len(EMPLOYEE_CODE_FIELDS)
+        for employee_id, user_id, *columns in cr.fetchall():
+            _append(user_employees, user_id, employee_id)
+            for name, code in zip(EMPLOYEE_CODE_FIELDS, columns[:code_count]):
+                _append(code_employees[name], code, employee_id)
+            for partner_id in columns[code_count:]:
+                _append(partner_employees, partner_id, employee_id)
+
+        cr.execute(
+            """
+            SELECT map.device_id, map.device_user_code, map.employee_id
+              FROM qlk_biometric_user_map map
+             WHERE map.active
+          ORDER BY map.id
+            """
+        )
+        device_code_employee = {}
+        for device_id, code, employee_id in cr.fetchall():
+            device_code_employee.setdefault((device_id, code), employee_id)
+
+        return IdentityMaps(
+            partner_employees=partner_employees,
+            user_employees=user_employees,
+            device_code_employee=device_code_employee,
+            code_employees=code_employees,
+        )
+
+    @api.model
+    def _readable_employee_ids(self, employee_ids):
+        """Return the subset of ``employee_ids`` the current user can read."""
+        employee_ids = set(employee_ids)
+        if self.env.su or not employee_ids:
+            return employee_ids
+        return set(self.env["hr.employee"].search([("id", "in", list(employee_ids))]).ids)
+
+    @api.model
+    def employees_for_partners(self, partner_ids):
+        """Return ``{partner_id: (employee_id, ...)}``, best match first.
+
+        A partner matches through the employee's work contact, home address
+        or linked user.
+        """
+        partner_employees = self._get_maps().partner_employees
+        candidates = {
+            partner_id: partner_employees[partner_id]
+            for partner_id in partner_ids
+            if partner_id in partner_employees
+        }
+        readable = self._readable_employee_ids(
+            employee_id for employee_ids in candidates.values() for employee_id in employee_ids
+        )
+        result = {}
+        for partner_id, employee_ids in candidates.items():
+            employee_ids = tuple(employee_id for employee_id in employee_ids if employee_id in readable)
+            if employee_ids:
+                result[partner_id] = employee_ids
+        return result
+
+    @api.model
+    def employee_for_users(self, user_ids):
+        """Return ``{user_id: employee_id}``, falling back on the user's partner."""
+        maps = self._get_maps()
+        users = self.env["res.users"].sudo().browse(user_ids)
+        candidates = {
+            user.id: maps.user_employees.get(user.id, ()) + maps.partner_employees.get(user.partner_id.id, ())
+            for user in users
+        }
+        readable = self._readable_employee_ids(
+            employee_id for employee_ids in candidates.values() for employee_id in employee_ids
+        )
+        result = {}
+        for user_id, employee_ids in candidates.items():
+            employee_id = next((employee_id for employee_id in employee_ids if employee_id in readable), None)
+            if employee_id:
+                result[user_id] = employee_id
+        return result
+
+    @api.model
+    def employee_for_device_codes(self, codes, device_id=None, code_fields=DEFAULT_DEVICE_CODE_FIELDS):
+        """Return ``{code: employee_id}`` for biometric user codes.
+
+        The device's own mapping wins over the employee ``code_fields``,
+        tried in order.
+        """
+        maps = self._get_maps()
+        candidates = {}
+        for code in codes:
+            employee_ids = ()
+            if (device_id, code) in maps.device_code_employee:
+                employee_ids += (maps.device_code_employee[(device_id, code)],)
+            for name in code_fields:
+                employee_ids += maps.code_employees[name].get(code, ())
+            candidates[code] = employee_ids
+        readable = self._readable_employee_ids(
+            employee_id for employee_ids in candidates.values() for employee_id in employee_ids
+        )
+        result = {}
+        for code, employee_ids in candidates.items():
+            employee_id = next((employee_id for employee_id in employee_ids if employee_id in readable), None)
+            if employee_id:
+                result[code] = employee_id
+        return result
+
+    @api.model
+    def employee_for_partner(self, partner):
+        """Return the best employee of ``partner`` as a record (maybe empty)."""
+        employee_ids = self.employees_for_partners([partner.id]).get(partner.id, ()) if partner else ()
+        return self.env["hr.employee"].browse(employee_ids[:1])
+
+    @api.model
+    def employee_for_user(self, user):
+        employee_id = self.employee_for_users([user.id]).get(user.id) if user else False
+        return self.env["hr.employee"].browse(employee_id or [])
+
+    @api.model
+    def _invalidate(self):
+        self.env["qlk.cache.generation"]._bump(CACHE_GENERATION)
+
+
+class HrEmployeeIdentity(models.Model):
+    _inherit = "hr.employee"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        employees = super().create(vals_list)
+        self.env["qlk.identity.resolver"]._invalidate()
+        return employees
+
+    def write(self, vals):
+        res = super().write(vals)
+        if EMPLOYEE_IDENTITY_FIELDS.intersection(vals):
+            self.env["qlk.identity.resolver"]._invalidate()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["qlk.identity.resolver"]._invalidate()
+        return res
+
+
+class ResUsersIdentity(models.Model):
+    _inherit = "res.users"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "partner_id" in vals:
+            self.env["qlk.identity.resolver"]._invalidate()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["qlk.identity.resolver"]._invalidate()
+        return res
+
+
+class QlkBiometricUserMapIdentity(models.Model):
+    _inherit = "qlk.biometric.user.map"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        mappings = super().create(vals_list)
+        self.env["qlk.identity.resolver"]._invalidate()
+        return mappings
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env["qlk.identity.resolver"]._invalidate()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["qlk.identity.resolver"]._invalidate()
+        return res
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""Dangling many2one references in QLK tables.
+
+Every stored many2one column of a ``qlk.*`` / ``bd.*`` model without a
+foreign key is checked with a ``LEFT JOIN ... WHERE target.id IS NULL``
+anti-join. Findings are logged in ``qlk.integrity.issue``. In fix mode the
+references are cleared with batched SQL updates, so no recompute or
+tracking is triggered per row; dependent stored fields are left as they
+are.
+"""
+
+import logging
+import time
+
+from odoo import api, fields, models
+from .perf_sample import instrument
+
+_logger = logging.getLogger(__name__)
+
+AUTOFIX_PARAM = "qlk_management.integrity_autofix"
+POSITION_PARAM = "qlk_management.integrity_scan_position"
+SCANNED_PREFIXES = ("qlk.", "bd.")
+FIX_BATCH_SIZE = 1000
+
+
+class QlkIntegrityIssue(models.Model):
+    _name = "qlk.integrity.issue"
+    _description = "Dangling Reference"
+    _order = "detected_on desc, id desc"
+    _log_access = False
+
+    model_name = fields.Char(string="Model", required=True, readonly=True, index=True)
+    field_name = fields.Char(string="Field", required=True, readonly=True)
+    comodel_name = fields.Char(string="Target Model", readonly=True)
+    record_id = fields.Integer(string="Record ID", required=True, readonly=True)
+    reference_id = fields.Integer(string="Missing ID", readonly=True)
+    state = fields.Selection(
+        [("found", "Found"), ("fixed", "Cleared"), ("unfixable", "Required Field")],
+        required=True,
+        readonly=True,
+        default="found",
+    )
+    detected_on = fields.Datetime(readonly=True)
+    fixed_on = fields.Datetime(readonly=True)
+
+    _sql_constraints = [
+        (
+            "record_field_unique",
+            "UNIQUE(model_name, field_name, record_id)",
+            "The dangling reference is already logged.",
+        ),
+    ]
+
+
+class QlkIntegrityScanner(models.AbstractModel):
+    _name = "qlk.integrity.scanner"
+    _description = "Dangling Reference Scanner"
+
+    @api.model
+    def _foreign_key_columns(self):
+        self.env.cr.execute(
+            """
+            SELECT cls.relname, att.attname
+              FROM pg_constraint con
+              JOIN pg_class cls ON cls.oid = con.conrelid
+              JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = con.conkey[1]
+             WHERE con.contype = 'f'
+               AND array_length(con.conkey, 1) = 1
+            """
+        )
+        return set(self.env.cr.fetchall())
+
+    @api.model
+    def _get_checks(self, model_names=None):
+        """Return the sorted ``(model, field)`` pairs that can hold dangling ids."""
+        foreign_keys = self._foreign_key_columns()
+        checks = []
+        for model_name in sorted(model_names or self.env.registry):
+            model = self.env[model_name]
+            if model._abstract or not model._auto or not model_name.startswith(SCANNED_PREFIXES):
+                continue
+            for field_name, field in sorted(model._fields.items()):
+                if field.type != "many2one" or not field.store or not field.column_type:
+                    continue
+                comodel = self.env[field.comodel_name]
+                if not comodel._auto or (model._table, field_name) in foreign_keys:
+                    continue
+                checks.append((model_name, field_name))
+        return checks
+
+    @api.model
+    def _dangling_query(self, model, field_name):
+        field = model._fields[field_name]
+        return """
+            SELECT src.id, src.%(column)s AS reference_id
+              FROM %(table)s src
+              LEFT JOIN %(target)s target ON target.id = src.%(column)s
+             WHERE src.%(column)s IS NOT NULL
+               AND target.id IS NULL
+        """ % {
+            "column": field_name,
+            "table": model._table,
+            "target": self.env[field.comodel_name]._table,
+        }
+
+    @api.model
+    def _log_dangling(self, model, field_name):
+        """Log the dangling references of one column, return how many exist."""
+        field = model._fields[field_name]
+        # Drop findings that were repaired or deleted since the last scan.
+        self.env.cr.execute(
+            "DELETE FROM qlk_integrity_issue WHERE model_name = %s AND field_name = %s AND state != 'fixed'",
+            [model._name, field_name],
+        )
+        self.env.cr.execute(
+            """
+            WITH dangling AS (%(query)s)
+            INSERT INTO qlk_integrity_issue
+                   (model_name, field_name, comodel_name, record_id, reference_id, state, detected_on)
+            SELECT %%(model)s, %%(field)s, %%(comodel)s, dangling.id, dangling.reference_id,
+                   %%(state)s, now() AT TIME ZONE 'UTC'
+              FROM dangling
+            ON CONFLICT (model_name, field_name, record_id) DO UPDATE
+               SET reference_id = EXCLUDED.reference_id,
+                   state = EXCLUDED.state,
+                   detected_on = EXCLUDED.detected_on
+            """
+            % {"query": self._dangling_query(model, field_name)},
+            {
+                "model": model._name,
+                "field": field_name,
+                "comodel": field.comodel_name,
+                "state": "unfixable" if field.required else "found",
+            },
+        )
+        return self.env.cr.rowcount
+
+    @api.model
+    def _fix_dangling_batch(self, model, field_name, limit=FIX_BATCH_SIZE):
+        """Clear up to ``limit`` dangling references and log them as fixed."""
+        field = model._fields[field_name]
+        self.env.cr.execute(
+            """
+            WITH dangling AS (%(query)s ORDER BY src.id LIMIT %(limit)s FOR UPDATE OF src),
+                 cleared AS (
+                     UPDATE %(table)s fixed_row
+                        SET %(column)s = NULL
+                       FROM dangling
+                      WHERE fixed_row.id = dangling.id
+                  RETURNING fixed_row.id, dangling.reference_id
+                 )
+            INSERT INTO qlk_integrity_issue
+                   (model_name, field_name, comodel_name, record_id, reference_id, state, detected_on, fixed_on)
+            SELECT %%(model)s, %%(field)s, %%(comodel)s, cleared.id, cleared.reference_id,
+                   'fixed', now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC'
+              FROM cleared
+            ON CONFLICT (model_name, field_name, record_id) DO UPDATE
+               SET reference_id = EXCLUDED.reference_id,
+                   state = 'fixed',
+                   fixed_on = EXCLUDED.fixed_on
+            """
+            % {
+                "query": self._dangling_query(model, field_name),
+                "limit": int(limit),
+                "table": model._table,
+                "column": field_name,
+            },
+            {"model": model._name, "field": field_name, "comodel": field.comodel_name},
+        )
+        count = self.env.cr.rowcount
+        if count:
+            model.invalidate_model([field_name])
+        return count
+
+    @api.model
+    def scan(self, fix=False, model_names=None, deadline=None):
+        """Scan the QLK models and return ``{(model, field): count}``.
+
+        With ``fix`` the references of optional fields are cleared batch by
+        batch; references held by required fields are only reported. With a
+        ``deadline`` (background run) each batch is committed and the scan
+        resumes after the last completed column on the next run.
+        """
+        params = self.env["ir.config_parameter"].sudo()
+        checks = self._get_checks(model_names)
+        position = params.get_param(POSITION_PARAM) if not model_names else False
+        keys = ["%s.%s" % check for check in checks]
+        if position in keys:
+            checks = checks[keys.index(position) + 1:]
+        report = {}
+        last_done = False
+        for model_name, field_name in checks:
+            model = self.env[model_name].sudo()
+            done = True
+            if fix and not model._fields[field_name].required:
+                count = 0
+                while True:
+                    batch = self._fix_dangling_batch(model, field_name)
+                    count += batch
+                    if deadline:
+                        # Background run: keep each batch short-lived.
+                        self.env["qlk.cron.cursor"]._commit_chunk()
+                    if batch < FIX_BATCH_SIZE:
+                        break
+                    if deadline and time.monotonic() >= deadline:
+                        done = False
+                        break
+            else:
+                count = self._log_dangling(model, field_name)
+            if count:
+                report[(model_name, field_name)] = count
+                _logger.info("Dangling references in %s.%s: %s", model_name, field_name, count)
+            if done:
+                last_done = "%s.%s" % (model_name, field_name)
+            if deadline and time.monotonic() >= deadline:
+                if not model_names:
+                    params.set_param(POSITION_PARAM, last_done or position or False)
+                return report
+        if not model_names:
+            params.set_param(POSITION_PARAM, False)
+        return report
+
+    @api.model
+    @instrument()
+    def cron_scan_dangling_references(self, max_seconds=600):
+        autofix = self.env["ir.config_parameter"].sudo().get_param(AUTOFIX_PARAM, "False") == "True"
+        self.scan(fix=autofix, deadline=time.monotonic() + max_seconds)
+        return True
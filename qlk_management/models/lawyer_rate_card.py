@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Effective-dated lawyer hour rates.
+
+Rates are looked up from a card loaded once per process and kept in the
+ormcache (``{employee: periods}``), so pricing a whole document is a set of
+dictionary lookups. The card is keyed by the ``lawyer_rate_card`` cache
+generation, bumped by any change to a rate. A rate without a company applies
+to every company.
+"""
+
+from odoo import _, api, fields, models, tools
+from odoo.exceptions import ValidationError
+
+CACHE_GENERATION = "lawyer_rate_card"
+
+
+class QlkLawyerRate(models.Model):
+    _name = "qlk.lawyer.rate"
+    _description = "Lawyer Rate Card"
+    _order = "employee_id, date_from desc"
+    _rec_name = "employee_id"
+
+    employee_id = fields.Many2one("hr.employee", string="Lawyer", required=True, index=True, ondelete="cascade")
+    date_from = fields.Date(string="Valid From", required=True, default=fields.Date.context_today)
+    date_to = fields.Date(string="Valid To", help="Leave empty while the rate is current.")
+    cost_per_hour_base = fields.Float(string="Base Cost Per Hour", required=True)
+    profit_ratio = fields.Float(string="Profit Ratio", required=True, default=1.0)
+    cost_per_hour = fields.Float(string="Cost Per Hour", compute="_compute_cost_per_hour", store=True)
+    company_id = fields.Many2one("res.company", string="Company", default=lambda self: self.env.company)
+
+    _sql_constraints = [
+        (
+            "date_range_check",
+            "CHECK(date_to IS NULL OR date_to >= date_from)",
+            "The end of a rate period cannot be before its start.",
+        ),
+    ]
+
+    @api.depends("cost_per_hour_base", "profit_ratio")
+    def _compute_cost_per_hour(self):
+        for rate in self:
+            rate.cost_per_hour = (rate.cost_per_hour_base or 0.0) * (rate.profit_ratio or 0.0)
+
+    @api.constrains("employee_id", "date_from", "date_to", "company_id")
+    def _check_overlap(self):
+        for rate in self:
+            domain = [
+                ("id", "!=", rate.id),
+                ("employee_id", "=", rate.employee_id.id),
+                "|",
+                ("date_to", "=", False),
+                ("date_to", ">=", rate.date_from),
+            ]
+            if rate.company_id:
+                domain.append(("company_id", "in", [rate.company_id.id, False]))
+            if rate.date_to:
+                domain.append(("date_from", "<=", rate.date_to))
+            if self.search_count(domain, limit=1):
+                raise ValidationError(
+                    _("%s already has a rate for part of this period.") % rate.employee_id.display_name
+                )
+
+    @api.model
+    def _get_rate_card(self):
+        generation = self.env["qlk.cache.generation"]._get(CACHE_GENERATION)
+        if generation is None:
+            return self._build_rate_card()
+        return self._cached_rate_card(generation)
+
+    @tools.ormcache("generation")
+    def _cached_rate_card(self, generation):
+        return self._build_rate_card()
+
+    def _build_rate_card(self):
+        self.flush_model(["employee_id", "date_from", "date_to", "cost_per_hour", "company_id"])
+        self.env.cr.execute(
+            """
+            SELECT employee_id, date_from, date_to, cost_per_hour, company_id
+              FROM qlk_lawyer_rate
+          ORDER BY employee_id, date_from DESC
+            """
+        )
+        card = {}
+        for employee_id, date_from, date_to, cost_per_hour, company_id in self.env.cr.fetchall():
+            card[employee_id] = card.get(employee_id, ()) + ((date_from, date_to, cost_per_hour, company_id),)
+        return card
+
+    @api.model
+    def _rates_for(self, employee_ids, date=None, company=None):
+        """Return ``{employee_id: cost_per_hour}`` for the rates valid at ``date``.
+
+        Only rates of ``company`` (the current company by default) or without
+        a company are considered. Employees without a rate for that day are
+        left out, so callers can fall back on the legacy cost records.
+        """
+        date = fields.Date.to_date(date) or fields.Date.context_today(self)
+        company_id = (company or self.env.company).id
+        card = self._get_rate_card()
+        rates = {}
+        for employee_id in employee_ids:
+            for date_from, date_to, cost_per_hour, rate_company_id in card.get(employee_id, ()):
+                if rate_company_id not in (company_id, None):
+                    continue
+                if date_from <= date and (not date_to or date <= date_to):
+                    rates[employee_id] = cost_per_hour
+                    break
+        return rates
+
+    def _invalidate(self):
+        self.env["qlk.cache.generation"]._bump(CACHE_GENERATION)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        rates = super().create(vals_list)
+        self._invalidate()
+        return rates
+
+    def write(self, vals):
+        res = super().write(vals)
+        self._invalidate()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._invalidate()
+        return res
@@ -4,6 +4,8 @@ import re
 from odoo import _, api, models
 from odoo.exceptions import ValidationError
 
+from .schema_state import add_columns, chunked_update, run_init_step
+
 
 LEGAL_SERVICE_PREFIXES = {
     "litigation": "L",
@@ -25,6 +27,69 @@ CLIENT_SEQUENCE_CODES = {
     "arbitration": "qlk.client.file.arbitration",
 }
 
+# Legal code columns shared by litigation, corporate and arbitration records.
+LEGAL_RECORD_CODE_COLUMNS = [
+    ("service_category", "varchar"),
+    ("client_legal_code", "varchar"),
+    ("project_legal_code", "varchar"),
+    ("record_sequence", "integer DEFAULT 0"),
+    ("record_code", "varchar"),
+]
+
+# (column, definition, backfill value for NULL rows)
+CLIENT_FILE_PROFILE_COLUMNS = [
+    ("litigation_client_code", "varchar", None),
+    ("corporate_client_code", "varchar", None),
+    ("arbitration_client_code", "varchar", None),
+    ("litigation_code_locked", "boolean DEFAULT false", "false"),
+    ("corporate_code_locked", "boolean DEFAULT false", "false"),
+    ("arbitration_code_locked", "boolean DEFAULT false", "false"),
+    ("service_profile_type", "varchar", "'litigation'"),
+    ("client_profile_code", "varchar", None),
+    ("litigation_client_sequence", "integer DEFAULT 0", "0"),
+    ("corporate_client_sequence", "integer DEFAULT 0", "0"),
+    ("arbitration_client_sequence", "integer DEFAULT 0", "0"),
+    ("litigation_project_next_number", "integer DEFAULT 1", "1"),
+    ("corporate_project_next_number", "integer DEFAULT 1", "1"),
+    ("arbitration_project_next_number", "integer DEFAULT 1", "1"),
+    ("poa_required", "boolean DEFAULT true", "true"),
+    ("poa_status", "varchar", "'draft'"),
+    ("poa_request_date", "date", None),
+    ("poa_received_date", "date", None),
+    ("poa_expiry_date", "date", None),
+    ("poa_notes", "text", None),
+    ("poa_uploaded_by", "integer", None),
+    ("poa_verified_by", "integer", None),
+    ("poa_last_alert_date", "date", None),
+    ("contract_type", "varchar", None),
+    ("billing_type", "varchar", None),
+    ("start_date", "date", None),
+    ("end_date", "date", None),
+    ("contact_details", "text", None),
+    ("scope_of_work", "text", None),
+    ("notes", "text", None),
+    ("planned_hours", "double precision DEFAULT 0", "0"),
+    ("consumed_hours", "double precision DEFAULT 0", "0"),
+    ("remaining_hours", "double precision DEFAULT 0", "0"),
+    ("hours_state", "varchar", None),
+    ("litigation_next_number", "integer DEFAULT 1", "1"),
+    ("pre_litigation_next_number", "integer DEFAULT 1", "1"),
+    ("arbitration_next_number", "integer DEFAULT 1", "1"),
+    ("corporate_next_number", "integer DEFAULT 1", "1"),
+]
+
+
+def _init_client_file_profile_columns(env):
+    cr = env.cr
+    add_columns(cr, "qlk_client_file", [(name, definition) for name, definition, _value in CLIENT_FILE_PROFILE_COLUMNS])
+    backfill = [(name, value) for name, _definition, value in CLIENT_FILE_PROFILE_COLUMNS if value is not None]
+    return chunked_update(
+        cr,
+        "qlk_client_file",
+        ", ".join("%s = COALESCE(%s, %s)" % (name, name, value) for name, value in backfill),
+        " OR ".join("%s IS NULL" % name for name, _value in backfill),
+    )
+
 
 class QlkLegalNumberingEngine(models.AbstractModel):
     _name = "qlk.legal.numbering.engine"
@@ -36,67 +101,13 @@ class QlkLegalNumberingEngine(models.AbstractModel):
         cr.execute("SELECT to_regclass('qlk_client_file')")
         if not cr.fetchone()[0]:
             return False
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS litigation_client_code varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS corporate_client_code varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS arbitration_client_code varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS litigation_code_locked boolean DEFAULT false")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS corporate_code_locked boolean DEFAULT false")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS arbitration_code_locked boolean DEFAULT false")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS service_profile_type varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS client_profile_code varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS litigation_client_sequence integer DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS corporate_client_sequence integer DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS arbitration_client_sequence integer DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS litigation_project_next_number integer DEFAULT 1")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS corporate_project_next_number integer DEFAULT 1")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS arbitration_project_next_number integer DEFAULT 1")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_required boolean DEFAULT true")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_status varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_request_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_received_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_expiry_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_notes text")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_uploaded_by integer")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_verified_by integer")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS poa_last_alert_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS contract_type varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS billing_type varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS start_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS end_date date")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS contact_details text")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS scope_of_work text")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS notes text")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS planned_hours double precision DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS consumed_hours double precision DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS remaining_hours double precision DEFAULT 0")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS hours_state varchar")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS litigation_next_number integer DEFAULT 1")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS pre_litigation_next_number integer DEFAULT 1")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS arbitration_next_number integer DEFAULT 1")
-        cr.execute("ALTER TABLE qlk_client_file ADD COLUMN IF NOT EXISTS corporate_next_number integer DEFAULT 1")
-        cr.execute(
-            """
-            UPDATE qlk_client_file
-               SET litigation_client_sequence = COALESCE(litigation_client_sequence, 0),
-                   corporate_client_sequence = COALESCE(corporate_client_sequence, 0),
-                   arbitration_client_sequence = COALESCE(arbitration_client_sequence, 0),
-                   litigation_code_locked = COALESCE(litigation_code_locked, false),
-                   corporate_code_locked = COALESCE(corporate_code_locked, false),
-                   arbitration_code_locked = COALESCE(arbitration_code_locked, false),
-                   litigation_project_next_number = COALESCE(litigation_project_next_number, 1),
-                   corporate_project_next_number = COALESCE(corporate_project_next_number, 1),
-                   arbitration_project_next_number = COALESCE(arbitration_project_next_number, 1),
-                   poa_required = COALESCE(poa_required, true),
-                   poa_status = COALESCE(poa_status, 'draft'),
-                   planned_hours = COALESCE(planned_hours, 0),
-                   consumed_hours = COALESCE(consumed_hours, 0),
-                   remaining_hours = COALESCE(remaining_hours, 0),
-                   litigation_next_number = COALESCE(litigation_next_number, 1),
-                   pre_litigation_next_number = COALESCE(pre_litigation_next_number, 1),
-                   arbitration_next_number = COALESCE(arbitration_next_number, 1),
-                   corporate_next_number = COALESCE(corporate_next_number, 1),
-                   service_profile_type = COALESCE(service_profile_type, 'litigation')
-            """
+        run_init_step(
+            self.env,
+            "qlk_client_file.profile_columns",
+            "1",
+            _init_client_file_profile_columns,
+            tables=["qlk_client_file"],
+            data=CLIENT_FILE_PROFILE_COLUMNS,
         )
         return True
 
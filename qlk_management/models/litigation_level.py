@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from odoo import fields, models
 
+from .schema_state import chunked_update, run_init_step
+
 
 LITIGATION_STAGE_CODE_SELECTION = [
     ("F", "First Instance"),
@@ -10,6 +12,20 @@ LITIGATION_STAGE_CODE_SELECTION = [
 ]
 
 
+def _init_litigation_level_codes(env):
+    level_codes = {
+        "qlk_management.litigation_level_first_instance": "F",
+        "qlk_management.litigation_level_appeal": "A",
+        "qlk_management.litigation_level_cassation": "C",
+        "qlk_management.litigation_level_enforcement": "E",
+    }
+    for xml_id, code in level_codes.items():
+        level = env.ref(xml_id, raise_if_not_found=False)
+        if level:
+            level.code = code
+    env["litigation.level"].search([("code", "=", False)]).write({"code": "F"})
+
+
 class LitigationLevel(models.Model):
     _name = "litigation.level"
     _description = "Litigation Level"
@@ -31,17 +47,7 @@ class LitigationLevel(models.Model):
         self.env.cr.execute("SELECT to_regclass('litigation_level')")
         if not self.env.cr.fetchone()[0]:
             return
-        level_codes = {
-            "qlk_management.litigation_level_first_instance": "F",
-            "qlk_management.litigation_level_appeal": "A",
-            "qlk_management.litigation_level_cassation": "C",
-            "qlk_management.litigation_level_enforcement": "E",
-        }
-        for xml_id, code in level_codes.items():
-            level = self.env.ref(xml_id, raise_if_not_found=False)
-            if level:
-                level.code = code
-        self.search([("code", "=", False)]).write({"code": "F"})
+        run_init_step(self.env, "litigation_level.codes", "1", _init_litigation_level_codes, tables=["litigation_level"])
 
 
 class QlkLitigationDegree(models.Model):
@@ -70,10 +76,10 @@ class QlkLitigationDegree(models.Model):
         self.env.cr.execute("SELECT to_regclass('qlk_litigation_degree')")
         if not self.env.cr.fetchone()[0]:
             return
-        self.env.cr.execute(
-            """
-            UPDATE qlk_litigation_degree
-               SET code = 'C'
-             WHERE code = 'CA'
-            """
+        run_init_step(
+            self.env,
+            "qlk_litigation_degree.codes",
+            "1",
+            lambda env: chunked_update(env.cr, "qlk_litigation_degree", "code = 'C'", "code = 'CA'"),
+            tables=["qlk_litigation_degree"],
         )
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Sampled timing of QLK hot paths.
+
+Methods decorated with :func:`instrument` (or blocks wrapped in
+:func:`perf_section`) record wall time, SQL count and SQL time into an
+in-process ring buffer when ``qlk_management.perf_sample_rate`` is above 0.
+The buffer is flushed to ``qlk.perf.sample`` from a separate cursor, so
+sampling never adds writes to the caller's transaction. With sampling off
+the cost per call is one cached dictionary lookup.
+"""
+
+import functools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+SAMPLE_RATE_PARAM = "qlk_management.perf_sample_rate"
+BUFFER_SIZE = 5000
+FLUSH_SIZE = 200
+FLUSH_INTERVAL = 60
+RATE_CACHE_SECONDS = 30
+SAMPLE_RETENTION_DAYS = 14
+
+_buffer = deque(maxlen=BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+_last_flush = {"time": time.monotonic()}
+# {dbname: (expires_at, rate)}
+_rate_cache = {}
+
+
+def _sample_rate(env):
+    dbname = env.cr.dbname
+    cached = _rate_cache.get(dbname)
+    now = time.monotonic()
+    if cached and cached[0] > now:
+        return cached[1]
+    try:
+        rate = float(env["ir.config_parameter"].sudo().get_param(SAMPLE_RATE_PARAM, "0") or 0)
+    except ValueError:
+        rate = 0.0
+    _rate_cache[dbname] = (now + RATE_CACHE_SECONDS, rate)
+    return rate
+
+
+def _is_sampled(env):
+    rate = _sample_rate(env)
+    return rate > 0 and (rate >= 1 or random.random() < rate)
+
+
+@contextmanager
+def _measure(env, name):
+    thread = threading.current_thread()
+    if not hasattr(thread, "query_time"):
+        # Let the cursor accumulate SQL time for this thread.
+        thread.query_count = 0
+        thread.query_time = 0
+    cr = env.cr
+    count_before = cr.sql_log_count
+    sql_time_before = thread.query_time or 0
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample = (
+            cr.dbname,
+            name,
+            (time.perf_counter() - started) * 1000,
+            cr.sql_log_count - count_before,
+            ((thread.query_time or 0) - sql_time_before) * 1000,
+            fields.Datetime.now(),
+        )
+        with _buffer_lock:
+            _buffer.append(sample)
+            flush_due = (
+                len(_buffer) >= FLUSH_SIZE
+                or time.monotonic() - _last_flush["time"] >= FLUSH_INTERVAL
+            )
+        if flush_due and not getattr(thread, "testing", False):
+            env["qlk.perf.sample"]._flush_buffer()
+
+
+@contextmanager
+def perf_section(env, name):
+    """Record one sample for the wrapped block, e.g. a cron step."""
+    if not _is_sampled(env):
+        yield
+        return
+    with _measure(env, name):
+        yield
+
+
+def instrument(name=None):
+    """Decorator recording a sample per call of a model method.
+
+    The entry point defaults to ``<model>.<method>``. Put it below the
+    ``api`` decorators so they keep wrapping the public method.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not _is_sampled(self.env):
+                return method(self, *args, **kwargs)
+            with _measure(self.env, name or "%s.%s" % (self._name, method.__name__)):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class QlkPerfSample(models.Model):
+    _name = "qlk.perf.sample"
+    _description = "Performance Sample"
+    _order = "sample_date desc, id desc"
+    _log_access = False
+
+    name = fields.Char(string="Entry Point", required=True, readonly=True)
+    sample_date = fields.Datetime(required=True, readonly=True, index=True)
+    wall_time = fields.Float(string="Wall Time (ms)", readonly=True, aggregator="avg")
+    sql_count = fields.Integer(string="SQL Queries", readonly=True, aggregator="avg")
+    sql_time = fields.Float(string="SQL Time (ms)", readonly=True, aggregator="avg")
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS qlk_perf_sample_name_date_idx
+                ON qlk_perf_sample (name, sample_date)
+            """
+        )
+
+    @api.model
+    def _flush_buffer(self):
+        """Move buffered samples of this database to the table."""
+        dbname = self.env.cr.dbname
+        with _buffer_lock:
+            samples = [sample for sample in _buffer if sample[0] == dbname]
+            others = [sample for sample in _buffer if sample[0] != dbname]
+            _buffer.clear()
+            _buffer.extend(others)
+            _last_flush["time"] = time.monotonic()
+        if not samples:
+            return 0
+        try:
+            with self.env.registry.cursor() as cr:
+                cr.execute(
+                    "INSERT INTO qlk_perf_sample (name, wall_time, sql_count, sql_time, sample_date) VALUES "
+                    + ", ".join(["(%s, %s, %s, %s, %s)"] * len(samples)),
+                    [value for sample in samples for value in sample[1:]],
+                )
+        except Exception:
+            _logger.warning("Could not flush %s performance samples", len(samples), exc_info=True)
+            return 0
+        return len(samples)
+
+    @api.autovacuum
+    def _gc_old_samples(self):
+        cutoff = fields.Datetime.now() - relativedelta(days=SAMPLE_RETENTION_DAYS)
+        self.env.cr.execute("DELETE FROM qlk_perf_sample WHERE sample_date < %s", [cutoff])
+
+    @api.model
+    def get_stats(self, hours=24):
+        """Return p50/p95 wall time and SQL figures per entry point."""
+        if not self.env.user.has_group("base.group_system"):
+            return []
+        self._flush_buffer()
+        since = fields.Datetime.now() - relativedelta(hours=hours)
+        self.env.cr.execute(
+            """
+            SELECT name,
+                   COUNT(*),
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY wall_time),
+                   percentile_cont(0.95) WITHIN GROUP (ORDER BY wall_time),
+                   MAX(wall_time),
+                   AVG(sql_count),
+                   percentile_cont(0.95) WITHIN GROUP (ORDER BY sql_count),
+                   AVG(sql_time)
+              FROM qlk_perf_sample
+             WHERE sample_date >= %s
+          GROUP BY name
+          ORDER BY 4 DESC
+            """,
+            [since],
+        )
+        return [
+            {
+                "name": name,
+                "calls": calls,
+                "p50_ms": round(p50 or 0, 1),
+                "p95_ms": round(p95 or 0, 1),
+                "max_ms": round(max_ms or 0, 1),
+                "avg_sql_count": round(avg_sql or 0, 1),
+                "p95_sql_count": round(p95_sql or 0, 1),
+                "avg_sql_ms": round(sql_ms or 0, 1),
+            }
+            for name, calls, p50, p95, max_ms, avg_sql, p95_sql, sql_ms in self.env.cr.fetchall()
+        ]
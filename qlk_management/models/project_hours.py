@@ -6,6 +6,8 @@ from dateutil.relativedelta import relativedelta
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
 from odoo.tools.float_utils import float_is_zero
+from .data_retention import retention_unlink_allowed
+from .perf_sample import instrument
 
 
 HOUR_TRACKED_FIELDS = ("planned_hours", "consumed_hours", "approved_hours")
@@ -64,8 +66,82 @@ class QlkProjectHourTracking(models.Model):
 
     def unlink(self):
         """Prevent deletion of the immutable tracking history."""
+        if retention_unlink_allowed(self):
+            return super().unlink()
         raise UserError(_("Project hour tracking entries cannot be deleted."))
 
+    @api.model
+    def _qlk_retention_rollup(self, policy, cutoff, limit):
+        """Fold old entries into monthly summaries and move them to cold storage."""
+        self.env.cr.execute(
+            """
+            SELECT id FROM qlk_project_hour_tracking
+             WHERE changed_on < %s
+          ORDER BY id
+             LIMIT %s
+            """,
+            [cutoff, limit],
+        )
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        if not ids:
+            return 0
+        self.env.cr.execute(
+            """
+            INSERT INTO qlk_project_hour_tracking_summary
+                   (project_id, month, field_name, source, entry_count, total_difference)
+            SELECT project_id, date_trunc('month', changed_on)::date, field_name, source,
+                   count(*), sum(difference)
+              FROM qlk_project_hour_tracking
+             WHERE id IN %s
+          GROUP BY project_id, date_trunc('month', changed_on)::date, field_name, source
+            ON CONFLICT (project_id, month, field_name, source) DO UPDATE
+               SET entry_count = qlk_project_hour_tracking_summary.entry_count + EXCLUDED.entry_count,
+                   total_difference = qlk_project_hour_tracking_summary.total_difference
+                                      + EXCLUDED.total_difference
+            """,
+            [tuple(ids)],
+        )
+        self.env["qlk.project.hour.tracking.summary"].invalidate_model()
+        return self.env["qlk.retention.policy"]._archive_rows(self, ids, "changed_on")
+
+
+class QlkProjectHourTrackingSummary(models.Model):
+    """Monthly rollup of hour tracking entries moved out by retention."""
+
+    _name = "qlk.project.hour.tracking.summary"
+    _description = "Project Hour Tracking Monthly Summary"
+    _order = "month desc, id desc"
+    _log_access = False
+
+    project_id = fields.Many2one(
+        "qlk.project",
+        required=True,
+        ondelete="cascade",
+        index=True,
+        readonly=True,
+    )
+    month = fields.Date(required=True, readonly=True)
+    field_name = fields.Selection(
+        [
+            ("planned_hours", "Planned Hours"),
+            ("consumed_hours", "Consumed Hours"),
+            ("approved_hours", "Approved Hours"),
+        ],
+        required=True,
+        readonly=True,
+    )
+    source = fields.Selection(HOUR_SOURCE_SELECTION, required=True, readonly=True)
+    entry_count = fields.Integer(string="Changes", readonly=True)
+    total_difference = fields.Float(string="Net Difference", readonly=True)
+
+    _sql_constraints = [
+        (
+            "project_month_field_source_unique",
+            "unique(project_id, month, field_name, source)",
+            "Only one summary row per project, month, field and source is allowed.",
+        ),
+    ]
+
 
 class QlkProjectHourAudit(models.Model):
     """Store the mandatory reason attached to manual consumed-hour changes."""
@@ -105,8 +181,25 @@ class QlkProjectHourAudit(models.Model):
 
     def unlink(self):
         """Prevent deletion of manual adjustment evidence."""
+        if retention_unlink_allowed(self):
+            return super().unlink()
         raise UserError(_("Manual hour audit entries cannot be deleted."))
 
+    @api.model
+    def _qlk_retention_cold_storage(self, policy, cutoff, limit):
+        """Move old evidence rows to cold storage; they stay readable there."""
+        self.env.cr.execute(
+            """
+            SELECT id FROM qlk_project_hour_audit
+             WHERE changed_on < %s
+          ORDER BY id
+             LIMIT %s
+            """,
+            [cutoff, limit],
+        )
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        return self.env["qlk.retention.policy"]._archive_rows(self, ids, "changed_on")
+
 
 class QlkProjectHours(models.Model):
     """Provide the authoritative hour ledger for legal projects."""
@@ -163,6 +256,7 @@ class QlkProjectHours(models.Model):
         "engagement_letter_id.allocated_hours",
         "engagement_letter_id.estimated_hours",
     )
+    @instrument()
     def _compute_agreement_hours(self):
         """Resolve agreement hours without overwriting manual project planning."""
         for project in self:
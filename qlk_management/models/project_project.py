@@ -46,6 +46,9 @@ LEGAL_SERVICE_CODE_PREFIX = {
     "pre_litigation": "P",
 }
 
+# qlk.code.counter scope of project codes, keyed by client id.
+PROJECT_CODE_COUNTER = "project_code"
+
 LEGAL_MANAGER_GROUPS = (
     "qlk_management.group_bd_manager",
     "qlk_management.group_el_manager",
@@ -277,7 +280,6 @@ class ProjectProject(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        sequence_cache = {}
         for vals in vals_list:
             engagement = vals.get("engagement_letter_id") and self.env["bd.engagement.letter"].browse(vals["engagement_letter_id"])
             if vals.get("engagement_letter_id") or vals.get("service_type"):
@@ -299,7 +301,7 @@ class ProjectProject(models.Model):
                 vals.setdefault("client_code", client._get_client_code())
             if client and (not vals.get("code") or vals.get("code") == "/"):
                 client_code = vals.get("client_code") or client._get_client_code()
-                vals["code"] = self._generate_project_code(client.id, client_code, sequence_cache)
+                vals["code"] = self._generate_project_code(client.id, client_code)
             if client and vals.get("service_type") and not vals.get("service_code"):
                 client_code = vals.get("client_code") or client._get_client_code()
                 vals["service_code"] = self._build_service_code(client_code, vals["service_type"])
@@ -311,25 +313,16 @@ class ProjectProject(models.Model):
         # projects._check_hours_logged()
         return projects
 
-    def _generate_project_code(self, partner_id, client_code, sequence_cache):
-        prefix = f"{client_code or '00/000'}/PRJ"
-        cache_value = sequence_cache.get(partner_id)
-        if cache_value is None:
-            last_project = (
-                self.with_context(active_test=False)
-                .search([("client_id", "=", partner_id), ("code", "like", f"{prefix}%")], order="code desc", limit=1)
-            )
-            last_number = 0
-            if last_project and last_project.code:
-                try:
-                    last_number = int(last_project.code.split("PRJ")[-1])
-                except (ValueError, IndexError):
-                    last_number = 0
-        else:
-            last_number = cache_value
-        next_number = (last_number or 0) + 1
-        sequence_cache[partner_id] = next_number
-        return f"{prefix}{next_number:03d}"
+    def _generate_project_code(self, partner_id, client_code):
+        seed_query = """
+            SELECT MAX(substring(code from '/PRJ([0-9]{1,9})$')::integer)
+              FROM project_project
+             WHERE client_id = %s
+        """
+        next_number = self.env["qlk.code.counter"]._reserve(
+            PROJECT_CODE_COUNTER, partner_id, seed=(seed_query, [partner_id])
+        )
+        return f"{client_code or '00/000'}/PRJ{next_number:03d}"
 
     def _sync_client_code_from_partner(self):
         for project in self:
@@ -344,7 +337,7 @@ class ProjectProject(models.Model):
                 if suffix:
                     updates["code"] = f"{client_code}/PRJ{suffix}"
             else:
-                updates["code"] = project._generate_project_code(client.id, client_code, {})
+                updates["code"] = project._generate_project_code(client.id, client_code)
             project.with_context(skip_project_code_sync=True).write(updates)
 
 
@@ -4,6 +4,8 @@ from odoo.addons.project.models.project_task import CLOSED_STATES
 from odoo.exceptions import ValidationError
 from odoo.fields import Command
 
+from .schema_state import chunked_update, run_init_step
+
 
 class ProjectTask(models.Model):
     _inherit = "project.task"
@@ -77,7 +79,13 @@ class ProjectTask(models.Model):
 
     def init(self):
         # Existing databases may already contain project tasks before this required field exists.
-        self.env.cr.execute("UPDATE project_task SET required_hours = 0 WHERE required_hours IS NULL")
+        run_init_step(
+            self.env,
+            "project_task.required_hours",
+            "1",
+            lambda env: chunked_update(env.cr, "project_task", "required_hours = 0", "required_hours IS NULL"),
+            tables=["project_task"],
+        )
 
     @api.onchange("case_id")
     def _onchange_case_id(self):
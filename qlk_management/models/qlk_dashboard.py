@@ -7,11 +7,13 @@
 from odoo import _, api, fields, models
 from odoo.osv.expression import OR
 from odoo.tools.misc import format_date
+from .perf_sample import instrument
 
 
 class ManagementDashboard(models.AbstractModel):
     _name = "qlk.management.dashboard"
     _description = "Management Dashboard Service"
+    _QUERY_BUDGETS = {"get_dashboard_data": 60}
 
     # ------------------------------------------------------------------------------
     # دالة مساعدة لاسترجاع تعريف أي أكشن عبر XML-ID لاستخدامه في الواجهة.
@@ -70,12 +72,14 @@ class ManagementDashboard(models.AbstractModel):
         return domain
 
     @api.model
+    @instrument()
     def get_dashboard_data(self):
         user = self.env.user
-        employee_ids = user.employee_ids.ids
+        access = self.env["qlk.user.access.context"]._get()
+        employee_ids = list(access.employee_ids)
         lang = user.lang or "en_US"
         # هذا المتغير يفعل الرؤية الشاملة للمديرين فقط.
-        allow_all = user._qlk_can_view_all_dashboards()
+        allow_all = access.can_view_all
 
         proposal_model = self.env.get("bd.proposal")
         engagement_model = self.env.get("bd.engagement.letter")
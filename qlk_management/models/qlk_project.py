@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
+from .perf_sample import instrument
+from .schema_state import add_columns, chunked_update, run_init_step
 
 
 SERVICE_TYPE_SELECTION = [
@@ -43,6 +45,36 @@ LEGAL_SERVICE_CODE_PREFIX = {
 }
 
 
+def _init_project_columns(env):
+    cr = env.cr
+    add_columns(
+        cr,
+        "qlk_project",
+        [
+            ("state", "varchar"),
+            ("service_code", "varchar"),
+            ("client_legal_code", "varchar"),
+            ("project_code", "varchar"),
+            ("project_sequence", "integer DEFAULT 0"),
+            ("service_category", "varchar"),
+            ("active", "boolean DEFAULT true"),
+        ],
+    )
+    rows = chunked_update(cr, "qlk_project", "state = 'draft'", "state IS NULL")
+    rows += chunked_update(cr, "qlk_project", "active = true", "active IS NULL")
+    rows += chunked_update(
+        cr, "qlk_project", "service_code = name", "service_code IS NULL AND name IS NOT NULL"
+    )
+    rows += chunked_update(
+        cr, "qlk_project", "project_code = service_code", "project_code IS NULL AND service_code IS NOT NULL"
+    )
+    cr.execute(
+        "ALTER TABLE qlk_project DROP CONSTRAINT IF EXISTS "
+        "qlk_project_engagement_client_file_service_unique"
+    )
+    return rows
+
+
 class QlkProject(models.Model):
     _name = "qlk.project"
     _description = "QLK Legal Project"
@@ -67,21 +99,7 @@ class QlkProject(models.Model):
 
     def init(self):
         # حماية أثناء الترقية: إذا توقفت ترقية سابقة قبل إنشاء عمود الحالة لا نكسر فتح النظام.
-        self.env.cr.execute("ALTER TABLE qlk_project ADD COLUMN IF NOT EXISTS state varchar")
-        self.env.cr.execute("ALTER TABLE qlk_project ADD COLUMN IF NOT EXISTS service_code varchar")
-        self.env.cr.execute("ALTER TABLE qlk_project ADD COLUMN IF NOT EXISTS client_legal_code varchar")
-        self.env.cr.execute("ALTER TABLE qlk_project ADD COLUMN IF NOT EXISTS project_code varchar")
-        self.env.cr.execute("ALTER TABLE qlk_project ADD COLUMN IF NOT EXISTS project_sequence integer DEFAULT 0")
-        self.env.cr.execute("ALTER TABLE qlk_project ADD COLUMN IF NOT EXISTS service_category varchar")
-        self.env.cr.execute("ALTER TABLE qlk_project ADD COLUMN IF NOT EXISTS active boolean DEFAULT true")
-        self.env.cr.execute("UPDATE qlk_project SET state = 'draft' WHERE state IS NULL")
-        self.env.cr.execute("UPDATE qlk_project SET active = true WHERE active IS NULL")
-        self.env.cr.execute("UPDATE qlk_project SET service_code = name WHERE service_code IS NULL AND name IS NOT NULL")
-        self.env.cr.execute("UPDATE qlk_project SET project_code = service_code WHERE project_code IS NULL AND service_code IS NOT NULL")
-        self.env.cr.execute(
-            "ALTER TABLE qlk_project DROP CONSTRAINT IF EXISTS "
-            "qlk_project_engagement_client_file_service_unique"
-        )
+        run_init_step(self.env, "qlk_project.columns", "1", _init_project_columns, tables=["qlk_project"])
 
     client_id = fields.Many2one(
         "res.partner",
@@ -496,6 +514,7 @@ class QlkProject(models.Model):
         "project_task_ids.effective_hours",
         "project_task_ids.timesheet_ids.unit_amount",
     )
+    @instrument()
     def _compute_hours(self):
         for project in self:
             approved_qlk_task_hours = sum(
@@ -523,6 +542,26 @@ class QlkProject(models.Model):
             else:
                 project.hours_state = "normal"
 
+    def _grouped_counts(self, model_name, project_field, groupby=None):
+        """Count the ``model_name`` rows of the projects in one grouped query.
+
+        Rows are filtered on ``project_field`` and grouped by ``groupby``
+        (default: ``project_field``). Returns ``{id: count}``, or
+        ``{(id, id, ...): count}`` when grouping on several fields.
+        """
+        project_ids = self._origin.ids
+        if not project_ids:
+            return {}
+        groupby = groupby or [project_field]
+        groups = self.env[model_name].sudo().read_group(
+            [(project_field, "in", project_ids)], groupby, groupby, lazy=False
+        )
+        counts = {}
+        for group in groups:
+            key = tuple(group[name] and group[name][0] for name in groupby)
+            counts[key if len(key) > 1 else key[0]] = group["__count"]
+        return counts
+
     @api.depends(
         "case_ids",
         "corporate_case_ids",
@@ -530,45 +569,107 @@ class QlkProject(models.Model):
         "pre_litigation_ids",
     )
     def _compute_service_counts(self):
+        case_counts = self._grouped_counts("qlk.case", "project_id")
+        corporate_counts = self._grouped_counts("qlk.corporate.case", "project_id")
+        arbitration_counts = self._grouped_counts("qlk.arbitration.case", "project_id")
+        pre_litigation_counts = self._grouped_counts("qlk.pre.litigation", "project_id")
         for project in self:
-            project.case_count = len(project.case_ids)
-            project.corporate_count = len(project.corporate_case_ids)
-            project.arbitration_count = len(project.arbitration_case_ids)
-            project.pre_litigation_count = len(project.pre_litigation_ids)
+            project_id = project._origin.id
+            project.case_count = case_counts.get(project_id, 0)
+            project.corporate_count = corporate_counts.get(project_id, 0)
+            project.arbitration_count = arbitration_counts.get(project_id, 0)
+            project.pre_litigation_count = pre_litigation_counts.get(project_id, 0)
 
     @api.depends("case_ids.litigation_degree_id", "case_ids.litigation_degree_id.code")
     def _compute_case_degree_counts(self):
+        counts = self._grouped_counts("qlk.case", "project_id", ["project_id", "litigation_degree_id"])
+        degree_codes = {
+            degree.id: degree.code
+            for degree in self.env["qlk.litigation.degree"].sudo().browse(
+                {degree_id for _project_id, degree_id in counts if degree_id}
+            )
+        }
+        code_counts = {}
+        for (project_id, degree_id), count in counts.items():
+            key = (project_id, degree_codes.get(degree_id))
+            code_counts[key] = code_counts.get(key, 0) + count
         for project in self:
-            codes = project.case_ids.mapped("litigation_degree_id.code")
-            project.first_instance_case_count = codes.count("F")
-            project.appeal_case_count = codes.count("A")
-            project.cassation_case_count = codes.count("C")
-            project.execution_case_count = codes.count("E")
+            project_id = project._origin.id
+            project.first_instance_case_count = code_counts.get((project_id, "F"), 0)
+            project.appeal_case_count = code_counts.get((project_id, "A"), 0)
+            project.cassation_case_count = code_counts.get((project_id, "C"), 0)
+            project.execution_case_count = code_counts.get((project_id, "E"), 0)
 
     @api.depends("project_task_ids", "project_task_ids.timesheet_ids", "qlk_task_ids")
     def _compute_task_count(self):
+        task_counts = self._grouped_counts("project.task", "qlk_project_id")
+        qlk_task_counts = self._grouped_counts("qlk.task", "project_id")
+        timesheet_counts = self._grouped_counts("account.analytic.line", "task_id.qlk_project_id", ["task_id"])
         for project in self:
-            project.task_count = len(project.project_task_ids) + len(project.qlk_task_ids)
-            project.timesheet_count = len(project.project_task_ids.mapped("timesheet_ids"))
+            project_id = project._origin.id
+            project.task_count = task_counts.get(project_id, 0) + qlk_task_counts.get(project_id, 0)
+            project.timesheet_count = sum(
+                timesheet_counts.get(task_id, 0) for task_id in project.project_task_ids._origin.ids
+            )
+
+    def _recent_activity_lines(self, limit=5):
+        """Return ``{project_id: [line, ...]}`` from the latest chatter messages.
+
+        Like ``message_ids``, private user notifications are left out.
+
+        A lateral ``LIMIT`` per project walks the (model, res_id) message index
+        backwards, so the cost does not grow with the size of the history.
+        """
+        project_ids = self._origin.ids
+        if not project_ids:
+            return {}
+        self.env["mail.message"].flush_model(["model", "res_id", "message_type", "subject", "body"])
+        self.env.cr.execute(
+            """
+            SELECT project.id, recent.subject, recent.body
+              FROM unnest(%(ids)s) AS project(id)
+             CROSS JOIN LATERAL (
+                       SELECT msg.id, msg.subject, msg.body
+                         FROM mail_message msg
+                        WHERE msg.model = %(model)s
+                          AND msg.res_id = project.id
+                          AND msg.message_type != 'user_notification'
+                          AND (COALESCE(msg.subject, '') != '' OR COALESCE(msg.body, '') != '')
+                     ORDER BY msg.id DESC
+                        LIMIT %(limit)s
+                   ) recent
+          ORDER BY project.id, recent.id DESC
+            """,
+            {"ids": project_ids, "model": self._name, "limit": limit},
+        )
+        lines = {}
+        for project_id, subject, body in self.env.cr.fetchall():
+            line = (subject or body or "").strip()
+            if line:
+                lines.setdefault(project_id, []).append(line)
+        return lines
 
     @api.depends(
         "case_ids",
         "arbitration_case_ids.session_ids",
         "arbitration_case_ids.memo_ids",
         "corporate_case_ids.memo_ids",
-        "message_ids",
     )
+    @instrument()
     def _compute_dashboard_counts(self):
+        session_counts = self._grouped_counts("qlk.arbitration.session", "case_id.project_id", ["case_id"])
+        arbitration_memo_counts = self._grouped_counts("qlk.arbitration.memo", "case_id.project_id", ["case_id"])
+        corporate_memo_counts = self._grouped_counts("qlk.corporate.memo", "case_id.project_id", ["case_id"])
+        activity_lines = self._recent_activity_lines()
         for project in self:
-            project.hearing_count = len(project.arbitration_case_ids.mapped("session_ids"))
-            project.memo_count = len(project.arbitration_case_ids.mapped("memo_ids")) + len(project.corporate_case_ids.mapped("memo_ids"))
-            messages = project.message_ids.sorted("date", reverse=True)[:5]
-            activity_lines = [
-                (message.subject or message.body or "").strip()
-                for message in messages
-                if (message.subject or message.body)
-            ]
-            project.recent_activity_summary = "\n".join(activity_lines[:5])
+            arbitration_case_ids = project.arbitration_case_ids._origin.ids
+            project.hearing_count = sum(session_counts.get(case_id, 0) for case_id in arbitration_case_ids)
+            project.memo_count = sum(
+                arbitration_memo_counts.get(case_id, 0) for case_id in arbitration_case_ids
+            ) + sum(
+                corporate_memo_counts.get(case_id, 0) for case_id in project.corporate_case_ids._origin.ids
+            )
+            project.recent_activity_summary = "\n".join(activity_lines.get(project._origin.id, []))
 
     @api.depends(
         "client_id",
@@ -939,6 +1040,7 @@ class QlkTask(models.Model):
     remaining_hours = fields.Float(string="Remaining Hours", compute="_compute_task_hours", store=True)
 
     @api.depends("planned_hours", "hours_spent")
+    @instrument()
     def _compute_task_hours(self):
         for task in self:
             task.consumed_hours = task.hours_spent or 0.0
@@ -2,6 +2,8 @@
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
 
+from .schema_state import chunked_update, run_init_step
+
 
 class QlkTask(models.Model):
     _inherit = "qlk.task"
@@ -55,13 +57,17 @@ class QlkTask(models.Model):
 
     @api.model
     def init(self):
-        self.env.cr.execute(
-            """
-            UPDATE qlk_task
-               SET completion_state = 'in_progress'
-             WHERE completion_state IS NULL
-               AND employee_id IS NOT NULL
-            """
+        run_init_step(
+            self.env,
+            "qlk_task.completion_state",
+            "1",
+            lambda env: chunked_update(
+                env.cr,
+                "qlk_task",
+                "completion_state = 'in_progress'",
+                "completion_state IS NULL AND employee_id IS NOT NULL",
+            ),
+            tables=["qlk_task"],
         )
 
     def _compute_completion_buttons(self):
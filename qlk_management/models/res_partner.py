@@ -4,12 +4,55 @@
 # يوفر هذا الملف جميع الحقول المساعدة للمرفقات وتحذيرات المستندات وتنبيهات
 # انتهاء صلاحية التوكيلات بالإضافة إلى كود العميل بعد توقيع اتفاقية EL.
 # ------------------------------------------------------------------------------
+import re
 from datetime import datetime
 
 from odoo import _, api, fields, models
 from odoo.exceptions import AccessError, UserError, ValidationError
 from odoo.osv import expression
 
+from .schema_state import add_columns, chunked_update, run_init_step
+
+# qlk.code.counter scope of client codes ("YY/NNN"), keyed by short year.
+PARTNER_CODE_COUNTER = "partner_code"
+PARTNER_CODE_PATTERN = re.compile(r"^([0-9]{2})/([0-9]{1,9})$")
+
+
+def _init_partner_identity(env):
+    cr = env.cr
+    add_columns(
+        cr,
+        "res_partner",
+        [
+            ("identity_type", "varchar"),
+            ("identity_number", "varchar"),
+            ("is_qatar_resident", "boolean"),
+        ],
+    )
+    rows = chunked_update(cr, "res_partner", "is_qatar_resident = true", "is_qatar_resident IS NULL")
+    for identity_type, legacy_column in (
+        ("qatar_id", "qid"),
+        ("passport", "passport_no"),
+        ("commercial_registration", "cr_no"),
+    ):
+        rows += chunked_update(
+            cr,
+            "res_partner",
+            "identity_type = %%s, identity_number = %s" % legacy_column,
+            "COALESCE(identity_number, '') = '' AND COALESCE(%s, '') != ''" % legacy_column,
+            params=[identity_type],
+        )
+    rows += chunked_update(
+        cr,
+        "res_partner",
+        """identity_type = CASE
+               WHEN COALESCE(is_company, false) THEN 'commercial_registration'
+               ELSE 'qatar_id'
+           END""",
+        "COALESCE(identity_type, '') = ''",
+    )
+    return rows
+
 
 class ResPartner(models.Model):
     _inherit = "res.partner"
@@ -100,54 +143,9 @@ class ResPartner(models.Model):
 
     def init(self):
         super().init()
-        cr = self.env.cr
         # حارس ترقية وتهيئة بيانات الهوية الجديدة من الحقول القديمة بدون كسر السجلات الحالية.
-        cr.execute("ALTER TABLE res_partner ADD COLUMN IF NOT EXISTS identity_type varchar")
-        cr.execute("ALTER TABLE res_partner ADD COLUMN IF NOT EXISTS identity_number varchar")
-        cr.execute("ALTER TABLE res_partner ADD COLUMN IF NOT EXISTS is_qatar_resident boolean")
-        cr.execute(
-            """
-            UPDATE res_partner
-               SET is_qatar_resident = COALESCE(is_qatar_resident, true)
-            """
-        )
-        cr.execute(
-            """
-            UPDATE res_partner
-               SET identity_type = 'qatar_id',
-                   identity_number = qid
-             WHERE COALESCE(identity_number, '') = ''
-               AND COALESCE(qid, '') != ''
-            """
-        )
-        cr.execute(
-            """
-            UPDATE res_partner
-               SET identity_type = 'passport',
-                   identity_number = passport_no
-             WHERE COALESCE(identity_number, '') = ''
-               AND COALESCE(passport_no, '') != ''
-            """
-        )
-        cr.execute(
-            """
-            UPDATE res_partner
-               SET identity_type = 'commercial_registration',
-                   identity_number = cr_no
-             WHERE COALESCE(identity_number, '') = ''
-               AND COALESCE(cr_no, '') != ''
-            """
-        )
-        cr.execute(
-            """
-            UPDATE res_partner
-               SET identity_type = CASE
-                       WHEN COALESCE(is_company, false) THEN 'commercial_registration'
-                       ELSE 'qatar_id'
-                   END
-             WHERE COALESCE(identity_type, '') = ''
-            """
-        )
+        run_init_step(self.env, "res_partner.identity", "1", _init_partner_identity, tables=["res_partner"])
+
     # ------------------------------------------------------------------------------
     # هذه الدالة تحدد نوع الهوية الافتراضي حسب سياق إنشاء جهة الاتصال.
     # ------------------------------------------------------------------------------
@@ -416,17 +414,28 @@ class ResPartner(models.Model):
                         )
                     )
         prepared_vals_list = []
+        missing_codes = {}
         for vals in vals_list:
             vals = self._prepare_identity_vals(vals)
             client_year = vals.get("client_year") or self._default_client_year()
             client_year = int(client_year)
             vals["client_year"] = client_year
             if not vals.get("code") or vals.get("code") == "/":
-                vals["code"] = self._generate_partner_code(client_year)
+                missing_codes[client_year] = missing_codes.get(client_year, 0) + 1
+            prepared_vals_list.append(vals)
+        # One reservation per year for the whole batch.
+        next_numbers = {
+            year: self._reserve_partner_code_numbers(year, count) for year, count in missing_codes.items()
+        }
+        for vals in prepared_vals_list:
+            if not vals.get("code") or vals.get("code") == "/":
+                vals["code"] = self._format_partner_code(vals["client_year"], next_numbers[vals["client_year"]])
+                next_numbers[vals["client_year"]] += 1
             if self._should_generate_partner_ref(vals):
                 vals["ref"] = self._next_partner_ref()
-            prepared_vals_list.append(vals)
         records = super().create(prepared_vals_list)
+        if sum(missing_codes.values()) < len(prepared_vals_list):
+            self._observe_partner_codes(records.mapped("code"))
         # NOTE: Hours enforcement is temporarily disabled. Re-enable when required.
         # records._check_hours_logged()
         return records
@@ -505,6 +514,8 @@ class ResPartner(models.Model):
         # if self._requires_new_task_on_write(vals):
         #     self._raise_missing_hours_error()
         res = super().write(vals)
+        if vals.get("code"):
+            self._observe_partner_codes([vals["code"]])
         if "client_year" in vals and not self.env.context.get("skip_year_sync"):
             for partner in self:
                 partner._update_code_for_year_change()
@@ -752,21 +763,39 @@ class ResPartner(models.Model):
         return self.code
 
     def _generate_partner_code(self, year):
+        return self._format_partner_code(year, self._reserve_partner_code_numbers(year))
+
+    @api.model
+    def _format_partner_code(self, year, number):
+        return f"{str(year)[-2:]}/{number:03d}"
+
+    @api.model
+    def _reserve_partner_code_numbers(self, year, count=1):
+        """Reserve ``count`` client code numbers of ``year``, return the first one."""
         short_year = str(year)[-2:]
-        prefix = f"{short_year}/"
-        partner_model = self.env["res.partner"].with_context(active_test=False).sudo()
-        last_partner = partner_model.search(
-            [("code", "like", f"{prefix}%")],
-            order="code desc",
-            limit=1,
+        seed_query = """
+            SELECT MAX(split_part(code, '/', 2)::integer)
+              FROM res_partner
+             WHERE code ~ %s
+        """
+        return self.env["qlk.code.counter"]._reserve(
+            PARTNER_CODE_COUNTER,
+            short_year,
+            count=count,
+            seed=(seed_query, ["^%s/[0-9]{1,9}$" % re.escape(short_year)]),
         )
-        next_number = 1
-        if last_partner and last_partner.code:
-            try:
-                next_number = int(last_partner.code.split("/")[-1]) + 1
-            except (ValueError, IndexError):
-                next_number = 1
-        return f"{prefix}{next_number:03d}"
+
+    @api.model
+    def _observe_partner_codes(self, codes):
+        """Keep the counters ahead of client codes entered by hand."""
+        highest = {}
+        for code in codes:
+            match = PARTNER_CODE_PATTERN.match(code or "")
+            if match:
+                highest[match.group(1)] = max(highest.get(match.group(1), 0), int(match.group(2)))
+        counter = self.env["qlk.code.counter"]
+        for short_year, number in highest.items():
+            counter._observe(PARTNER_CODE_COUNTER, short_year, number)
 
     def _update_code_for_year_change(self):
         self.ensure_one()
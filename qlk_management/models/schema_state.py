@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Versioned ``init()`` steps.
+
+Upgrade guards (``ADD COLUMN IF NOT EXISTS``, legacy value backfills, ...)
+used to run on every ``-u``, taking exclusive locks and rewriting large
+tables each time. :func:`run_init_step` runs a step only when its
+fingerprint changed: the step version, the data it is driven by and the
+columns of the tables it touches. The version is bumped by hand whenever
+the step, or a helper it calls, changes behaviour; any schema change of
+its tables also runs it again on the next upgrade.
+"""
+
+import hashlib
+import logging
+import time
+
+from odoo import fields, models
+
+_logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def _ensure_state_table(cr):
+    # Steps run from init() of models that may be set up before this one.
+    cr.execute(
+        """
+        CREATE TABLE IF NOT EXISTS qlk_schema_state (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR NOT NULL,
+            version VARCHAR,
+            fingerprint VARCHAR,
+            applied_on TIMESTAMP,
+            duration DOUBLE PRECISION,
+            affected_rows INTEGER
+        )
+        """
+    )
+    cr.execute("ALTER TABLE qlk_schema_state ADD COLUMN IF NOT EXISTS version VARCHAR")
+    cr.execute("CREATE UNIQUE INDEX IF NOT EXISTS qlk_schema_state_name_uniq ON qlk_schema_state (name)")
+
+
+def _fingerprint(cr, version, tables, data):
+    digest = hashlib.sha1(str(version).encode())
+    digest.update(repr(data).encode())
+    if tables:
+        cr.execute(
+            """
+            SELECT table_name, column_name, data_type, column_default
+              FROM information_schema.columns
+             WHERE table_schema = current_schema()
+               AND table_name IN %s
+          ORDER BY table_name, column_name
+            """,
+            [tuple(tables)],
+        )
+        digest.update(repr(cr.fetchall()).encode())
+    return digest.hexdigest()
+
+
+def run_init_step(env, name, version, func, tables=(), data=None):
+    """Run ``func(env)`` unless it already ran with the same fingerprint.
+
+    ``version`` is a string to bump whenever the step must run again.
+    ``tables`` are the tables the step reads or alters, ``data`` any module
+    constant the step is driven by (column lists, ...). ``func`` may return
+    the number of rows it changed, which is logged with the step duration.
+    Returns True when the step ran.
+    """
+    cr = env.cr
+    _ensure_state_table(cr)
+    fingerprint = _fingerprint(cr, version, tables, data)
+    cr.execute("SELECT fingerprint FROM qlk_schema_state WHERE name = %s", [name])
+    row = cr.fetchone()
+    if row and row[0] == fingerprint:
+        return False
+    started = time.perf_counter()
+    affected_rows = func(env) or 0
+    duration = (time.perf_counter() - started) * 1000
+    _logger.info("Init step %s (version %s): %.0f ms, %s rows", name, version, duration, affected_rows)
+    # The step itself may change the schema it depends on.
+    fingerprint = _fingerprint(cr, version, tables, data)
+    cr.execute(
+        """
+        INSERT INTO qlk_schema_state (name, version, fingerprint, applied_on, duration, affected_rows)
+        VALUES (%s, %s, %s, now() at time zone 'UTC', %s, %s)
+        ON CONFLICT (name) DO UPDATE
+           SET version = EXCLUDED.version,
+               fingerprint = EXCLUDED.fingerprint,
+               applied_on = EXCLUDED.applied_on,
+               duration = EXCLUDED.duration,
+               affected_rows = EXCLUDED.affected_rows
+        """,
+        [name, str(version), fingerprint, duration, affected_rows],
+    )
+    return True
+
+
+def chunked_update(cr, table, assignments, where, params=None, chunk_size=BACKFILL_CHUNK_SIZE):
+    """Apply ``UPDATE table SET assignments WHERE where`` in batches.
+
+    ``where`` must stop matching a row once it is updated (e.g. ``col IS
+    NULL``), so rows that already hold a value are never rewritten.
+    Returns the number of updated rows.
+    """
+    total = 0
+    while True:
+        cr.execute(
+            "UPDATE %(table)s SET %(assignments)s WHERE id IN ("
+            "SELECT id FROM %(table)s WHERE %(where)s LIMIT %(limit)s)"
+            % {"table": table, "assignments": assignments, "where": where, "limit": int(chunk_size)},
+            params or (),
+        )
+        total += cr.rowcount
+        if cr.rowcount < chunk_size:
+            return total
+
+
+def add_columns(cr, table, columns):
+    """Add the missing ``(name, definition)`` columns of ``table``."""
+    cr.execute(
+        """
+        SELECT column_name
+          FROM information_schema.columns
+         WHERE table_schema = current_schema()
+           AND table_name = %s
+        """,
+        [table],
+    )
+    existing = {row[0] for row in cr.fetchall()}
+    missing = [(name, definition) for name, definition in columns if name not in existing]
+    if missing:
+        # One ALTER TABLE, so the exclusive lock is taken once.
+        cr.execute(
+            "ALTER TABLE %s %s"
+            % (table, ", ".join("ADD COLUMN IF NOT EXISTS %s %s" % column for column in missing))
+        )
+    return len(missing)
+
+
+class QlkSchemaState(models.Model):
+    _name = "qlk.schema.state"
+    _description = "Schema Upgrade Step"
+    _order = "name"
+    _log_access = False
+
+    name = fields.Char(string="Step", required=True, readonly=True)
+    version = fields.Char(readonly=True)
+    fingerprint = fields.Char(readonly=True)
+    applied_on = fields.Datetime(string="Applied On", readonly=True)
+    duration = fields.Float(string="Duration (ms)", readonly=True)
+    affected_rows = fields.Integer(string="Affected Rows", readonly=True)
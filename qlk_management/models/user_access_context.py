@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Access context shared by every QLK dashboard.
+
+Group membership, the user's employees, their team and the "view all" flag
+are resolved once per (user, groups, companies) and kept in the ormcache
+under the ``user_access_context`` cache generation; within a request the
+result is also memoized on the cursor, so dashboards can ask for it as
+often as they need.
+"""
+
+from collections import namedtuple
+
+from odoo import api, models, tools
+
+UserAccessContext = namedtuple(
+    "UserAccessContext",
+    [
+        "user_id",
+        "group_ids",
+        # Employees linked to the user.
+        "employee_ids",
+        # The user's employees and every subordinate.
+        "team_employee_ids",
+        "can_view_all",
+        "is_system",
+    ],
+)
+
+MEMO_KEY = "qlk_user_access_context"
+CACHE_GENERATION = "user_access_context"
+
+
+class QlkUserAccessContext(models.AbstractModel):
+    _name = "qlk.user.access.context"
+    _description = "Dashboard User Access Context"
+
+    @api.model
+    def _get(self):
+        """Return the :class:`UserAccessContext` of the current user."""
+        memo = self.env.cr.cache.setdefault(MEMO_KEY, {})
+        key = (self.env.uid, tuple(self.env.companies.ids), self.env.company.id)
+        if key not in memo:
+            group_ids = tuple(sorted(self.env.user._get_group_ids()))
+            generation = self.env["qlk.cache.generation"]._get(CACHE_GENERATION)
+            if generation is None:
+                memo[key] = self._compute_context(self.env.uid, group_ids, *key[1:])
+            else:
+                memo[key] = self._cached_context(generation, self.env.uid, group_ids, *key[1:])
+        return memo[key]
+
+    @tools.ormcache("generation", "uid", "group_ids", "company_ids", "company_id")
+    def _cached_context(self, generation, uid, group_ids, company_ids, company_id):
+        return self._compute_context(uid, group_ids, company_ids, company_id)
+
+    def _compute_context(self, uid, group_ids, company_ids, company_id):
+        # The companies of the key are those of ``self.env``.
+        user = self.env["res.users"].browse(uid)
+        employees = user.employee_ids
+        if not employees and getattr(user, "employee_id", False):
+            employees = user.employee_id
+        employee_ids = tuple(employees.ids)
+        team_ids = tuple(self.env["qlk.employee.hierarchy"].team_of(employee_ids)) if employee_ids else ()
+        return UserAccessContext(
+            user_id=uid,
+            group_ids=frozenset(group_ids),
+            employee_ids=employee_ids,
+            team_employee_ids=team_ids,
+            can_view_all=user._qlk_can_view_all_dashboards(),
+            is_system=user._is_system(),
+        )
+
+    @api.model
+    def has_group(self, xmlid):
+        """Like ``res.users.has_group`` but silent for groups of missing modules."""
+        group_id = self.env["ir.model.data"]._xmlid_to_res_id(xmlid, raise_if_not_found=False)
+        return bool(group_id and group_id in self._get().group_ids)
+
+    @api.model
+    def has_any_group(self, xmlids):
+        return any(self.has_group(xmlid) for xmlid in xmlids)
+
+    @api.model
+    def _invalidate(self):
+        self.env.cr.cache.pop(MEMO_KEY, None)
+        self.env["qlk.cache.generation"]._bump(CACHE_GENERATION)
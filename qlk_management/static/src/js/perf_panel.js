@@ -0,0 +1,29 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+
+class QlkPerfPanel extends Component {
+    setup() {
+        this.orm = useService("orm");
+        this.state = useState({ loading: true, hours: 24, rows: [] });
+        this.periods = [1, 24, 168];
+        onWillStart(() => this.loadStats());
+    }
+
+    async loadStats() {
+        this.state.loading = true;
+        this.state.rows = await this.orm.call("qlk.perf.sample", "get_stats", [this.state.hours]);
+        this.state.loading = false;
+    }
+
+    async changePeriod(hours) {
+        this.state.hours = hours;
+        await this.loadStats();
+    }
+}
+
+QlkPerfPanel.template = "qlk_management.PerfPanel";
+
+registry.category("actions").add("qlk.perf.panel", QlkPerfPanel);
@@ -2,3 +2,16 @@ from . import test_project_task_allocated_hours
 from . import test_legal_project_hours
 from . import test_department_dashboard
 from . import test_corporate_hours_lock
+from . import test_user_access_context
+from . import test_employee_hierarchy
+from . import test_schema_state
+from . import test_integrity_scan
+from . import test_project_dashboard_counts
+from . import test_identity_resolver
+from . import test_lawyer_rate_card
+from . import test_hours_rollup
+from . import test_client_file_lawyer_link
+from . import test_client_code_propagation
+from . import test_code_counter
+from . import test_batched_cron
+from . import test_data_retention
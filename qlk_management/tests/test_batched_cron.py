@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Chunked, resumable cron passes."""
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged("post_install", "-at_install")
+class TestBatchedCron(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Cursor = cls.env["qlk.cron.cursor"]
+        cls.partners = cls.env["res.partner"].create([{"name": "Batched Cron %s" % index} for index in range(5)])
+        cls.domain = [("id", "in", cls.partners.ids)]
+
+    def _cursor(self):
+        self.Cursor.invalidate_model()
+        return self.Cursor.search([("name", "=", "test.batched_cron")])
+
+    def test_pass_resumes_after_time_budget(self):
+        seen = []
+
+        def process(records):
+            seen.append(records.ids)
+
+        done = self.Cursor._run_batched(
+            "test.batched_cron", self.env["res.partner"], self.domain, process, batch_size=2, max_seconds=0
+        )
+        self.assertFalse(done)
+        self.assertEqual(seen, [self.partners[:2].ids])
+        cursor = self._cursor()
+        self.assertEqual((cursor.last_id, cursor.processed, cursor.remaining), (self.partners[1].id, 2, 3))
+
+        done = self.Cursor._run_batched(
+            "test.batched_cron", self.env["res.partner"], self.domain, process, batch_size=2
+        )
+        self.assertTrue(done)
+        self.assertEqual(seen, [self.partners[:2].ids, self.partners[2:4].ids, self.partners[4:].ids])
+        cursor = self._cursor()
+        self.assertEqual((cursor.last_id, cursor.processed, cursor.remaining), (0, 5, 0))
+        self.assertTrue(cursor.last_done)
+
+    def test_new_pass_starts_from_first_record(self):
+        seen = []
+        self.Cursor._run_batched(
+            "test.batched_cron", self.env["res.partner"], self.domain, seen.extend, batch_size=10
+        )
+        self.Cursor._run_batched(
+            "test.batched_cron", self.env["res.partner"], self.domain, seen.extend, batch_size=10
+        )
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(self._cursor().processed, 5)
+
+    def test_new_pass_key_restarts_unfinished_pass(self):
+        seen = []
+        self.Cursor._run_batched(
+            "test.batched_cron",
+            self.env["res.partner"],
+            self.domain,
+            seen.extend,
+            batch_size=2,
+            max_seconds=0,
+            pass_key="2026-03-01",
+        )
+        self.assertEqual(self._cursor().last_id, self.partners[1].id)
+
+        # The next day the pass starts over instead of skipping the first records.
+        seen.clear()
+        done = self.Cursor._run_batched(
+            "test.batched_cron",
+            self.env["res.partner"],
+            self.domain,
+            seen.extend,
+            batch_size=2,
+            pass_key="2026-03-02",
+        )
+        self.assertTrue(done)
+        self.assertEqual(seen, list(self.partners))
+        cursor = self._cursor()
+        self.assertEqual((cursor.processed, cursor.pass_key), (5, "2026-03-02"))
+
+    def test_failing_record_is_skipped(self):
+        bad = self.partners[1]
+
+        def process(records):
+            if bad in records:
+                raise ValueError("Broken record")
+            records.write({"comment": "processed"})
+
+        done = self.Cursor._run_batched(
+            "test.batched_cron", self.env["res.partner"], self.domain, process, batch_size=2
+        )
+        self.assertTrue(done)
+        self.assertEqual((self.partners - bad).mapped("comment"), ["processed"] * 4)
+        self.assertFalse(bad.comment)
+        cursor = self._cursor()
+        self.assertEqual((cursor.processed, cursor.failed), (5, 1))
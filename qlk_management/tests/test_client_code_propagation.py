@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Set-based client code propagation."""
+
+from unittest.mock import patch
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged("post_install", "-at_install")
+class TestClientCodePropagation(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.client = cls.env["res.partner"].create(
+            {
+                "name": "Client Code Test Client",
+                "customer_rank": 1,
+                "identity_type": "other",
+                "identity_number": "CLIENT-CODE-TEST",
+            }
+        )
+        cls.letters = cls.env["bd.engagement.letter"].create(
+            [
+                {
+                    "reference": "Client Code Letter %s" % index,
+                    "partner_id": cls.client.id,
+                    "contract_type": "hours",
+                    "service_type": "litigation",
+                    "planned_hours": 10.0,
+                }
+                for index in range(3)
+            ]
+        )
+        cls.env["bd.engagement.letter"].flush_model()
+        cls.env.cr.execute(
+            "UPDATE bd_engagement_letter SET code = '24/001/EL' || LPAD(id::text, 3, '0') WHERE id IN %s",
+            [tuple(cls.letters.ids)],
+        )
+        cls.letters.invalidate_recordset(["code"])
+
+    def _expected_codes(self, client_code):
+        return {letter.id: "%s/EL%03d" % (client_code, letter.id) for letter in self.letters}
+
+    def test_partner_code_change_renumbers_letters(self):
+        messages_before = len(self.client.message_ids)
+        self.client.with_context(skip_client_partner_security=True).sudo().write({"code": "25/777"})
+        self.assertEqual({letter.id: letter.code for letter in self.letters}, self._expected_codes("25/777"))
+        self.assertEqual(set(self.letters.mapped("client_code")), {"25/777"})
+        notes = self.client.message_ids[: len(self.client.message_ids) - messages_before]
+        self.assertEqual(len(notes.filtered(lambda message: "engagement letters" in (message.body or ""))), 1)
+
+    def test_queued_propagation(self):
+        self.client.with_context(skip_related_sync=True).sudo().write({"code": "25/888"})
+        self.client._queue_client_code_sync()
+        self.env["res.partner"]._cron_propagate_client_codes()
+        self.assertEqual({letter.id: letter.code for letter in self.letters}, self._expected_codes("25/888"))
+        self.env.cr.execute("SELECT COUNT(*) FROM qlk_client_code_sync_pending")
+        self.assertEqual(self.env.cr.fetchone()[0], 0)
+
+    def test_failing_client_does_not_block_queue(self):
+        other = self.env["res.partner"].create({"name": "Client Code Broken Client"})
+        Partner = type(self.env["res.partner"])
+        propagate = Partner._propagate_client_codes
+
+        def fail_for_other(partner):
+            if partner == other:
+                raise ValueError("Broken client")
+            return propagate(partner)
+
+        self.client.with_context(skip_related_sync=True).sudo().write({"code": "25/999"})
+        (self.client | other)._queue_client_code_sync()
+        with patch.object(Partner, "_propagate_client_codes", fail_for_other):
+            for _run in range(3):
+                self.env["res.partner"]._cron_propagate_client_codes()
+        self.assertEqual({letter.id: letter.code for letter in self.letters}, self._expected_codes("25/999"))
+        self.env.cr.execute("SELECT partner_id, attempts, last_error FROM qlk_client_code_sync_pending")
+        self.assertEqual(self.env.cr.fetchall(), [(other.id, 3, "Broken client")])
+
+        # Queuing the client again resets its failures.
+        other._queue_client_code_sync()
+        self.env["res.partner"]._cron_propagate_client_codes()
+        self.env.cr.execute("SELECT COUNT(*) FROM qlk_client_code_sync_pending")
+        self.assertEqual(self.env.cr.fetchone()[0], 0)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Reference-counted lawyer links of client files."""
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged("post_install", "-at_install")
+class TestClientFileLawyerLink(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Link = cls.env["qlk.client.file.lawyer.link"]
+        client = cls.env["res.partner"].create(
+            {
+                "name": "Lawyer Links Test Client",
+                "customer_rank": 1,
+                "identity_type": "other",
+                "identity_number": "LAWYER-LINKS-TEST",
+            }
+        )
+        cls.user = cls.env["res.users"].create({"name": "Lawyer Links User", "login": "lawyer_links_user"})
+        cls.other_user = cls.env["res.users"].create({"name": "Lawyer Links Other", "login": "lawyer_links_other"})
+        cls.employee = cls.env["hr.employee"].create({"name": "Lawyer Links Employee", "user_id": cls.user.id})
+        cls.other_employee = cls.env["hr.employee"].create(
+            {"name": "Lawyer Links Other Employee", "user_id": cls.other_user.id}
+        )
+        litigation_service = cls.env["qlk.legal.service.type"].search([("code", "=", "litigation")], limit=1)
+        degree_f = cls.env["qlk.litigation.degree"].search([("code", "=", "F")], limit=1)
+        cls.agreement = cls.env["bd.engagement.letter"].create(
+            {
+                "reference": "Lawyer Links Agreement",
+                "partner_id": client.id,
+                "contract_type": "hours",
+                "service_type": "litigation",
+                "approval_role": "manager",
+                "state": "approved_client",
+                "planned_hours": 10.0,
+                "legal_service_type_ids": [(6, 0, litigation_service.ids)],
+                "litigation_degree_ids": [(6, 0, degree_f.ids)],
+                "lawyer_ids": [(6, 0, cls.employee.ids)],
+            }
+        )
+        cls.client_file = cls.env["qlk.client.file"].create(
+            {
+                "name": "Lawyer Links Client File",
+                "partner_id": client.id,
+                "service_profile_type": "litigation",
+                "legal_service_type_ids": [(6, 0, litigation_service.ids)],
+                "allowed_litigation_degree_ids": [(6, 0, degree_f.ids)],
+                "engagement_ids": [(6, 0, cls.agreement.ids)],
+                "litigation_client_code": "L-TEST-LAWYER-LINKS",
+                "litigation_code_locked": True,
+            }
+        )
+
+    def test_links_follow_sources(self):
+        self.assertEqual(self.client_file.lawyer_user_ids, self.user)
+
+        # The same user reached through a second source is counted twice.
+        self.client_file.lawyer_ids = self.employee
+        links = self.Link.search([("client_file_id", "=", self.client_file.id), ("user_id", "=", self.user.id)])
+        self.assertEqual(len(links), 2)
+
+        self.agreement.lawyer_ids = self.other_employee
+        self.assertEqual(self.client_file.lawyer_user_ids, self.user | self.other_user)
+
+        self.client_file.lawyer_ids = False
+        self.assertEqual(self.client_file.lawyer_user_ids, self.other_user)
+        self.assertIn(
+            self.client_file,
+            self.env["qlk.client.file"].search([("lawyer_user_ids", "in", [self.other_user.id])]),
+        )
+        self.assertNotIn(
+            self.client_file,
+            self.env["qlk.client.file"].search([("lawyer_user_ids", "in", [self.user.id])]),
+        )
+
+    def test_employee_user_change(self):
+        self.employee.user_id = self.other_user
+        self.assertEqual(self.client_file.lawyer_user_ids, self.other_user)
+
+    def test_audit_repairs_mismatches(self):
+        self.Link._audit_links(fix=True)
+        self.env.cr.execute(
+            "DELETE FROM qlk_client_file_lawyer_link WHERE client_file_id = %s", [self.client_file.id]
+        )
+        self.env.cr.execute(
+            """
+            INSERT INTO qlk_client_file_lawyer_link (client_file_id, user_id, source_model, source_id)
+            VALUES (%s, %s, 'qlk.case', 0)
+            """,
+            [self.client_file.id, self.other_user.id],
+        )
+        self.Link.invalidate_model()
+        report = self.Link._audit_links(fix=True)
+        self.assertEqual((report["missing"], report["extra"]), (1, 1))
+        self.assertEqual(report["client_file_ids"], [self.client_file.id])
+        self.client_file.invalidate_recordset(["lawyer_link_ids", "lawyer_user_ids"])
+        self.assertEqual(self.client_file.lawyer_user_ids, self.user)
+        self.assertEqual(self.Link._audit_links(), {"missing": 0, "extra": 0, "client_file_ids": []})
+
+    def _insert_responsible_case(self, model_name, employee):
+        # Creating these cases needs a full legal project; only the lawyer
+        # columns matter here, the writes below go through the ORM.
+        model = self.env[model_name]
+        self.env.cr.execute(
+            """
+            INSERT INTO %s (name, client_file_id, responsible_employee_id, responsible_user_id)
+            VALUES (%%s, %%s, %%s, %%s)
+            RETURNING id
+            """
+            % model._table,
+            ["Lawyer Links %s" % model_name, self.client_file.id, employee.id, employee.user_id.id],
+        )
+        case = model.browse(self.env.cr.fetchone()[0])
+        self.Link._sync_sources(model_name, case.ids)
+        return case
+
+    def test_responsible_lawyer_sources(self):
+        third_user = self.env["res.users"].create({"name": "Lawyer Links Third", "login": "lawyer_links_third"})
+        for model_name in ("qlk.arbitration.case", "qlk.corporate.case"):
+            with self.subTest(model=model_name):
+                case = self._insert_responsible_case(model_name, self.other_employee)
+                self.client_file.invalidate_recordset(["lawyer_link_ids", "lawyer_user_ids"])
+                self.assertEqual(self.client_file.lawyer_user_ids, self.user | self.other_user)
+
+                case.responsible_employee_id = self.employee
+                self.assertEqual(self.client_file.lawyer_user_ids, self.user)
+
+                case.responsible_employee_id = self.other_employee
+                self.other_employee.user_id = third_user
+                self.assertEqual(self.client_file.lawyer_user_ids, self.user | third_user)
+
+                self.other_employee.user_id = self.other_user
+                case.responsible_employee_id = self.employee
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Counter-backed employee and client codes."""
+
+from itertools import count as counter
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged("post_install", "-at_install")
+class TestCodeCounter(TransactionCase):
+    _identity_numbers = counter(1)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env["ir.config_parameter"].sudo().set_param("qlk_management.employee_code_prefix", "CTR")
+
+    def _create_clients(self, count, year=2091):
+        return self.env["res.partner"].create(
+            [
+                {
+                    "name": "Counter Client %s" % index,
+                    "customer_rank": 1,
+                    "client_year": year,
+                    "identity_type": "other",
+                    "identity_number": "COUNTER-%s" % next(self._identity_numbers),
+                }
+                for index in range(count)
+            ]
+        )
+
+    def test_employee_codes_reserved_as_block(self):
+        self.env["hr.employee"].create({"name": "Counter Existing", "employee_code": "CTR/007/2020"})
+        employees = self.env["hr.employee"].create(
+            [{"name": "Counter Employee %s" % index, "contract_date": "2026-01-15"} for index in range(2)]
+        )
+        self.assertEqual(employees.mapped("employee_code"), ["CTR/008/2026", "CTR/009/2026"])
+
+        self.env["hr.employee"].create({"name": "Counter Manual", "employee_code": "CTR/020/2026"})
+        self.env["ir.config_parameter"].sudo().set_param("qlk_management.employee_code_start", "30")
+        employee = self.env["hr.employee"].create({"name": "Counter Later", "contract_date": "2026-02-01"})
+        self.assertEqual(employee.employee_code, "CTR/030/2026")
+
+    def test_partner_codes_seeded_per_year(self):
+        existing = self._create_clients(1)
+        existing.with_context(skip_related_sync=True).write({"code": "91/041"})
+        self.env.cr.execute("DELETE FROM qlk_code_counter WHERE scope = 'partner_code' AND key = '91'")
+
+        clients = self._create_clients(3)
+        self.assertEqual(clients.mapped("code"), ["91/042", "91/043", "91/044"])
+        self.assertEqual(self._create_clients(1, year=2092).code, "92/001")
+
+        clients[0].with_context(skip_related_sync=True).write({"code": "91/100"})
+        self.assertEqual(self._create_clients(1).code, "91/101")
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Cold storage of the immutable project hour history."""
+
+from odoo import Command
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged("post_install", "-at_install")
+class TestDataRetention(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        client = cls.env["res.partner"].create(
+            {
+                "name": "Retention Client",
+                "customer_rank": 1,
+                "identity_type": "other",
+                "identity_number": "RETENTION-TEST",
+            }
+        )
+        # Creating a project needs the client file pipeline; only the row matters here.
+        cls.env.cr.execute(
+            "INSERT INTO qlk_project (name, client_id, company_id) VALUES (%s, %s, %s) RETURNING id",
+            ["Retention Project", client.id, cls.env.company.id],
+        )
+        cls.project = cls.env["qlk.project"].browse(cls.env.cr.fetchone()[0])
+        cls.tracking = cls.env["qlk.project.hour.tracking"].create(
+            {
+                "project_id": cls.project.id,
+                "field_name": "consumed_hours",
+                "before_value": 1.0,
+                "after_value": 3.0,
+                "difference": 2.0,
+                "source": "manual",
+            }
+        )
+        cls.audit = cls.env["qlk.project.hour.audit"].create(
+            {"project_id": cls.project.id, "old_value": 1.0, "new_value": 3.0, "reason": "Retention test"}
+        )
+        for table in ("qlk_project_hour_tracking", "qlk_project_hour_audit"):
+            cls.env.cr.execute(
+                "UPDATE %s SET changed_on = '2010-03-15 10:00:00' WHERE project_id = %%s" % table,
+                [cls.project.id],
+            )
+        cls.project_manager = cls.env["res.users"].create(
+            {
+                "name": "Retention Project Manager",
+                "login": "retention-project-manager-test",
+                "groups_id": [Command.link(cls.env.ref("qlk_management.group_project_manager").id)],
+            }
+        )
+        cls.Archive = cls.env["qlk.retention.archive"]
+
+    def _archived(self, records):
+        return self.Archive.search([("model_name", "=", records._name), ("res_id", "in", records.ids)])
+
+    def test_policies_archive_and_delete_history(self):
+        tracking_ids, audit_ids = self.tracking.ids, self.audit.ids
+        policies = self.env.ref("qlk_management.retention_policy_hour_tracking") | self.env.ref(
+            "qlk_management.retention_policy_hour_audit"
+        )
+        policies._run()
+
+        self.assertFalse(self.tracking.exists())
+        self.assertFalse(self.audit.exists())
+        self.assertEqual(self._archived(self.tracking).res_id, tracking_ids[0])
+        self.assertEqual(self._archived(self.audit).res_id, audit_ids[0])
+        summary = self.env["qlk.project.hour.tracking.summary"].search([("project_id", "=", self.project.id)])
+        self.assertEqual((summary.entry_count, summary.total_difference), (1, 2.0))
+
+        # Project managers read the history before; they still read the archive.
+        archive = self.Archive.with_user(self.project_manager).search(
+            [("res_id", "in", tracking_ids + audit_ids)]
+        )
+        self.assertEqual(set(archive.mapped("model_name")), {"qlk.project.hour.tracking", "qlk.project.hour.audit"})
+
+    def test_history_stays_immutable_outside_retention(self):
+        with self.assertRaises(UserError):
+            self.audit.with_context(qlk_retention_unlink=True).with_user(self.project_manager).unlink()
+        with self.assertRaises(UserError):
+            self.tracking.sudo().unlink()
+        self.assertTrue(self.audit.exists())
+
+    def test_run_now_queues_the_cron(self):
+        cron = self.env.ref("qlk_management.ir_cron_qlk_data_retention")
+        triggers = self.env["ir.cron.trigger"].search_count([("cron_id", "=", cron.id)])
+        self.env.ref("qlk_management.retention_policy_hour_audit").action_run_now()
+        self.assertEqual(self.env["ir.cron.trigger"].search_count([("cron_id", "=", cron.id)]), triggers + 1)
+        self.assertTrue(self.audit.exists())
@@ -0,0 +1,60 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestEmployeeHierarchy(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Employee = cls.env["hr.employee"]
+        cls.partner = Employee.create({"name": "Hierarchy Partner"})
+        cls.manager = Employee.create({"name": "Hierarchy Manager", "parent_id": cls.partner.id})
+        cls.lawyer = Employee.create({"name": "Hierarchy Lawyer", "parent_id": cls.manager.id})
+        cls.trainee = Employee.create({"name": "Hierarchy Trainee", "parent_id": cls.lawyer.id})
+        cls.other = Employee.create({"name": "Other Manager"})
+        cls.hierarchy = cls.env["qlk.employee.hierarchy"]
+
+    def _child_of(self, employee):
+        return set(self.env["hr.employee"].search([("id", "child_of", employee.ids)]).ids)
+
+    def test_team_matches_child_of(self):
+        for employee in (self.partner, self.manager, self.lawyer, self.trainee):
+            self.assertEqual(set(self.hierarchy.team_of(employee.ids)), self._child_of(employee))
+
+    def test_max_depth_limits_levels(self):
+        self.assertEqual(
+            set(self.hierarchy.team_of(self.partner.ids, max_depth=1)),
+            {self.partner.id, self.manager.id},
+        )
+
+    def test_moving_subtree_updates_both_branches(self):
+        self.lawyer.parent_id = self.other
+        self.assertEqual(
+            set(self.hierarchy.team_of(self.other.ids)),
+            {self.other.id, self.lawyer.id, self.trainee.id},
+        )
+        self.assertEqual(set(self.hierarchy.team_of(self.partner.ids)), {self.partner.id, self.manager.id})
+        self.assertEqual(set(self.hierarchy.team_of(self.partner.ids)), self._child_of(self.partner))
+
+    def test_unlink_detaches_direct_reports(self):
+        self.manager.unlink()
+        self.assertEqual(self.hierarchy.team_of(self.partner.ids), [self.partner.id])
+        self.assertEqual(set(self.hierarchy.team_of(self.lawyer.ids)), {self.lawyer.id, self.trainee.id})
+        self.assertFalse(self.lawyer.parent_id)
+        self.env.cr.execute("SELECT ancestor_id, descendant_id, depth FROM qlk_employee_hierarchy")
+        incremental = set(self.env.cr.fetchall())
+        self.hierarchy._rebuild()
+        self.env.cr.execute("SELECT ancestor_id, descendant_id, depth FROM qlk_employee_hierarchy")
+        self.assertEqual(set(self.env.cr.fetchall()), incremental)
+
+    def test_archived_employees_are_excluded(self):
+        self.trainee.active = False
+        self.assertNotIn(self.trainee.id, self.hierarchy.team_of(self.lawyer.ids))
+        self.assertIn(self.trainee.id, self.hierarchy.team_of(self.lawyer.ids, include_archived=True))
+
+    def test_rebuild_matches_incremental_rows(self):
+        self.lawyer.parent_id = self.other
+        self.env.cr.execute("SELECT ancestor_id, descendant_id, depth FROM qlk_employee_hierarchy")
+        incremental = set(self.env.cr.fetchall())
+        self.hierarchy._rebuild()
+        self.env.cr.execute("SELECT ancestor_id, descendant_id, depth FROM qlk_employee_hierarchy")
+        self.assertEqual(set(self.env.cr.fetchall()), incremental)
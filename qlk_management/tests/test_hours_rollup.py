@@ -0,0 +1,67 @@
+from datetime import date
+
+from odoo.tests.common import TransactionCase
+
+
+class TestHoursRollup(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Rollup = cls.env["qlk.hours.daily"].sudo()
+        cls.employee = cls.env["hr.employee"].create({"name": "Rollup Lawyer"})
+        cls.other_employee = cls.env["hr.employee"].create({"name": "Rollup Associate"})
+
+    def _create_task(self, employee, hours, day, state="approved"):
+        return self.env["qlk.task"].create(
+            {
+                "name": "Rollup Task",
+                "department": "management",
+                "employee_id": employee.id,
+                "hours_spent": hours,
+                "date_start": day,
+                "approval_state": state,
+            }
+        )
+
+    def _employee_hours(self, domain=None):
+        rows = self.Rollup.read_task_hours(
+            [("employee_id", "in", [self.employee.id, self.other_employee.id])] + (domain or []),
+            ["employee_id"],
+        )
+        return {employee.id: hours for employee, hours in rows}
+
+    def test_rollup_follows_task_writes(self):
+        task = self._create_task(self.employee, 2.0, date(2026, 3, 2))
+        self._create_task(self.employee, 1.5, date(2026, 3, 2))
+        self._create_task(self.other_employee, 4.0, date(2026, 3, 3))
+        self.assertEqual(self._employee_hours(), {self.employee.id: 3.5, self.other_employee.id: 4.0})
+
+        task.write({"hours_spent": 3.0, "date_start": date(2026, 3, 5)})
+        self.assertEqual(self._employee_hours(), {self.employee.id: 4.5, self.other_employee.id: 4.0})
+        self.assertEqual(self._employee_hours([("date_start", "=", date(2026, 3, 5))]), {self.employee.id: 3.0})
+
+        task.employee_id = self.other_employee
+        self.assertEqual(self._employee_hours(), {self.employee.id: 1.5, self.other_employee.id: 7.0})
+
+        task.unlink()
+        self.assertEqual(self._employee_hours(), {self.employee.id: 1.5, self.other_employee.id: 4.0})
+
+    def test_rollup_matches_task_aggregation(self):
+        self._create_task(self.employee, 2.0, date(2026, 4, 1))
+        self._create_task(self.employee, 5.0, date(2026, 4, 20), state="waiting")
+        self._create_task(self.other_employee, 1.0, date(2026, 5, 1))
+        summary = self.env["qlk.task"].summarize_hours(
+            date_from=date(2026, 4, 1),
+            date_to=date(2026, 4, 30),
+            employee_ids=[self.employee.id, self.other_employee.id],
+        )
+        self.assertEqual(summary, {self.employee.id: 2.0})
+        self.Rollup._rebuild()
+        self.assertEqual(
+            self.env["qlk.task"].summarize_hours(employee_ids=[self.employee.id, self.other_employee.id]),
+            {self.employee.id: 2.0, self.other_employee.id: 1.0},
+        )
+
+    def test_untranslatable_domain_falls_back(self):
+        self.assertIsNone(self.Rollup.read_task_hours([("reviewer_id", "=", self.env.uid)]))
+        self.assertIsNone(self.Rollup.read_task_hours([("employee_id.name", "=", "Rollup Lawyer")]))
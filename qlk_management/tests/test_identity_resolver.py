@@ -0,0 +1,71 @@
+from odoo import Command
+from odoo.tests.common import TransactionCase
+
+
+class TestIdentityResolver(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.resolver = cls.env["qlk.identity.resolver"]
+        cls.user = cls.env["res.users"].create({"name": "Identity Lawyer", "login": "identity-lawyer-test"})
+        cls.employee = cls.env["hr.employee"].create(
+            {"name": "Identity Lawyer", "user_id": cls.user.id, "barcode": "IDENTITY-TEST-1"}
+        )
+        cls.contact = cls.env["res.partner"].create({"name": "Identity Contact"})
+        cls.other = cls.env["hr.employee"].create(
+            {"name": "Identity Other", "work_contact_id": cls.contact.id, "employee_code": "IDENTITY-CODE-2"}
+        )
+
+    def test_partner_and_user_lookups(self):
+        result = self.resolver.employees_for_partners([self.user.partner_id.id, self.contact.id])
+        self.assertEqual(result[self.user.partner_id.id][0], self.employee.id)
+        self.assertEqual(result[self.contact.id], (self.other.id,))
+        self.assertEqual(self.resolver.employee_for_users([self.user.id]), {self.user.id: self.employee.id})
+
+    def test_device_codes(self):
+        device = self.env["qlk.biometric.device"].search([], limit=1)
+        result = self.resolver.employee_for_device_codes(["IDENTITY-TEST-1", "IDENTITY-CODE-2", "UNKNOWN"])
+        self.assertEqual(result, {"IDENTITY-TEST-1": self.employee.id, "IDENTITY-CODE-2": self.other.id})
+        if device:
+            self.env["qlk.biometric.user.map"].create(
+                {"device_id": device.id, "device_user_code": "IDENTITY-TEST-1", "employee_id": self.other.id}
+            )
+            result = self.resolver.employee_for_device_codes(["IDENTITY-TEST-1"], device_id=device.id)
+            self.assertEqual(result["IDENTITY-TEST-1"], self.other.id)
+
+    def test_employee_changes_invalidate_maps(self):
+        self.assertEqual(self.resolver.employee_for_user(self.user), self.employee)
+        self.employee.action_archive()
+        self.assertFalse(self.resolver.employee_for_users([self.user.id]))
+        self.other.barcode = "IDENTITY-TEST-3"
+        self.assertEqual(
+            self.resolver.employee_for_device_codes(["IDENTITY-TEST-3"]), {"IDENTITY-TEST-3": self.other.id}
+        )
+
+    def test_lookups_follow_record_rules_and_companies(self):
+        company = self.env["res.company"].create({"name": "Identity Other Company"})
+        self.other.company_id = company
+        reader = self.env["res.users"].create(
+            {
+                "name": "Identity Reader",
+                "login": "identity-reader-test",
+                "groups_id": [Command.link(self.env.ref("base.group_user").id)],
+            }
+        )
+        resolver = self.resolver.with_user(reader)
+        self.assertEqual(resolver.employees_for_partners([self.contact.id]), {})
+        self.assertEqual(resolver.employee_for_device_codes(["IDENTITY-CODE-2"]), {})
+        self.assertEqual(resolver.sudo().employees_for_partners([self.contact.id]), {self.contact.id: (self.other.id,)})
+
+    def test_code_fields_order(self):
+        self.assertEqual(
+            self.resolver.employee_for_device_codes(["IDENTITY-CODE-2"], code_fields=("barcode",)), {}
+        )
+        if "biometric_user_code" in self.env["hr.employee"]._fields:
+            self.other.biometric_user_code = "IDENTITY-TEST-1"
+            self.assertEqual(
+                self.resolver.employee_for_device_codes(
+                    ["IDENTITY-TEST-1"], code_fields=("biometric_user_code", "barcode")
+                ),
+                {"IDENTITY-TEST-1": self.other.id},
+            )
@@ -0,0 +1,61 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestIntegrityScan(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Scanner = cls.env["qlk.integrity.scanner"]
+        partner = cls.env["res.partner"].create({"name": "Integrity Scan Client"})
+        cls.letter = cls.env["bd.engagement.letter"].create(
+            {"reference": "Integrity Scan", "partner_id": partner.id}
+        )
+        # Simulate a column left without its foreign key by an old migration.
+        cls.env.cr.execute(
+            """
+            SELECT con.conname
+              FROM pg_constraint con
+              JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = con.conkey[1]
+             WHERE con.conrelid = 'bd_engagement_letter'::regclass
+               AND con.contype = 'f'
+               AND att.attname = 'reviewer_id'
+            """
+        )
+        for (name,) in cls.env.cr.fetchall():
+            cls.env.cr.execute('ALTER TABLE bd_engagement_letter DROP CONSTRAINT "%s"' % name)
+        cls.env.cr.execute("SELECT COALESCE(MAX(id), 0) + 1000 FROM res_users")
+        cls.missing_id = cls.env.cr.fetchone()[0]
+        cls.env.cr.execute(
+            "UPDATE bd_engagement_letter SET reviewer_id = %s WHERE id = %s",
+            [cls.missing_id, cls.letter.id],
+        )
+        cls.letter.invalidate_recordset()
+
+    def _issue(self):
+        return self.env["qlk.integrity.issue"].search(
+            [
+                ("model_name", "=", "bd.engagement.letter"),
+                ("field_name", "=", "reviewer_id"),
+                ("record_id", "=", self.letter.id),
+            ]
+        )
+
+    def test_columns_with_foreign_key_are_skipped(self):
+        checks = self.Scanner._get_checks(["bd.engagement.letter"])
+        self.assertIn(("bd.engagement.letter", "reviewer_id"), checks)
+        self.assertNotIn(("bd.engagement.letter", "partner_id"), checks)
+
+    def test_report_only(self):
+        report = self.Scanner.scan(model_names=["bd.engagement.letter"])
+        self.assertEqual(report[("bd.engagement.letter", "reviewer_id")], 1)
+        self.assertEqual(self._issue().state, "found")
+        self.assertEqual(self._issue().reference_id, self.missing_id)
+        self.env.cr.execute("SELECT reviewer_id FROM bd_engagement_letter WHERE id = %s", [self.letter.id])
+        self.assertEqual(self.env.cr.fetchone()[0], self.missing_id)
+
+    def test_fix_clears_reference(self):
+        self.Scanner.scan(model_names=["bd.engagement.letter"])
+        self.env["bd.engagement.letter"]._clean_invalid_links()
+        self.assertFalse(self.letter.reviewer_id)
+        self.assertEqual(self._issue().state, "fixed")
+        self.assertFalse(self.Scanner.scan(model_names=["bd.engagement.letter"]))
@@ -0,0 +1,127 @@
+from datetime import date
+
+from freezegun import freeze_time
+
+from odoo.exceptions import ValidationError
+from odoo.tests.common import TransactionCase
+
+
+class TestLawyerRateCard(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Rate = cls.env["qlk.lawyer.rate"]
+        cls.employee = cls.env["hr.employee"].create({"name": "Rate Card Lawyer", "lawyer_hour_cost": 75.0})
+        cls.Rate.create(
+            [
+                {
+                    "employee_id": cls.employee.id,
+                    "date_from": date(2025, 1, 1),
+                    "date_to": date(2025, 12, 31),
+                    "cost_per_hour_base": 100.0,
+                    "profit_ratio": 1.5,
+                },
+                {
+                    "employee_id": cls.employee.id,
+                    "date_from": date(2026, 1, 1),
+                    "cost_per_hour_base": 120.0,
+                    "profit_ratio": 1.5,
+                },
+            ]
+        )
+
+    def test_rate_follows_effective_date(self):
+        self.assertEqual(self.Rate._rates_for(self.employee.ids, date(2025, 6, 1)), {self.employee.id: 150.0})
+        self.assertEqual(self.Rate._rates_for(self.employee.ids, date(2026, 6, 1)), {self.employee.id: 180.0})
+        self.assertEqual(self.Rate._rates_for(self.employee.ids, date(2024, 6, 1)), {})
+
+    def test_rate_change_invalidates_card(self):
+        self.Rate._rates_for(self.employee.ids, date(2026, 6, 1))
+        current = self.Rate.search([("employee_id", "=", self.employee.id), ("date_to", "=", False)])
+        current.profit_ratio = 2.0
+        self.assertEqual(self.Rate._rates_for(self.employee.ids, date(2026, 6, 1)), {self.employee.id: 240.0})
+
+    def test_overlapping_periods_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            self.Rate.create(
+                {
+                    "employee_id": self.employee.id,
+                    "date_from": date(2025, 6, 1),
+                    "date_to": date(2025, 6, 30),
+                    "cost_per_hour_base": 90.0,
+                }
+            )
+
+    def test_rate_change_bumps_generation(self):
+        Generation = self.env["qlk.cache.generation"]
+        self.env.cr.precommit.run()
+        before = Generation._get("lawyer_rate_card")
+        self.Rate.search([("employee_id", "=", self.employee.id)]).write({"profit_ratio": 2.0})
+        self.assertIsNone(Generation._get("lawyer_rate_card"))
+        self.env.cr.precommit.run()
+        self.assertEqual(Generation._get("lawyer_rate_card"), before + 1)
+
+    def test_rates_are_scoped_by_company(self):
+        other_company = self.env["res.company"].create({"name": "Rate Card Other Company"})
+        employee = self.env["hr.employee"].create({"name": "Rate Card Shared Lawyer"})
+        self.Rate.create(
+            [
+                {
+                    "employee_id": employee.id,
+                    "date_from": date(2025, 1, 1),
+                    "date_to": date(2025, 12, 31),
+                    "cost_per_hour_base": 200.0,
+                    "company_id": other_company.id,
+                },
+                {
+                    "employee_id": employee.id,
+                    "date_from": date(2025, 1, 1),
+                    "date_to": date(2025, 12, 31),
+                    "cost_per_hour_base": 100.0,
+                    "company_id": self.env.company.id,
+                },
+                {
+                    "employee_id": employee.id,
+                    "date_from": date(2026, 1, 1),
+                    "cost_per_hour_base": 300.0,
+                    "company_id": False,
+                },
+            ]
+        )
+        day = date(2025, 6, 1)
+        self.assertEqual(self.Rate._rates_for(employee.ids, day), {employee.id: 100.0})
+        self.assertEqual(self.Rate._rates_for(employee.ids, day, company=other_company), {employee.id: 200.0})
+        self.assertEqual(
+            self.Rate._rates_for(employee.ids, date(2026, 6, 1), company=other_company), {employee.id: 300.0}
+        )
+        with self.assertRaises(ValidationError):
+            self.Rate.create(
+                {
+                    "employee_id": employee.id,
+                    "date_from": date(2026, 3, 1),
+                    "cost_per_hour_base": 90.0,
+                    "company_id": other_company.id,
+                }
+            )
+
+    def test_fee_line_uses_rate_card(self):
+        Fee = self.env["bd.proposal.legal.fee"]
+        with freeze_time("2026-06-01"):
+            self.assertEqual(Fee._get_current_lawyer_cost(self.employee), 180.0)
+        with freeze_time("2025-06-01"):
+            self.assertEqual(Fee._get_current_lawyer_cost(self.employee), 150.0)
+        # Before the first rate period the employee's own hour cost applies.
+        with freeze_time("2024-06-01"):
+            self.assertEqual(Fee._get_current_lawyer_cost(self.employee), 75.0)
+
+    def test_fee_line_priced_at_document_date(self):
+        other = self.env["hr.employee"].create({"name": "Rate Card Associate", "lawyer_hour_cost": 60.0})
+        proposal = self.env["bd.proposal"].new({"date": date(2025, 6, 1)})
+        letter = self.env["bd.engagement.letter"].new({"date": date(2025, 6, 1)})
+        with freeze_time("2026-06-01"):
+            for Fee, document in (
+                (self.env["bd.proposal.legal.fee"], proposal),
+                (self.env["bd.engagement.letter.fee"], letter),
+            ):
+                costs = Fee._get_lawyer_costs(self.employee | other, document)
+                self.assertEqual(costs, {self.employee.id: 150.0, other.id: 60.0})
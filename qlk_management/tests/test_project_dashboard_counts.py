@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Dashboard counters of legal projects with a long chatter history."""
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged("post_install", "-at_install")
+class TestProjectDashboardCounts(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        client = cls.env["res.partner"].create(
+            {
+                "name": "Dashboard Counts Test Client",
+                "customer_rank": 1,
+                "identity_type": "other",
+                "identity_number": "DASHBOARD-COUNTS-TEST",
+            }
+        )
+        employee = cls.env["hr.employee"].create({"name": "Dashboard Counts Test Lawyer"})
+        litigation_service = cls.env["qlk.legal.service.type"].search([("code", "=", "litigation")], limit=1)
+        degree_f = cls.env["qlk.litigation.degree"].search([("code", "=", "F")], limit=1)
+        agreement = cls.env["bd.engagement.letter"].create(
+            {
+                "reference": "Dashboard Counts Agreement",
+                "partner_id": client.id,
+                "contract_type": "hours",
+                "service_type": "litigation",
+                "approval_role": "manager",
+                "state": "approved_client",
+                "planned_hours": 10.0,
+                "legal_service_type_ids": [(6, 0, litigation_service.ids)],
+                "litigation_degree_ids": [(6, 0, degree_f.ids)],
+                "lawyer_ids": [(6, 0, employee.ids)],
+            }
+        )
+        client_file = cls.env["qlk.client.file"].create(
+            {
+                "name": "Dashboard Counts Client File",
+                "partner_id": client.id,
+                "service_profile_type": "litigation",
+                "legal_service_type_ids": [(6, 0, litigation_service.ids)],
+                "allowed_litigation_degree_ids": [(6, 0, degree_f.ids)],
+                "engagement_ids": [(6, 0, agreement.ids)],
+                "litigation_client_code": "L-TEST-DASHBOARD",
+                "litigation_code_locked": True,
+                "poa_status": "verified",
+            }
+        )
+        agreement.write({"client_file_id": client_file.id, "client_file_ids": [(4, client_file.id)]})
+        values = client_file._prepare_project_vals_from_engagement(agreement)
+        cls.project = cls.env["qlk.project"].with_context(create_from_client_file=True).create(
+            dict(values, name="Dashboard Counts Project")
+        )
+        cls.env["mail.message"].flush_model()
+        cls.env.cr.execute(
+            """
+            INSERT INTO mail_message (model, res_id, message_type, subject, body, date, create_date, write_date)
+            SELECT 'qlk.project', %s, 'comment', 'Update ' || n, '<p>Note ' || n || '</p>',
+                   now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC'
+              FROM generate_series(1, 5000) AS n
+            """,
+            [cls.project.id],
+        )
+
+    def test_recent_activity_keeps_latest_five(self):
+        self.project.invalidate_recordset()
+        self.assertEqual(
+            self.project.recent_activity_summary.split("\n"),
+            ["Update 5000", "Update 4999", "Update 4998", "Update 4997", "Update 4996"],
+        )
+
+    def test_recent_activity_skips_user_notifications(self):
+        self.env.cr.execute(
+            """
+            INSERT INTO mail_message (model, res_id, message_type, subject, body, date, create_date, write_date)
+            VALUES ('qlk.project', %s, 'user_notification', 'Private reminder', '<p>For one user</p>',
+                    now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC')
+            """,
+            [self.project.id],
+        )
+        self.project.invalidate_recordset()
+        self.assertNotIn("Private reminder", self.project.recent_activity_summary)
+        self.assertEqual(self.project.recent_activity_summary.split("\n")[0], "Update 5000")
+
+    def test_counters_query_count(self):
+        self.project.invalidate_recordset()
+        self.env["mail.message"].invalidate_model()
+        with self.assertQueryCount(default=20):
+            self.project.read(
+                [
+                    "recent_activity_summary",
+                    "hearing_count",
+                    "memo_count",
+                    "task_count",
+                    "timesheet_count",
+                    "case_count",
+                    "first_instance_case_count",
+                ]
+            )
+        # No chatter message was loaded in the ORM cache.
+        self.assertFalse(self.env.cache.get_records(self.env["mail.message"], self.env["mail.message"]._fields["body"]))
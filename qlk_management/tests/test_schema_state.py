@@ -0,0 +1,49 @@
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.qlk_management.models.schema_state import chunked_update, run_init_step
+
+
+class TestSchemaState(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env.cr.execute("CREATE TABLE qlk_test_schema_state (id SERIAL PRIMARY KEY, value INTEGER)")
+        cls.env.cr.execute(
+            "INSERT INTO qlk_test_schema_state (value) SELECT NULL FROM generate_series(1, 25)"
+        )
+
+    def _step(self, env):
+        self.calls += 1
+        return chunked_update(env.cr, "qlk_test_schema_state", "value = 1", "value IS NULL", chunk_size=10)
+
+    def test_step_runs_once_per_fingerprint(self):
+        self.calls = 0
+        self.assertTrue(run_init_step(self.env, "test.schema_state", "1", self._step, data=1))
+        self.assertFalse(run_init_step(self.env, "test.schema_state", "1", self._step, data=1))
+        self.assertEqual(self.calls, 1)
+        state = self.env["qlk.schema.state"].search([("name", "=", "test.schema_state")])
+        self.assertEqual(state.affected_rows, 25)
+
+        self.assertTrue(run_init_step(self.env, "test.schema_state", "1", self._step, data=2))
+        self.assertEqual(self.calls, 2)
+        state.invalidate_recordset()
+        self.assertEqual(state.affected_rows, 0, "Backfills only touch rows that still need it.")
+
+    def test_version_bump_reruns_step(self):
+        self.calls = 0
+        run_init_step(self.env, "test.schema_state_version", "1", self._step)
+        # Only the version counts: editing the step alone does not rerun it.
+        self.assertFalse(run_init_step(self.env, "test.schema_state_version", "1", lambda env: self._step(env)))
+        self.assertTrue(run_init_step(self.env, "test.schema_state_version", "2", self._step))
+        self.assertEqual(self.calls, 2)
+        state = self.env["qlk.schema.state"].search([("name", "=", "test.schema_state_version")])
+        self.assertEqual(state.version, "2")
+
+    def test_schema_change_reruns_step(self):
+        self.calls = 0
+        run_init_step(self.env, "test.schema_state_columns", "1", self._step, tables=["qlk_test_schema_state"])
+        self.env.cr.execute("ALTER TABLE qlk_test_schema_state ADD COLUMN extra INTEGER")
+        self.assertTrue(
+            run_init_step(self.env, "test.schema_state_columns", "1", self._step, tables=["qlk_test_schema_state"])
+        )
+        self.assertEqual(self.calls, 2)
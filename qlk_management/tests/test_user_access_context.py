@@ -0,0 +1,58 @@
+from odoo import Command
+from odoo.tests.common import TransactionCase
+
+
+class TestUserAccessContext(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.env["res.users"].create(
+            {
+                "name": "Access Context Manager",
+                "login": "access-context-manager-test",
+                "groups_id": [Command.link(cls.env.ref("qlk_management.group_bd_manager").id)],
+            }
+        )
+        cls.manager = cls.env["hr.employee"].create({"name": "Access Context Manager", "user_id": cls.user.id})
+        cls.report = cls.env["hr.employee"].create({"name": "Direct Report", "parent_id": cls.manager.id})
+        cls.indirect = cls.env["hr.employee"].create({"name": "Indirect Report", "parent_id": cls.report.id})
+        cls.access = cls.env["qlk.user.access.context"].with_user(cls.user)
+
+    def test_context_resolves_employees_and_team(self):
+        context = self.access._get()
+        self.assertEqual(context.employee_ids, (self.manager.id,))
+        self.assertEqual(
+            set(context.team_employee_ids), {self.manager.id, self.report.id, self.indirect.id}
+        )
+        self.assertTrue(context.can_view_all)
+
+    def test_context_is_memoized_per_request(self):
+        self.assertIs(self.access._get(), self.access._get())
+
+    def test_hierarchy_changes_invalidate_context(self):
+        self.access._get()
+        self.indirect.parent_id = False
+        self.assertNotIn(self.indirect.id, self.access._get().team_employee_ids)
+
+    def test_invalidation_bumps_generation_once_per_commit(self):
+        generations = self.env["qlk.cache.generation"]
+        before = generations._get("user_access_context")
+        self.indirect.parent_id = False
+        self.report.active = False
+        # The writing transaction reads around the cache until it commits.
+        self.assertIsNone(generations._get("user_access_context"))
+        self.env.cr.precommit.run()
+        self.assertEqual(generations._get("user_access_context"), before + 1)
+
+    def test_context_is_keyed_by_company(self):
+        company = self.env["res.company"].create({"name": "Access Context Company"})
+        self.user.company_ids |= company
+        main = self.access._get()
+        other = self.access.with_company(company)._get()
+        self.assertIsNot(main, other)
+        self.assertEqual(main.employee_ids, other.employee_ids)
+
+    def test_group_checks(self):
+        self.assertTrue(self.access.has_group("qlk_management.group_bd_manager"))
+        self.assertFalse(self.access.has_group("base.group_system"))
+        self.assertFalse(self.access.has_group("qlk_missing_module.group_missing"))
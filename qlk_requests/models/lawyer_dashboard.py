@@ -23,16 +23,36 @@ class LawyerDashboardRequests(models.AbstractModel):
         return dict(selection or []).get(record[field_name], record[field_name] or "")
 
     @api.model
-    def _get_request_bucket(self, domain, lang, action_xmlid="qlk_requests.action_qlk_request", include_items=True):
+    def _get_request_state_counts(self, domain):
+        """Return ``{state: count}`` for ``domain`` with one grouped query."""
+        groups = self.env["qlk.internal.request"].read_group(domain, ["state"], ["state"], lazy=False)
+        return {group["state"]: group["__count"] for group in groups}
+
+    @api.model
+    def _get_request_bucket(
+        self,
+        domain,
+        lang,
+        action_xmlid="qlk_requests.action_qlk_request",
+        include_items=True,
+        state_counts=None,
+    ):
+        """Build a dashboard bucket; ``state_counts`` avoids re-counting ``domain``."""
         Request = self.env["qlk.internal.request"]
         action = self._request_action_payload(action_xmlid)
-        breakdown = {}
-        for state in ("draft", "in_progress", "done", "cancelled"):
-            breakdown[state] = Request.search_count(domain + [("state", "=", state)])
+        if state_counts is None:
+            state_counts = self._get_request_state_counts(domain)
+        breakdown = {
+            state: state_counts.get(state, 0)
+            for state in ("draft", "in_progress", "done", "cancelled")
+        }
 
         items = []
         if include_items:
             requests = Request.search(domain, order="receive_date desc, request_date desc, id desc", limit=5)
+            # Prefetch the names of all five requests at once.
+            requests.requested_by.mapped("name")
+            requests.employee_ids.mapped("name")
             for request in requests:
                 items.append(
                     {
@@ -50,7 +70,7 @@ class LawyerDashboardRequests(models.AbstractModel):
                 )
 
         return {
-            "count": Request.search_count(domain),
+            "count": sum(state_counts.values()),
             "breakdown": breakdown,
             "domain": domain,
             "action": action,
@@ -72,11 +92,16 @@ class LawyerDashboardRequests(models.AbstractModel):
             ("delivery_date", "<", fields.Datetime.now()),
             ("state", "not in", ["done", "cancelled"]),
         ]
+        # One grouped count per distinct base domain; the per-state KPIs
+        # are slices of the overall breakdown.
+        my_counts = self._get_request_state_counts(my_domain)
+        all_counts = self._get_request_state_counts([])
         return {
             "my": self._get_request_bucket(
                 my_domain,
                 lang,
                 action_xmlid="qlk_requests.action_qlk_request_my",
+                state_counts=my_counts,
             ),
             "assigned": self._get_request_bucket(
                 assigned_domain,
@@ -90,18 +115,21 @@ class LawyerDashboardRequests(models.AbstractModel):
                     lang,
                     action_xmlid="qlk_requests.action_qlk_request_list",
                     include_items=False,
+                    state_counts=all_counts,
                 ),
                 "in_progress": self._get_request_bucket(
                     [("state", "=", "in_progress")],
                     lang,
                     action_xmlid="qlk_requests.action_qlk_request_list",
                     include_items=False,
+                    state_counts={"in_progress": all_counts.get("in_progress", 0)},
                 ),
                 "done": self._get_request_bucket(
                     [("state", "=", "done")],
                     lang,
                     action_xmlid="qlk_requests.action_qlk_request_list",
                     include_items=False,
+                    state_counts={"done": all_counts.get("done", 0)},
                 ),
                 "delayed": self._get_request_bucket(
                     delayed_domain,
@@ -114,6 +142,7 @@ class LawyerDashboardRequests(models.AbstractModel):
                     lang,
                     action_xmlid="qlk_requests.action_qlk_request_list",
                     include_items=False,
+                    state_counts=my_counts,
                 ),
             },
         }